@@ -3,522 +3,78 @@ from tkinter import ttk, messagebox, scrolledtext, filedialog
 import sqlite3
 import random
 from datetime import datetime, timedelta
-import hashlib
 import os
 import sys
-import subprocess
 import atexit
 import re # Necesario para el procesamiento del reporte en PDF
-import json 
 import winsound
-import pandas as pd
 from tkinter import filedialog, messagebox
 from collections import Counter
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
 from datetime import datetime
 import re
 import time
+from functools import partial
 
 
 
 from tkcalendar import DateEntry
-from fpdf import FPDF, enums # Importar enums aquí
 # print(f"FPDF module path: {FPDF.__module__}")
 # print(f"FPDF version: {FPDF_VERSION if 'FPDF_VERSION' in globals() else 'Not found'}")
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+import numpy as np
 
-import requests
-from bs4 import BeautifulSoup
 
 
 from collections import Counter
 from datetime import datetime
 
 # --- Configuración de la Base de Datos ---
-DB_DIR = 'data'
-DB_NAME = os.path.join(DB_DIR, 'loteria.db')
+from loto.base_datos import (
+    DB_NAME, SORTEOS,
+    crear_tabla, obtener_premio_por_cordoba_db, obtener_monto_minimo_venta_db,
+    obtener_tema_db,
+    obtener_sorteo_actual_automatico, actualizar_tema_db, calcular_premio, formatear_numero_loteria,
+    registrar_venta_db, eliminar_ultima_venta_valida_db, obtener_ventas_para_reporte_db,
+    registrar_numero_ganador_db, consultar_numero_ganador_db, obtener_ganadores_fecha, obtener_ultimos_ganadores_db,
+    obtener_ganadores_para_reporte_db, verificar_clave_db, actualizar_clave_db,
+    actualizar_premio_por_cordoba_db, conectar_historial,
+    rango_periodo, obtener_agregados_graficos,
+    obtener_resumen_ventas_db, obtener_totales_ventas_db, obtener_totales_numero_db
+)
+from loto.exportacion import (
+    exportar_datos_crudos, TABLAS_EXPORTABLES, abrir_archivo,
+    escribir_pdf_reporte, escribir_excel_reporte,
+    escribir_pdf_tabla_simple, escribir_excel_tabla_simple,
+    formatear_cordobas, FORMATO_CORDOBAS_EXCEL
+)
+from loto.trabajos import ColaTrabajos
+from loto.columnas import TablaColumnar
+from loto.importacion import importar_desde_sqlite, importar_desde_archivo, describir_resumen_importacion
+from loto.sincronizacion import sincronizar_carpeta, describir_sincronizacion
+from loto.resultados_web import obtener_resultados_loto_nicaragua
+from loto.sondeo_resultados import SondeoResultados
+from loto.relleno_resultados import rellenar_resultados, describir_relleno
+from loto.estadisticas import obtener_estadisticas, DIAS_SEMANA
+from loto.mapa_ventas import MatrizVentasDia
+from loto.series import SerieTemporal
+from loto.configuracion_ui import ConfiguracionUI
+from loto.planificador import PlanificadorTk
+from loto.vigilancia import VigilanteBucle, LATIDO_MS
+from loto.render_graficos import RenderizadorGraficos, PedidoGrafico, ImagenGrafico, imagen_ppm
+from loto.archivo import anios_archivables, archivar_anios_cerrados
+from loto.mantenimiento import mantenimiento_pendiente, ejecutar_mantenimiento, describir_mantenimiento
 temp_pdf_files = [] # Lista para almacenar rutas de PDFs temporales para limpieza
-
-def crear_tabla():
-    """Crea las tablas 'ventas', 'configuracion', 'resultados_sorteo' y 'ui_configuracion' en la base de datos si no existen."""
-    os.makedirs(DB_DIR, exist_ok=True)
-
-    # ¡ESTAS DOS LÍNEAS SON FUNDAMENTALES Y DEBEN ESTAR AQUÍ AL INICIO DE LA FUNCIÓN!
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Tabla de Ventas (modificada para permitir múltiples ventas del mismo número)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ventas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            numero_loteria TEXT NOT NULL,
-            apuesta INTEGER NOT NULL,
-            premio_potencial REAL NOT NULL,
-            fecha_hora TEXT NOT NULL,
-            sorteo_hora TEXT NOT NULL,
-            venta_fecha_solo_dia TEXT NOT NULL
-        )
-    ''')
-
-    # Tabla de Resultados del Sorteo
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS resultados_sorteo (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            fecha_sorteo TEXT NOT NULL,
-            hora_sorteo TEXT NOT NULL,
-            numero_ganador TEXT NOT NULL,
-            UNIQUE(fecha_sorteo, hora_sorteo)
-        )
-    ''')
-
-    # --- INICIO DE CAMBIO CRÍTICO: Nueva estructura para la tabla 'configuracion' ---
-    # Esta tabla es para configuraciones globales de la aplicación, con un ID fijo.
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS configuracion (
-            id INTEGER PRIMARY KEY DEFAULT 1,
-            clave_acceso TEXT,
-            premio_por_cordoba_1 REAL DEFAULT 70.0,
-            sorteo_activo TEXT DEFAULT 'DIA',
-            hora_cierre_dia TEXT DEFAULT '13:00',
-            hora_cierre_noche TEXT DEFAULT '21:00',
-            monto_minimo_venta REAL DEFAULT 1.0,
-            max_ventas_numero_sorteo INTEGER DEFAULT 100,
-            tema TEXT DEFAULT 'clam'
-        )
-    ''')
-
-    # Asegurarse de que siempre haya una fila en configuracion con id=1 para los ajustes
-    cursor.execute("INSERT OR IGNORE INTO configuracion (id) VALUES (1)")
-
-    # --- NUEVA TABLA: ui_configuracion para configuraciones específicas de la UI (como anchos de columnas) ---
-    # Esta tabla usa el modelo clave/valor_json para settings dinámicos de UI.
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ui_configuracion (
-            clave TEXT PRIMARY KEY,
-            valor_json TEXT
-        )
-    ''')
-
-    # --- LÓGICA DE MIGRACIÓN PARA TABLA 'configuracion' ---
-    # La lógica de migración que te di antes era para tu archivo "02.py".
-    # Ahora que tienes "loto_actualizado.py" y la estructura de "configuracion" ha cambiado,
-    # es mejor un enfoque de "si no existe un valor en la nueva columna, usa el por defecto o migra si es posible".
-
-    # Migrar 'clave_acceso'
-    cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
-    current_clave_acceso = cursor.fetchone()
-    if not current_clave_acceso or not current_clave_acceso[0]:
-        # Intentar migrar desde la vieja tabla de configuración si existiera
-        try:
-            temp_conn = sqlite3.connect(DB_NAME)
-            temp_cursor = temp_conn.cursor()
-            temp_cursor.execute("SELECT valor FROM configuracion WHERE clave = 'clave_acceso'")
-            old_key_value = temp_cursor.fetchone()
-            if old_key_value:
-                new_key_value = old_key_value[0]
-                cursor.execute("UPDATE configuracion SET clave_acceso = ? WHERE id = 1", (new_key_value,))
-                print("✅ Clave de acceso migrada.")
-            temp_conn.close()
-        except sqlite3.OperationalError: # Tabla vieja no existe
-            pass
-        
-        # Si después de la migración sigue sin clave o es nueva DB, inicializar
-        cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
-        final_clave = cursor.fetchone()
-        if not final_clave or not final_clave[0]:
-            # No inicializar con el hash de una cadena vacía, sino dejarla como NULL para que el login se omita.
-            # La clave se establecerá solo cuando el usuario la defina explícitamente en Configuración.
-            clave_inicial_hash = None
-            cursor.execute("UPDATE configuracion SET clave_acceso = ? WHERE id = 1", (clave_inicial_hash,))
-            print("✅ Clave de acceso inicializada.")
-
-    # Migrar 'premio_por_cordoba'
-    cursor.execute("SELECT premio_por_cordoba_1 FROM configuracion WHERE id = 1")
-    current_premio = cursor.fetchone()
-    if not current_premio or current_premio[0] == 80.0: # Si es el valor por defecto, intentar migrar
-        try:
-            temp_conn = sqlite3.connect(DB_NAME)
-            temp_cursor = temp_conn.cursor()
-            temp_cursor.execute("SELECT valor FROM configuracion WHERE clave = 'premio_por_cordoba'")
-            old_premio_value = temp_cursor.fetchone()
-            if old_premio_value:
-                try:
-                    new_premio_value = float(old_premio_value[0])
-                    cursor.execute("UPDATE configuracion SET premio_por_cordoba_1 = ? WHERE id = 1", (new_premio_value,))
-                    print("✅ Premio por cordoba migrado.")
-                except ValueError:
-                    print("❌ No se pudo convertir el valor de 'premio_por_cordoba' a número. Usando valor por defecto.")
-            temp_conn.close()
-        except sqlite3.OperationalError: # Tabla vieja no existe
-            pass
-    
-    # Asegurarse de que el tema tenga un valor
-    cursor.execute("SELECT tema FROM configuracion WHERE id = 1")
-    current_tema = cursor.fetchone()
-    if not current_tema or not current_tema[0]:
-        # Intentar migrar desde la vieja tabla de configuración si existiera
-        try:
-            temp_conn = sqlite3.connect(DB_NAME)
-            temp_cursor = temp_conn.cursor()
-            temp_cursor.execute("SELECT valor FROM configuracion WHERE clave = 'tema'")
-            old_tema_value = temp_cursor.fetchone()
-            if old_tema_value:
-                new_tema_value = old_tema_value[0]
-                cursor.execute("UPDATE configuracion SET tema = ? WHERE id = 1", (new_tema_value,))
-                print("✅ Tema migrado.")
-            temp_conn.close()
-        except sqlite3.OperationalError:
-            pass
-
-        cursor.execute("SELECT tema FROM configuracion WHERE id = 1")
-        final_tema = cursor.fetchone()
-        if not final_tema or not final_tema[0]:
-            cursor.execute("UPDATE configuracion SET tema = 'clam' WHERE id = 1")
-            print("✅ Tema inicializado.")
-
-    # --- FIN DE CAMBIO CRÍTICO ---
-
-    # ¡ESTAS DOS LÍNEAS DEBEN ESTAR AL FINAL DE LA FUNCIÓN, DESPUÉS DE TODAS LAS CREACIONES DE TABLAS Y MIGRACIONES!
-    conn.commit()
-    conn.close()
-
-# --- Funciones de Lógica de Negocio ---
-
-def obtener_premio_por_cordoba_db():
-    """Obtiene el valor del premio por cada 1 córdoba de la base de datos."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT premio_por_cordoba_1 FROM configuracion WHERE id = 1")
-    resultado = cursor.fetchone()
-    conn.close()
-    try:
-        return int(resultado[0]) if resultado else 70
-    except ValueError:
-        return 70 # En caso de que el valor almacenado no sea un número válido
-    
-
-# --- Nuevas Funciones Auxiliares para Resumen Diario ---
-
-def obtener_numero_mas_vendido_hoy():
-    """Calcula y retorna el número más vendido del día actual y la cantidad de veces que se vendió."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    hoy_str = datetime.now().strftime("%Y-%m-%d")
-
-    cursor.execute("""
-        SELECT numero, COUNT(numero) as cantidad_ventas
-        FROM ventas
-        WHERE substr(fecha_venta, 1, 10) = ?
-        GROUP BY numero
-        ORDER BY cantidad_ventas DESC, numero ASC
-        LIMIT 1
-    """, (hoy_str,))
-    resultado = cursor.fetchone()
-    conn.close()
-
-    if resultado:
-        return f"{resultado[0]} (Vend. {resultado[1]} veces)"
-    return "N/A"
-
-def calcular_total_apostado_hoy():
-    """Calcula y retorna la suma total de las apuestas realizadas el día actual."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    hoy_str = datetime.now().strftime("%Y-%m-%d")
-
-    cursor.execute("""
-        SELECT SUM(apuesta)
-        FROM ventas
-        WHERE substr(fecha_venta, 1, 10) = ?
-    """, (hoy_str,))
-    total = cursor.fetchone()[0]
-    conn.close()
-    return total if total is not None else 0.0
-
-def calcular_ganancia_potencial_total_hoy():
-    """Calcula y retorna la suma total de la ganancia potencial del día actual."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    hoy_str = datetime.now().strftime("%Y-%m-%d")
-
-    cursor.execute("""
-        SELECT SUM(premio_potencial)
-        FROM ventas
-        WHERE substr(fecha_venta, 1, 10) = ?
-    """, (hoy_str,))
-    total = cursor.fetchone()[0]
-    conn.close()
-    return total if total is not None else 0.0
-    
-def obtener_monto_minimo_venta_db():
-    """Obtiene el monto mínimo de venta de la base de datos."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT monto_minimo_venta FROM configuracion WHERE id = 1")
-    resultado = cursor.fetchone()
-    conn.close()
-    return float(resultado[0]) if resultado else 1.0 # Por defecto 1.0 si no se encuentra
-
-def guardar_configuracion_ui_db(clave, valor_json):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT OR REPLACE INTO ui_configuracion (clave, valor_json) VALUES (?, ?)", (clave, valor_json))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error al guardar configuración UI '{clave}': {e}")
-    finally:
-        conn.close()
-
-def cargar_configuracion_ui_db(clave):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT valor_json FROM ui_configuracion WHERE clave = ?", (clave,))
-        resultado = cursor.fetchone()
-        return resultado[0] if resultado else None
-    except sqlite3.Error as e:
-        print(f"Error al cargar configuración UI '{clave}': {e}")
-        return None
-    finally:
-        conn.close()
-
-def obtener_numero_mas_vendido_del_dia():
-    """
-    Obtiene el número de lotería más vendido del día actual.
-    Retorna el número como una cadena (ej. "05") y su conteo,
-    o None, 0 si no hay ventas hoy.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    hoy = datetime.now().strftime('%Y-%m-%d')
-    
-    cursor.execute(f"""
-        SELECT numero_loteria, COUNT(numero_loteria) as ventas_count
-        FROM ventas
-        WHERE venta_fecha_solo_dia = ?
-        GROUP BY numero_loteria
-        ORDER BY ventas_count DESC, numero_loteria ASC
-        LIMIT 1
-    """, (hoy,))
-    
-    resultado = cursor.fetchone()
-    conn.close()
-    
-    if resultado:
-        return resultado[0], resultado[1] # Retorna (numero_loteria, ventas_count)
-    else:
-        return None, 0 # No hay ventas para hoy
-
-def obtener_tema_db():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT tema FROM configuracion WHERE id = 1")
-    tema = cursor.fetchone()
-    conn.close()
-    return tema[0] if tema else 'clam' # Retorna el tema o 'clam' por defecto
-
-def obtener_sorteo_actual_automatico():
-    ahora = datetime.now().time()
-    if ahora < datetime.strptime("12:00", "%H:%M").time():
-        return "11 AM"
-    elif ahora < datetime.strptime("16:00", "%H:%M").time():
-        return "03 PM"
-    elif ahora < datetime.strptime("19:00", "%H:%M").time():
-        return "06 PM"
-    else:
-        return "09 PM"
-
-
-def actualizar_tema_db(nuevo_tema):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE configuracion SET tema = ? WHERE id = 1", (nuevo_tema,))
-    conn.commit()
-    conn.close()
-
-def calcular_premio(apuesta):
-    """Calcula el premio potencial basado en la apuesta y el valor configurado."""
-    premio_por_cordoba = obtener_premio_por_cordoba_db()
-    try:
-        apuesta_int = int(apuesta)
-        return apuesta_int * premio_por_cordoba if apuesta_int > 0 else 0
-    except ValueError:
-        return 0
-
-def formatear_numero_loteria(numero):
-    """Asegura que el número de lotería tenga siempre 2 dígitos (ej. 05 en vez de 5)."""
-    try:
-        numero_int = int(numero)
-        return f"{numero_int:02d}"
-    except ValueError:
-        return ""
-
-# --- Funciones de Interacción con la Base de Datos (Ventas) ---
-
-def registrar_venta_db(numero, apuesta, premio, sorteo_hora):
-    """
-    Registra o actualiza una venta de lotería en la base de datos.
-    Si ya existe una venta para el mismo número, fecha y sorteo, se actualiza la apuesta y el premio,
-    y la 'fecha_hora' de la última modificación. De lo contrario, se inserta una nueva venta.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    fecha_actual_solo_dia = datetime.now().strftime('%Y-%m-%d')
-    fecha_hora_completa_actual = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-    numero_formateado = formatear_numero_loteria(numero)
-
-    try:
-        # Intentar encontrar una venta existente para el mismo número, día y sorteo
-        cursor.execute('''
-            SELECT apuesta, premio_potencial FROM ventas
-            WHERE numero_loteria = ? AND venta_fecha_solo_dia = ? AND sorteo_hora = ?
-        ''', (numero_formateado, fecha_actual_solo_dia, sorteo_hora))
-        
-        venta_existente = cursor.fetchone()
-
-        if venta_existente:
-            apuesta_existente, premio_existente = venta_existente
-            nueva_apuesta_total = apuesta_existente + apuesta
-            # El nuevo premio potencial se calcula de nuevo, no se suma, para evitar errores si el multiplicador de premio cambia
-            nuevo_premio_total = calcular_premio(nueva_apuesta_total)
-            
-            cursor.execute('''
-                UPDATE ventas
-                SET apuesta = ?, premio_potencial = ?, fecha_hora = ?
-                WHERE numero_loteria = ? AND venta_fecha_solo_dia = ? AND sorteo_hora = ?
-            ''', (nueva_apuesta_total, nuevo_premio_total, fecha_hora_completa_actual,
-                  numero_formateado, fecha_actual_solo_dia, sorteo_hora))
-            conn.commit()
-            return True, f"✅ Venta actualizada: Número {numero_formateado} ({sorteo_hora}), Apuesta Total C${nueva_apuesta_total}, Premio Total C${nuevo_premio_total} (última mod: {fecha_hora_completa_actual})"
-        else:
-            # Insertar una nueva venta si no existe
-            cursor.execute('''
-                INSERT INTO ventas (numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (numero_formateado, apuesta, premio, fecha_hora_completa_actual, sorteo_hora, fecha_actual_solo_dia))
-            conn.commit()
-            return True, f"✅ Venta registrada: Número {numero_formateado} ({sorteo_hora}), Apuesta C${apuesta}, Premio C${premio}, Fecha: {fecha_hora_completa_actual}"
-
-    except sqlite3.Error as e:
-        return False, f"❌ Error al registrar/actualizar la venta: {e}"
-    finally:
-        conn.close()
-
-from collections import Counter
-def obtener_top_numeros_mas_vendidos_hoy(limit=5):
-    """Devuelve los N números más vendidos hoy con el total de apuesta."""
-    fecha_actual = datetime.now().strftime('%Y-%m-%d')
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    cursor.execute('''
-    SELECT numero_loteria, SUM(apuesta) as total
-    FROM ventas
-    WHERE venta_fecha_solo_dia = ?
-    GROUP BY numero_loteria
-    ORDER BY total DESC
-    LIMIT ?
-    ''', (fecha_actual, limit))
-
-    resultados = cursor.fetchall()
-    conn.close()
-    return resultados  # Lista de tuplas (numero, total_apuesta)
-
-def obtener_total_apostado_por_sorteo_semana():
-    """Devuelve una lista con el total apostado en la semana por sorteo."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    hoy = datetime.now()
-    lunes = hoy - timedelta(days=hoy.weekday())  # lunes de esta semana
-    fecha_inicio = lunes.strftime('%Y-%m-%d')
-
-    cursor.execute('''
-        SELECT sorteo_hora, SUM(apuesta) as total_apuesta
-        FROM ventas
-        WHERE venta_fecha_solo_dia >= ?
-        GROUP BY sorteo_hora
-        ORDER BY sorteo_hora
-    ''', (fecha_inicio,))
-    
-    resultados = cursor.fetchall()
-    conn.close()
-    return resultados  # Ejemplo: [('03 PM', 450), ('06 PM', 620), ...]
-
-def obtener_apuestas_vs_premios_semana():
-    """
-    Devuelve una lista con cada sorteo y su total apostado vs total pagado en premios,
-    desde el lunes hasta hoy.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    hoy = datetime.now()
-    lunes = hoy - timedelta(days=hoy.weekday())
-    fecha_inicio = lunes.strftime('%Y-%m-%d')
-
-    # Total apostado por sorteo
-    cursor.execute('''
-        SELECT sorteo_hora, SUM(apuesta) FROM ventas
-        WHERE venta_fecha_solo_dia >= ?
-        GROUP BY sorteo_hora
-    ''', (fecha_inicio,))
-    apuestas = dict(cursor.fetchall())
-
-    # Total premios entregados por sorteo (si hubo coincidencia con número ganador)
-    cursor.execute('''
-        SELECT v.sorteo_hora, SUM(v.premio_potencial)
-        FROM ventas v
-        JOIN resultados_sorteo r
-            ON v.venta_fecha_solo_dia = r.fecha_sorteo
-            AND v.sorteo_hora = r.hora_sorteo
-            AND v.numero_loteria = r.numero_ganador
-        WHERE v.venta_fecha_solo_dia >= ?
-        GROUP BY v.sorteo_hora
-    ''', (fecha_inicio,))
-    premios = dict(cursor.fetchall())
-
-    conn.close()
-
-    sorteos = ['11 AM', '03 PM', '06 PM', '09 PM']
-    resultado = []
-    for sorteo in sorteos:
-        total_ap = apuestas.get(sorteo, 0)
-        total_pr = premios.get(sorteo, 0)
-        resultado.append((sorteo, total_ap, total_pr))
-
-    return resultado
-
-
-def eliminar_ultima_venta_valida_db():
-    """Elimina el último registro real de venta basado en la fecha y hora más reciente."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute('''
-            SELECT id FROM ventas
-            ORDER BY fecha_hora DESC
-            LIMIT 1
-        ''')
-        ultima = cursor.fetchone()
-        if ultima:
-            cursor.execute('DELETE FROM ventas WHERE id = ?', (ultima[0],))
-            conn.commit()
-            return True, "✅ Última venta eliminada correctamente."
-        else:
-            return False, "❌ No hay ventas para eliminar."
-    except sqlite3.Error as e:
-        return False, f"❌ Error al eliminar la última venta: {e}"
-    finally:
-        conn.close()
+SINCRONIZACION_INTERVALO_MS = 10 * 60 * 1000 # Cada cuánto se sincroniza la carpeta compartida de terminales
+MANTENIMIENTO_VERIFICACION_MS = 15 * 60 * 1000 # Cada cuánto se revisa si toca el mantenimiento nocturno de la base
+EVENTOS_TRABAJOS_INTERVALO_MS = 100 # Cada cuánto se atienden los eventos de los hilos de fondo
+SORTEO_AUTOMATICO_INTERVALO_MS = 60 * 1000 # Cada cuánto se revisa si cambió el sorteo en curso
+DISENO_ESPERA_GUARDADO_MS = 2000 # Tiempo sin mover sashes ni columnas antes de guardar la distribución
+# Motores de dibujo de la pestaña Gráficos (valor guardado -> nombre en Configuración); Tk no necesita matplotlib
+MOTORES_GRAFICOS = {"tk": "Tk (liviano)", "matplotlib": "Matplotlib (alta calidad)"}
+
+# Columnas tipadas de los resultados que respaldan las grillas exportables
+COLUMNAS_RESUMEN_VENTAS = [("numero_loteria", "texto"), ("apuesta", "decimal"), ("premio_potencial", "decimal"), ("sorteo_hora", "texto")]
+COLUMNAS_GANADORES = [("fecha_sorteo", "texto"), ("hora_sorteo", "texto"), ("numero_ganador", "texto")]
 
 def crear_respaldo_codigo_txt():
     import os
@@ -545,33 +101,6 @@ def crear_respaldo_codigo_txt():
 
 
 
-def obtener_todas_las_ventas_db():
-    """Obtiene todos los registros de ventas de la base de datos (individuales, sin agrupar)."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia FROM ventas ORDER BY fecha_hora DESC")
-    ventas = cursor.fetchall()
-    conn.close()
-    return ventas
-
-def obtener_historial_ventas_numero_db(numero):
-    """
-    Obtiene el historial de ventas para un número de lotería específico.
-    Retorna una lista de tuplas con los datos de venta.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    numero_formateado = formatear_numero_loteria(numero)
-    cursor.execute('''
-        SELECT fecha_hora, sorteo_hora, apuesta, premio_potencial
-        FROM ventas
-        WHERE numero_loteria = ?
-        ORDER BY fecha_hora DESC
-    ''', (numero_formateado,))
-    historial = cursor.fetchall()
-    conn.close()
-    return historial
-
 def eliminar_ultima_venta_db():
     """Elimina el último registro de venta de la base de datos (NO USADO EN ESTA LÓGICA AGRUPADA)."""
     # Esta función ahora es menos útil con la lógica de agrupación y actualización.
@@ -593,289 +122,6 @@ def eliminar_ultima_venta_db():
     finally:
         conn.close()
 
-# <<< CAMBIO INICIADO: Modificar la firma de la función para aceptar un rango de fechas.
-def obtener_ventas_para_reporte_db(tipo_reporte=None, fecha_inicio=None, fecha_fin=None, mes_numero_seleccionado=None, anio_seleccionado=None, sorteo_seleccionado=None):
-# <<< CAMBIO FINALIZADO
-    """
-    Obtiene las ventas para un período específico (diario, semanal, mensual) o por fecha/sorteo.
-    Agrupa por numero_loteria, venta_fecha_solo_dia y sorteo para mostrar la suma total.
-    Ordena por la última fecha_hora de modificación de cada grupo.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    ahora = datetime.now()
-    
-    where_clauses = []
-    params = []
-
-    if tipo_reporte:
-        if tipo_reporte == 'diario':
-            fecha_comienzo = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
-            where_clauses.append("fecha_hora >= ?")
-            params.append(fecha_comienzo.strftime('%Y-%m-%d %H:%M:%S'))
-        elif tipo_reporte == 'semanal':
-            dias_restar = ahora.weekday() # 0 para lunes, 6 para domingo
-            fecha_comienzo = ahora - timedelta(days=dias_restar)
-            fecha_comienzo = fecha_comienzo.replace(hour=0, minute=0, second=0, microsecond=0)
-            where_clauses.append("fecha_hora >= ?")
-            params.append(fecha_comienzo.strftime('%Y-%m-%d %H:%M:%S'))
-        elif tipo_reporte == 'mensual':
-            if mes_numero_seleccionado and anio_seleccionado:
-                try:
-                    mes_int = int(mes_numero_seleccionado)
-                    anio_int = int(anio_seleccionado)
-                    if mes_int == 12:
-                        fecha_fin_mes = datetime(anio_int + 1, 1, 1) - timedelta(days=1)
-                    else:
-                        fecha_fin_mes = datetime(anio_int, mes_int + 1, 1) - timedelta(days=1)
-                    
-                    fecha_inicio_mes = datetime(anio_int, mes_int, 1)
-
-                    where_clauses.append("fecha_hora BETWEEN ? AND ?")
-                    params.append(fecha_inicio_mes.strftime('%Y-%m-%d 00:00:00'))
-                    params.append(fecha_fin_mes.strftime('%Y-%m-%d 23:59:59'))
-                except ValueError:
-                    pass
-        # <<< CAMBIO INICIADO: Usar BETWEEN para el rango de fechas.
-        elif tipo_reporte == 'por_fecha':
-            if fecha_inicio and fecha_fin:
-                where_clauses.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-                params.append(fecha_inicio)
-                params.append(fecha_fin)
-        # <<< CAMBIO FINALIZADO
-    
-    if sorteo_seleccionado and sorteo_seleccionado != "Todos":
-        where_clauses.append("sorteo_hora = ?")
-        params.append(sorteo_seleccionado)
-
-    query = '''
-        SELECT 
-            numero_loteria, 
-            SUM(apuesta) AS total_apuesta, 
-            SUM(premio_potencial) AS total_premio, 
-            venta_fecha_solo_dia, 
-            sorteo_hora,
-            MAX(fecha_hora) AS ultima_modificacion_hora_venta -- Obtener la última fecha_hora de venta
-        FROM ventas
-    '''
-    if where_clauses:
-        query += " WHERE " + " AND ".join(where_clauses)
-    
-    query += '''
-        GROUP BY numero_loteria, venta_fecha_solo_dia, sorteo_hora
-        ORDER BY ultima_modificacion_hora_venta DESC, numero_loteria ASC -- Ordenar por la última modificación
-    '''
-    # print(f"DEBUG: SQL Query (ventas agrupadas, ordenado por ultima_modificacion_hora_venta): {query}")
-    # print(f"DEBUG: SQL Params (ventas agrupadas): {params}")
-
-    cursor.execute(query, tuple(params))
-    ventas = cursor.fetchall()
-    # print(f"DEBUG: Resultados de la consulta (ventas agrupadas): {ventas}")
-    conn.close()
-    return ventas
-
-# --- Funciones de Interacción con la Base de Datos (Resultados de Sorteo) ---
-
-def registrar_numero_ganador_db(fecha, sorteo, numero_ganador):
-    """
-    Registra el número ganador para una fecha y sorteo específicos.
-    Si ya existe, lo actualiza.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    numero_formateado = formatear_numero_loteria(numero_ganador)
-
-    try:
-        cursor.execute('''
-            SELECT id FROM resultados_sorteo
-            WHERE fecha_sorteo = ? AND hora_sorteo = ?
-        ''', (fecha, sorteo))
-        
-        registro_existente = cursor.fetchone()
-
-        if registro_existente:
-            cursor.execute('''
-                UPDATE resultados_sorteo
-                SET numero_ganador = ?
-                WHERE fecha_sorteo = ? AND hora_sorteo = ?
-            ''', (numero_formateado, fecha, sorteo))
-            conn.commit()
-            return True, f"✅ Número ganador para {fecha} - {sorteo} actualizado a {numero_formateado}."
-        else:
-            cursor.execute('''
-                INSERT INTO resultados_sorteo (fecha_sorteo, hora_sorteo, numero_ganador)
-                VALUES (?, ?, ?)
-            ''', (fecha, sorteo, numero_formateado))
-            conn.commit()
-            return True, f"✅ Número ganador {numero_formateado} registrado para {fecha} - {sorteo}."
-    except sqlite3.Error as e:
-        return False, f"❌ Error al registrar/actualizar número ganador: {e}"
-    finally:
-        conn.close()
-
-def consultar_numero_ganador_db(fecha, sorteo):
-    """Consulta el número ganador para una fecha y sorteo específicos."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute('''
-            SELECT numero_ganador
-            FROM resultados_sorteo
-            WHERE fecha_sorteo = ? AND hora_sorteo = ?
-        ''', (fecha, sorteo))
-        resultado = cursor.fetchone()
-        conn.close()
-        return resultado[0] if resultado else None
-    except sqlite3.Error as e:
-        print(f"Error al consultar número ganador: {e}")
-        return None
-    finally:
-        conn.close()
-
-def obtener_ultimos_ganadores_db(limite=5):
-    """Obtiene los últimos números ganadores registrados."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute('''
-            SELECT fecha_sorteo, hora_sorteo, numero_ganador
-            FROM resultados_sorteo
-            ORDER BY fecha_sorteo DESC, hora_sorteo DESC
-            LIMIT ?
-        ''', (limite,))
-        ganadores = cursor.fetchall()
-        return ganadores
-    except sqlite3.Error as e:
-        print(f"Error al obtener últimos ganadores: {e}")
-        return []
-    finally:
-        conn.close()
-
-# <<< CAMBIO INICIADO: Modificar la firma de la función para aceptar un rango de fechas.
-def obtener_ganadores_para_reporte_db(tipo_reporte=None, fecha_inicio=None, fecha_fin=None, mes_numero_seleccionado=None, anio_seleccionado=None, sorteo_seleccionado=None):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    ahora = datetime.now()
-    
-    where_clauses = []
-    params = []
-
-    if tipo_reporte:
-        if tipo_reporte == 'diario':
-            fecha_comienzo = ahora.strftime('%Y-%m-%d')
-            where_clauses.append("r.fecha_sorteo >= ?")
-            params.append(fecha_comienzo)
-        elif tipo_reporte == 'semanal':
-            lunes = (ahora - timedelta(days=ahora.weekday())).strftime('%Y-%m-%d')
-            where_clauses.append("r.fecha_sorteo >= ?")
-            params.append(lunes)
-        elif tipo_reporte == 'mensual':
-            if mes_numero_seleccionado and anio_seleccionado:
-                fecha_inicio = f"{anio_seleccionado}-{mes_numero_seleccionado}-01"
-                if mes_numero_seleccionado == "12":
-                    fecha_fin = f"{int(anio_seleccionado)+1}-01-01"
-                else:
-                    fecha_fin = f"{anio_seleccionado}-{int(mes_numero_seleccionado)+1:02d}-01"
-                where_clauses.append("r.fecha_sorteo BETWEEN ? AND ?")
-                params.extend([fecha_inicio, fecha_fin])
-        elif tipo_reporte == 'por_fecha':
-            if fecha_inicio and fecha_fin:
-                where_clauses.append("r.fecha_sorteo BETWEEN ? AND ?")
-                params.extend([fecha_inicio, fecha_fin])
-
-    if sorteo_seleccionado and sorteo_seleccionado != "Todos":
-        where_clauses.append("r.hora_sorteo = ?")
-        params.append(sorteo_seleccionado)
-
-    query = '''
-        SELECT 
-            r.fecha_sorteo,
-            r.hora_sorteo,
-            r.numero_ganador,
-            IFNULL(SUM(v.apuesta), 0) AS total_apostado,
-            IFNULL(SUM(v.premio_potencial), 0) AS premio_pagado
-        FROM resultados_sorteo r
-        LEFT JOIN ventas v
-            ON v.venta_fecha_solo_dia = r.fecha_sorteo
-            AND v.sorteo_hora = r.hora_sorteo
-            AND v.numero_loteria = r.numero_ganador
-    '''
-
-    if where_clauses:
-        query += " WHERE " + " AND ".join(where_clauses)
-
-    query += '''
-        GROUP BY r.fecha_sorteo, r.hora_sorteo, r.numero_ganador
-        ORDER BY r.fecha_sorteo DESC, r.hora_sorteo ASC
-    '''
-
-    cursor.execute(query, tuple(params))
-    resultados = cursor.fetchall()
-    conn.close()
-    return resultados
-
-# --- Funciones de Acceso y Configuración ---
-
-def verificar_clave_db(clave_ingresada):
-    """Verifica si la clave ingresada coincide con la almacenada en la DB."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
-    clave_hash_almacenada = cursor.fetchone()
-    conn.close()
-
-    if clave_hash_almacenada:
-        return hashlib.sha256(clave_ingresada.encode()).hexdigest() == clave_hash_almacenada[0]
-    return False
-
-def actualizar_clave_db(nueva_clave):
-    """Actualiza la clave de acceso en la base de datos."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    nueva_clave_hash = hashlib.sha256(nueva_clave.encode()).hexdigest()
-    try:
-        cursor.execute("UPDATE configuracion SET clave_acceso = ? WHERE id = 1", (nueva_clave_hash,))
-        return True, "✅ Clave de acceso actualizada correctamente."
-    except sqlite3.Error as e:
-        return False, f"❌ Error al actualizar la clave: {e}"
-    finally:
-        conn.close()
-
-def actualizar_premio_por_cordoba_db(nuevo_valor):
-    """Actualiza el valor del premio por cada C$1 en la base de datos."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("UPDATE configuracion SET premio_por_cordoba_1 = ? WHERE id = 1", (nuevo_valor,))
-        conn.commit()
-        return True, "✅ Premio por cada C$1 actualizado correctamente."
-    except sqlite3.Error as e:
-        return False, f"❌ Error al actualizar el premio por C$1: {e}"
-    finally:
-        conn.close()
-
-def existe_clave_acceso_configurada():
-    """
-    Verifica si existe una clave de acceso configurada en la base de datos
-    que NO sea el hash de una cadena vacía.
-    """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
-    clave_hash_almacenada = cursor.fetchone()
-    conn.close()
-
-    # Calcular el hash de una cadena vacía para compararlo
-    hash_clave_vacia = hashlib.sha256("".encode()).hexdigest()
-
-    # Retorna True solo si hay una clave almacenada Y es diferente al hash de una cadena vacía
-    # Si clave_hash_almacenada es None (porque el campo es NULL), el primer 'if' es falso y retorna False.
-    if clave_hash_almacenada and clave_hash_almacenada[0] != hash_clave_vacia:
-        return True
-    return False
-
-
 # --- Funciones de utilidad para centrar ventanas ---
 def center_window(window):
     """Centra una ventana Toplevel o Tk en la pantalla."""
@@ -901,67 +147,6 @@ def cleanup_temp_pdfs():
 atexit.register(cleanup_temp_pdfs)
 
 
-def obtener_resultados_loto_nicaragua():
-    from selenium import webdriver
-    from selenium.webdriver.firefox.service import Service
-    from selenium.webdriver.firefox.options import Options
-    from selenium.webdriver.common.by import By
-    from datetime import datetime
-    import re
-    import time
-
-    url = "https://loto.com.ni/diaria/"
-    opciones = Options()
-    opciones.add_argument("--headless")
-    opciones.add_argument("--disable-gpu")
-
-    service = Service()  # GeckoDriver debe estar en PATH
-    driver = webdriver.Firefox(service=service, options=opciones)
-
-    resultados = {}
-    try:
-        driver.get(url)
-        time.sleep(5)
-
-        es_sabado = datetime.now().weekday() == 5
-
-        # Buscar todos los bloques que contienen sorteos
-        bloques = driver.find_elements(By.CSS_SELECTOR, "div.et_pb_module.et_pb_text")
-
-        for bloque in bloques:
-            texto = bloque.text.strip()
-
-            # Buscar hora del sorteo
-            hora_match = re.search(r"\d{1,2}:\d{2}\s?[AP]M", texto)
-            if not hora_match:
-                continue
-
-            hora = hora_match.group()
-            if "11:00" in hora:
-                clave = "11 AM"
-            elif "3:00" in hora:
-                clave = "03 PM"
-            elif "6:00" in hora and es_sabado:
-                clave = "06 PM"
-            elif "9:00" in hora:
-                clave = "09 PM"
-            else:
-                continue
-
-            # Buscar los dos dígitos del número ganador
-            digitos = re.findall(r"\b\d\b", texto)
-            if len(digitos) >= 2:
-                numero_ganador = f"{digitos[0]}{digitos[1]}".zfill(2)
-                resultados[clave] = numero_ganador
-
-        return resultados
-    except Exception as e:
-        print(f"❌ Error al usar Selenium con Firefox: {e}")
-        return {}
-    finally:
-        driver.quit()
-
-
 # --- Clase de la Ventana de Login ---
 class LoginWindow(tk.Toplevel):
     def __init__(self, parent):
@@ -1017,6 +202,394 @@ class LoginWindow(tk.Toplevel):
             self.master.destroy()
             sys.exit(0)
 
+# --- Paneles persistentes de la pestaña Gráficos ---
+# Cada gráfico se describe con un diccionario que no depende del motor de dibujo:
+#   {"subgraficos": [{"titulo", "etiqueta_x", "etiqueta_y",
+#                     "categorias": etiquetas de las barras, "marcas": posiciones con etiqueta en el eje X,
+#                     "fechas": True si el eje X son días desde 1970-01-01, "xlim": (mín, máx) del eje X,
+#                     "barras": [{"valores", "color" (uno o uno por barra), "etiqueta"}] (varias = agrupadas),
+#                     "lineas": [{"x", "y", "color", "etiqueta", "escalonada"}],
+#                     "aviso": texto a mostrar en lugar de los datos, o None}],
+#    "texto": renglón sobre el gráfico, "serie": SerieTemporal para el tooltip}
+class PanelGrafico:
+    """
+    Marco + tk.Canvas de un gráfico, común a los dos motores de dibujo. La descripción del
+    gráfico se calcula en el hilo de RenderizadorGraficos ('generar'); cada motor decide
+    qué más hace en ese hilo y qué hace después en el de Tk ('mostrar').
+    """
+
+    def __init__(self, contenedor, titulo, tamano, al_cambiar_tamano):
+        self.frame = ttk.LabelFrame(contenedor, text=titulo)
+        self.canvas = tk.Canvas(self.frame, width=tamano[0], height=tamano[1], bg="white", highlightthickness=0)
+        self.canvas.pack(side="bottom", fill="both", expand=True)
+        self._al_cambiar_tamano = al_cambiar_tamano
+        self._espera_tamano = None
+        self.canvas.bind("<Configure>", self._programar_cambio_tamano)
+        self.texto = None
+        self.info = None # 'tamano', 'area' y 'xlim' del primer subgráfico, 'serie' y 'texto' de la imagen mostrada
+        self.senalado = None # Elemento bajo el mouse, para no rehacer el tooltip si no cambió
+        self.anotaciones = {} # Ítems del tk.Canvas dibujados encima del gráfico (tooltip)
+
+    def agregar_texto(self):
+        """Renglón de texto sobre el gráfico (p. ej. números calientes y fríos)."""
+        self.texto = tk.StringVar()
+        ttk.Label(self.frame, textvariable=self.texto).pack(side="top", anchor="w", padx=5, pady=(5, 0))
+
+    def tamano(self):
+        """Tamaño en píxeles al que hay que dibujar: el del canvas, o el pedido si todavía no se mostró."""
+        ancho, alto = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if ancho <= 1 or alto <= 1:
+            return int(self.canvas["width"]), int(self.canvas["height"])
+        return ancho, alto
+
+    def generar(self, describir, tamano, comunes):
+        """En el hilo de dibujo: arma la descripción del gráfico y retorna lo que 'mostrar' necesita."""
+        raise NotImplementedError
+
+    def mostrar(self, resultado):
+        self.info = self._mostrar(resultado)
+        self.senalado = None
+        for item in self.anotaciones.values():
+            self.canvas.itemconfig(item, state="hidden")
+            self.canvas.tag_raise(item)
+        if self.texto is not None and self.info.get("texto"):
+            self.texto.set(self.info["texto"])
+
+    def _programar_cambio_tamano(self, event):
+        # Se espera a que termine de cambiar el tamaño para no dibujar en cada paso
+        if self._espera_tamano:
+            self.canvas.after_cancel(self._espera_tamano)
+        self._espera_tamano = self.canvas.after(200, self._cambio_tamano)
+
+    def _cambio_tamano(self):
+        self._espera_tamano = None
+        if self.info and self.tamano() != self.info["tamano"] and self.frame.winfo_ismapped():
+            self._al_cambiar_tamano()
+
+
+class PanelGraficoTk(PanelGrafico):
+    """
+    Motor liviano: dibuja barras, barras agrupadas y líneas directamente con ítems del
+    tk.Canvas, sin importar matplotlib. El hilo de dibujo solo calcula la descripción.
+    """
+
+    MARGENES = (64, 24, 16, 36) # izquierda, arriba, derecha, abajo (en píxeles)
+
+    def generar(self, describir, tamano, comunes):
+        return describir(comunes)
+
+    def _mostrar(self, descripcion):
+        self.canvas.delete("grafico")
+        ancho, alto = self.tamano()
+        subgraficos = descripcion["subgraficos"]
+        alto_subgrafico = alto / len(subgraficos)
+        izquierda, arriba, derecha, abajo = self.MARGENES
+        info = {"tamano": (ancho, alto), "serie": descripcion.get("serie"), "texto": descripcion.get("texto")}
+        for i, subgrafico in enumerate(subgraficos):
+            area = (izquierda, i * alto_subgrafico + arriba, ancho - derecha, (i + 1) * alto_subgrafico - abajo)
+            xlim = self._dibujar_subgrafico(subgrafico, area)
+            if i == 0:
+                info.update(area=area, xlim=xlim)
+        return info
+
+    @staticmethod
+    def _marcas_eje_y(maximo):
+        """Hasta 5 marcas 'redondas' (1, 2, 2.5 o 5 x 10^n) que cubren 0..maximo con un 15% de margen."""
+        maximo = maximo * 1.15 if maximo > 0 else 1
+        paso = 10 ** np.floor(np.log10(maximo / 4))
+        paso = next(paso * f for f in (1, 2, 2.5, 5, 10) if maximo / (paso * f) <= 4)
+        return [paso * i for i in range(int(np.ceil(maximo / paso)) + 1)]
+
+    @staticmethod
+    def _abreviar(valor):
+        for divisor, sufijo in ((1e6, "M"), (1e3, "k")):
+            if abs(valor) >= divisor:
+                return f"{valor / divisor:.3g}{sufijo}"
+        return f"{valor:.3g}"
+
+    def _dibujar_subgrafico(self, subgrafico, area):
+        """Dibuja un subgráfico en 'area' (izquierda, arriba, derecha, abajo); retorna los límites del eje X."""
+        canvas = self.canvas
+        izquierda, arriba, derecha, abajo = area
+        barras = subgrafico.get("barras", [])
+        lineas = subgrafico.get("lineas", [])
+        cantidad = len(barras[0]["valores"]) if barras else 0
+
+        if barras:
+            xlim = (-0.5, cantidad - 0.5)
+        elif subgrafico.get("xlim"):
+            xlim = subgrafico["xlim"]
+        else:
+            todos_x = [x for linea in lineas for x in linea["x"]]
+            xlim = (min(todos_x, default=0) - 1, max(todos_x, default=0) + 1)
+        maximo = max([v for serie in barras for v in serie["valores"]] +
+                     [v for linea in lineas for v in linea["y"]], default=0)
+        marcas_y = self._marcas_eje_y(maximo)
+        tope = marcas_y[-1]
+
+        def px(x):
+            return izquierda + (x - xlim[0]) / (xlim[1] - xlim[0]) * (derecha - izquierda)
+
+        def py(y):
+            return abajo - y / tope * (abajo - arriba)
+
+        opciones = {"tags": "grafico"}
+        for marca in marcas_y:
+            canvas.create_line(izquierda, py(marca), derecha, py(marca), fill="#e6e6e6", **opciones)
+            canvas.create_text(izquierda - 4, py(marca), text=self._abreviar(marca), anchor="e", font=("Arial", 8), **opciones)
+        canvas.create_rectangle(izquierda, arriba, derecha, abajo, outline="#999999", **opciones)
+        canvas.create_text((izquierda + derecha) / 2, arriba - 4, text=subgrafico.get("titulo", ""), anchor="s",
+                           font=("Arial", 9, "bold"), **opciones)
+        if subgrafico.get("etiqueta_y"):
+            canvas.create_text(12, (arriba + abajo) / 2, text=subgrafico["etiqueta_y"], angle=90, font=("Arial", 8), **opciones)
+        if subgrafico.get("etiqueta_x"):
+            canvas.create_text((izquierda + derecha) / 2, abajo + 18, text=subgrafico["etiqueta_x"], anchor="n",
+                               font=("Arial", 8), **opciones)
+
+        # Barras (varias series = agrupadas, una al lado de la otra dentro de cada categoría)
+        ancho_barra = 0.8 / max(len(barras), 1)
+        for k, serie in enumerate(barras):
+            colores = serie["color"] if isinstance(serie["color"], (list, tuple)) else [serie["color"]] * cantidad
+            for j, valor in enumerate(serie["valores"]):
+                if valor > 0:
+                    x0 = j - 0.4 + k * ancho_barra
+                    canvas.create_rectangle(px(x0), py(valor), px(x0 + ancho_barra), abajo, fill=colores[j],
+                                            outline="", **opciones)
+
+        # Etiquetas del eje X: categorías, posiciones marcadas o fechas
+        if subgrafico.get("categorias"):
+            etiquetas = list(enumerate(subgrafico["categorias"]))
+        elif subgrafico.get("marcas"):
+            etiquetas = [(marca, str(marca)) for marca in subgrafico["marcas"]]
+        elif subgrafico.get("fechas"):
+            largo = 7 if xlim[1] - xlim[0] > 120 else 10 # AAAA-MM para rangos largos
+            etiquetas = [(dia, str(np.datetime64(int(dia), 'D'))[:largo]) for dia in np.linspace(xlim[0] + 1, xlim[1] - 1, 6)]
+        else:
+            etiquetas = []
+        for x, etiqueta in etiquetas:
+            canvas.create_text(px(x), abajo + 3, text=etiqueta, anchor="n", font=("Arial", 8), **opciones)
+
+        for linea in lineas:
+            puntos = []
+            for x, y in zip(linea["x"], linea["y"]):
+                if linea.get("escalonada"):
+                    puntos += [px(x - 0.5), py(y), px(x + 0.5), py(y)]
+                else:
+                    puntos += [px(x), py(y)]
+            if len(puntos) >= 4:
+                canvas.create_line(*puntos, fill=linea["color"], width=1.5, **opciones)
+
+        # Leyenda arriba a la derecha, dentro del área
+        y_leyenda = arriba + 8
+        for elemento in barras + lineas:
+            if not elemento.get("etiqueta"):
+                continue
+            texto = canvas.create_text(derecha - 6, y_leyenda, text=elemento["etiqueta"], anchor="e", font=("Arial", 8), **opciones)
+            x1 = canvas.bbox(texto)[0]
+            color = elemento["color"] if isinstance(elemento["color"], str) else elemento["color"][0]
+            canvas.create_rectangle(x1 - 14, y_leyenda - 4, x1 - 4, y_leyenda + 4, fill=color, outline="", **opciones)
+            y_leyenda += 14
+
+        if subgrafico.get("aviso"):
+            canvas.create_text((izquierda + derecha) / 2, (arriba + abajo) / 2, text=subgrafico["aviso"],
+                               fill="gray", font=("Arial", 12), **opciones)
+        return xlim
+
+
+class PanelGraficoMatplotlib(PanelGrafico):
+    """
+    Motor de alta calidad: la figura de matplotlib se crea una sola vez y en el hilo de
+    dibujo solo cambian las alturas de las barras, las etiquetas y los límites de los ejes;
+    la imagen dibujada con Agg se muestra en el tk.Canvas. matplotlib se importa recién al
+    crear el primer panel con este motor.
+    """
+
+    def __init__(self, contenedor, titulo, tamano, al_cambiar_tamano):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        super().__init__(contenedor, titulo, tamano, al_cambiar_tamano)
+        self.figura = Figure(figsize=(tamano[0] / 100, tamano[1] / 100), dpi=100, layout="tight")
+        self.lienzo = FigureCanvasAgg(self.figura)
+        self._item_imagen = self.canvas.create_image(0, 0, anchor="nw")
+        self._foto = None
+        self._estructura = None
+        self.ejes = []
+        self.barras = {}
+        self.lineas = {}
+        self._avisos = {}
+
+    def generar(self, describir, tamano, comunes):
+        descripcion = describir(comunes)
+        ancho, alto = tamano
+        self.figura.set_size_inches(ancho / self.figura.dpi, alto / self.figura.dpi)
+        # Las barras se crean una sola vez; solo se recrean si cambia la forma del gráfico
+        estructura = [(len(s.get("barras", [])), len(s["barras"][0]["valores"]) if s.get("barras") else 0,
+                       len(s.get("lineas", []))) for s in descripcion["subgraficos"]]
+        if estructura != self._estructura:
+            self._crear_ejes(descripcion)
+            self._estructura = estructura
+        for i, (ax, subgrafico) in enumerate(zip(self.ejes, descripcion["subgraficos"])):
+            self._actualizar_ejes(i, ax, subgrafico)
+        self.lienzo.draw()
+
+        # Área de los primeros ejes en píxeles del canvas (matplotlib cuenta Y desde abajo, Tk desde arriba)
+        izquierda, abajo, derecha, arriba = self.ejes[0].bbox.extents
+        info = {"tamano": tamano, "area": (izquierda, alto - arriba, derecha, alto - abajo),
+                "xlim": self.ejes[0].get_xlim(), "serie": descripcion.get("serie"), "texto": descripcion.get("texto")}
+        return ImagenGrafico(imagen_ppm(self.lienzo), ancho, alto, info)
+
+    def _mostrar(self, imagen):
+        self._foto = tk.PhotoImage(data=imagen.ppm, format="ppm")
+        self.canvas.itemconfig(self._item_imagen, image=self._foto)
+        return imagen.info
+
+    def _crear_ejes(self, descripcion):
+        import matplotlib.dates as mdates
+
+        self.figura.clear()
+        self.ejes, self.barras, self.lineas, self._avisos = [], {}, {}, {}
+        subgraficos = descripcion["subgraficos"]
+        for i, subgrafico in enumerate(subgraficos):
+            ax = self.figura.add_subplot(len(subgraficos), 1, i + 1)
+            barras = subgrafico.get("barras", [])
+            ancho_barra = 0.8 / max(len(barras), 1)
+            for k, serie in enumerate(barras):
+                posiciones = [j - 0.4 + (k + 0.5) * ancho_barra for j in range(len(serie["valores"]))]
+                self.barras[i, k] = ax.bar(posiciones, [0] * len(posiciones), width=ancho_barra,
+                                           color=serie["color"], label=serie.get("etiqueta"))
+            if barras:
+                ax.set_xlim(-0.5, len(barras[0]["valores"]) - 0.5)
+            for k, linea in enumerate(subgrafico.get("lineas", [])):
+                self.lineas[i, k], = ax.plot([], [], color=linea["color"], linewidth=1.2, label=linea.get("etiqueta"),
+                                             drawstyle="steps-mid" if linea.get("escalonada") else "default")
+            if subgrafico.get("fechas"):
+                localizador = mdates.AutoDateLocator()
+                ax.xaxis.set_major_locator(localizador)
+                ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(localizador))
+            if subgrafico.get("etiqueta_x"):
+                ax.set_xlabel(subgrafico["etiqueta_x"])
+            if subgrafico.get("etiqueta_y"):
+                ax.set_ylabel(subgrafico["etiqueta_y"])
+            if any(e.get("etiqueta") for e in barras + subgrafico.get("lineas", [])):
+                ax.legend(loc="upper right", fontsize=8)
+            self._avisos[i] = ax.text(0.5, 0.5, "", transform=ax.transAxes, ha="center", va="center",
+                                      fontsize=12, color="gray", visible=False)
+            self.ejes.append(ax)
+
+    def _actualizar_ejes(self, i, ax, subgrafico):
+        ax.set_title(subgrafico.get("titulo", ""))
+        maximo = 0
+        for k, serie in enumerate(subgrafico.get("barras", [])):
+            colores = serie["color"] if isinstance(serie["color"], (list, tuple)) else [serie["color"]] * len(serie["valores"])
+            for barra, altura, color in zip(self.barras[i, k], serie["valores"], colores):
+                barra.set_height(altura)
+                barra.set_color(color)
+            maximo = max([maximo, *serie["valores"]])
+        for k, linea in enumerate(subgrafico.get("lineas", [])):
+            self.lineas[i, k].set_data(linea["x"], linea["y"])
+            maximo = max([maximo, *linea["y"]])
+        if subgrafico.get("xlim"):
+            ax.set_xlim(*subgrafico["xlim"])
+        if subgrafico.get("categorias"):
+            ax.set_xticks(range(len(subgrafico["categorias"])))
+            ax.set_xticklabels(subgrafico["categorias"])
+        elif subgrafico.get("marcas"):
+            ax.set_xticks(list(subgrafico["marcas"]))
+        ax.set_ylim(0, maximo * 1.15 if maximo else 1)
+        self._avisos[i].set_text(subgrafico.get("aviso") or "")
+        self._avisos[i].set_visible(bool(subgrafico.get("aviso")))
+
+
+class MapaCalorVentas:
+    """
+    Mapa de calor de las ventas del día: un bloque de 10x10 números por sorteo, coloreado
+    según el premio potencial. Los 800 ítems del tk.Canvas se crean una sola vez; en cada
+    venta se compara el tono nuevo de las 400 celdas con el anterior y solo se repintan las
+    que cambiaron (normalmente una sola).
+    """
+
+    COLORES = ("#f0f0f0", "#fff3b0", "#ffd54f", "#ffb300", "#fb8c00", "#f4511e", "#d32f2f", "#8e0000")
+    LADO_MAXIMO = 28
+
+    def __init__(self, contenedor, matriz):
+        self.matriz = matriz
+        self.frame = ttk.LabelFrame(contenedor, text="🔥 Mapa de calor del día (premio potencial)")
+        self.canvas = tk.Canvas(self.frame, height=260, bg="white", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True, padx=5, pady=(5, 0))
+        self.detalle = tk.StringVar(value="Pase el mouse sobre un número para ver su apuesta y premio.")
+        ttk.Label(self.frame, textvariable=self.detalle).pack(anchor="w", padx=5, pady=(0, 5))
+
+        forma = matriz.premios.shape
+        self._rectangulos = np.zeros(forma, dtype=np.int64)
+        self._textos = np.zeros(forma, dtype=np.int64)
+        self._por_item = {}
+        self._niveles = np.full(forma, -1, dtype=np.int8)
+        self._titulos = [self.canvas.create_text(0, 0, anchor="sw", font=("Arial", 9, "bold")) for _ in SORTEOS]
+        self._texto_titulos = [None] * len(SORTEOS)
+        for numero in range(forma[0]):
+            for columna in range(forma[1]):
+                rectangulo = self.canvas.create_rectangle(0, 0, 0, 0, outline="white")
+                texto = self.canvas.create_text(0, 0, text=f"{numero:02d}", state="disabled")
+                self._rectangulos[numero, columna] = rectangulo
+                self._textos[numero, columna] = texto
+                self._por_item[rectangulo] = (numero, columna)
+
+        self.canvas.bind("<Configure>", self._ubicar)
+        self.canvas.tag_bind("all", "<Enter>", self._senalar)
+        self.canvas.bind("<Leave>", lambda e: self.detalle.set(""))
+        self.repintar()
+
+    def _ubicar(self, event=None):
+        """Reparte los cuatro bloques (2x2) en el espacio disponible; solo al cambiar de tamaño."""
+        ancho, alto = self.canvas.winfo_width(), self.canvas.winfo_height()
+        separacion, titulo = 12, 16
+        lado = max(6, min((ancho - 3 * separacion) / 20, (alto - 2 * titulo - separacion) / 20, self.LADO_MAXIMO))
+        fuente = ("Arial", max(6, int(lado / 2.6)))
+        for columna, item in enumerate(self._titulos):
+            x0 = separacion + (columna % 2) * (10 * lado + separacion)
+            y0 = titulo + (columna // 2) * (10 * lado + titulo + separacion)
+            self.canvas.coords(item, x0, y0 - 2)
+            for numero in range(self._rectangulos.shape[0]):
+                x = x0 + (numero % 10) * lado
+                y = y0 + (numero // 10) * lado
+                self.canvas.coords(int(self._rectangulos[numero, columna]), x, y, x + lado, y + lado)
+                self.canvas.coords(int(self._textos[numero, columna]), x + lado / 2, y + lado / 2)
+                self.canvas.itemconfig(int(self._textos[numero, columna]), font=fuente)
+
+    def repintar(self):
+        """Aplica los tonos de la matriz a las celdas cuyo nivel cambió y actualiza los totales por sorteo."""
+        niveles = self.matriz.niveles()
+        for numero, columna in np.argwhere(niveles != self._niveles):
+            nivel = int(niveles[numero, columna])
+            self.canvas.itemconfig(int(self._rectangulos[numero, columna]), fill=self.COLORES[nivel])
+            self.canvas.itemconfig(int(self._textos[numero, columna]), fill="white" if nivel >= 5 else "black")
+        self._niveles = niveles
+        for i, (sorteo, (apuesta, _)) in enumerate(self.matriz.totales_por_sorteo().items()):
+            titulo = f"{sorteo}  ·  {formatear_cordobas(apuesta)}"
+            if titulo != self._texto_titulos[i]:
+                self._texto_titulos[i] = titulo
+                self.canvas.itemconfig(self._titulos[i], text=titulo)
+
+    def sumar_venta(self, numero, sorteo, apuesta, premio):
+        self.matriz.sumar(numero, sorteo, apuesta, premio)
+        self.repintar()
+
+    def recargar(self):
+        """Relee las ventas del día (después de importar o sincronizar con otras terminales)."""
+        self.matriz.cargar()
+        self.repintar()
+
+    def _senalar(self, event):
+        celda = self._por_item.get(next(iter(self.canvas.find_withtag("current")), None))
+        if celda is None:
+            return
+        numero, columna = celda
+        apuesta, premio = self.matriz.celda(numero, SORTEOS[columna])
+        self.detalle.set(f"Número {numero:02d} · {SORTEOS[columna]}: apuesta {formatear_cordobas(apuesta)}, "
+                         f"premio potencial {formatear_cordobas(premio)}")
+
+
 # --- Clase Principal de la Aplicación GUI con Pestañas ---
 
 class AppLoteria:
@@ -1122,6 +695,24 @@ class AppLoteria:
         self.update_top_info()
 
 
+        # Cola de exportaciones/impresiones en segundo plano (no bloquea la venta)
+        self.cola_trabajos = ColaTrabajos()
+        # Mantenimiento, archivado, relleno y sincronización corren en otro hilo: no demoran
+        # las exportaciones ni se cancelan con su botón, pero publican en la misma cola de eventos
+        self.cola_fondo = ColaTrabajos(self.cola_trabajos.eventos, nombre="ColaFondo")
+        # Resultados tipados que respaldan las exportaciones del resumen y de ganadores
+        self.datos_resumen = TablaColumnar(COLUMNAS_RESUMEN_VENTAS)
+        self.datos_ganadores = TablaColumnar(COLUMNAS_GANADORES)
+
+        # Todas las tareas periódicas del hilo de Tk pasan por aquí (ver Configuración > Diagnóstico)
+        self.planificador = PlanificadorTk(self.root)
+
+        # ui_configuracion se lee una sola vez; sashes y anchos de columnas se guardan en
+        # bloque tras un rato sin cambios y al salir
+        self.config_ui = ConfiguracionUI().cargar()
+        self._espera_guardado_diseno = None
+        atexit.register(self.config_ui.vaciar)
+
         # Crear el widget Notebook (pestañas)
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(padx=10, pady=(5, 10), fill="both", expand=True)
@@ -1160,6 +751,33 @@ class AppLoteria:
         self.report_data = [] # Esto almacenará la lista de tuplas (numero, apuesta_total, premio_total, fecha, sorteo)
         self.report_type_data = "Ventas" # Para saber si el reporte actual es de Ventas o Ganadores
 
+        # Atender los eventos de la cola de trabajos desde el hilo de Tk (también minimizada,
+        # para que las sincronizaciones y el mantenimiento terminados liberen su lugar)
+        self.planificador.registrar("Eventos de trabajos", EVENTOS_TRABAJOS_INTERVALO_MS, self._procesar_eventos_trabajos,
+                                    pausar_minimizado=False, jitter=0)
+
+        # Sorteo en curso según la hora del sistema
+        self.planificador.registrar("Sorteo automático", SORTEO_AUTOMATICO_INTERVALO_MS,
+                                    self._verificar_sorteo_venta_automatico, demora_inicial_ms=5000)
+
+        # Sincronización periódica con las demás terminales (si hay carpeta configurada)
+        self._trabajo_sincronizacion = None
+        self.planificador.registrar("Sincronización de terminales", SINCRONIZACION_INTERVALO_MS,
+                                    self._sincronizacion_periodica, pausar_minimizado=False)
+
+        # Mantenimiento nocturno de la base (después del sorteo de las 09 PM)
+        self._trabajo_mantenimiento = None
+        self.planificador.registrar("Mantenimiento de la base", MANTENIMIENTO_VERIFICACION_MS,
+                                    self._verificar_mantenimiento, pausar_minimizado=False)
+
+        # Latido del bucle de Tk: un hilo vigilante registra qué manejador congela la interfaz
+        self.vigilante_bucle = VigilanteBucle().iniciar()
+        self.planificador.registrar("Latido de la interfaz", LATIDO_MS, self.vigilante_bucle.latir,
+                                    pausar_minimizado=False, jitter=0)
+
+        # Consulta automática de los resultados en la web después de cada sorteo
+        self.sondeo_resultados = SondeoResultados(self.cola_trabajos.eventos).iniciar()
+
 
     def eliminar_ultima_venta_gui(self):
         confirmado = messagebox.askyesno("Confirmar", "¿Estás seguro de que deseas eliminar la última venta registrada?")
@@ -1167,39 +785,32 @@ class AppLoteria:
             exito, mensaje = eliminar_ultima_venta_valida_db()
             self.lbl_estado.config(text=mensaje)
             self.actualizar_estado_ganadores_ventas()  # Si quieres refrescar también los datos
+            if exito:
+                self.mapa_ventas.recargar() # El mapa de calor sumaba la venta eliminada
 
 
     def actualizar_resumen_ventas_dia(self):
         """Actualiza el Treeview con el resumen de ventas agrupadas por número y sorteo, según filtros."""
         self.tree_historial_resumen.delete(*self.tree_historial_resumen.get_children())
-        
-        
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
+        self.datos_resumen = TablaColumnar(COLUMNAS_RESUMEN_VENTAS)
+
         ahora = datetime.now()
 
         # Obtener filtros desde la UI
         periodo = self.periodo_resumen_var.get()
         sorteo = self.sorteo_resumen_var.get()
 
-        where = []
-        params = []
-
         # ⬇️ Asegurar que siempre existan
         fecha_ini = fecha_fin = ahora.strftime('%Y-%m-%d')
+        desde = hasta = None # Rango de la consulta (None es sin límite)
 
         if periodo == "diario":
-            hoy_str = datetime.now().strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia = ?")
-            params.append(hoy_str)
-
-
+            desde, hasta = fecha_ini, fecha_fin
 
         elif periodo == "semanal":
             fecha_ini = (ahora - timedelta(days=ahora.weekday())).strftime('%Y-%m-%d')
             fecha_fin = ahora.strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia >= ?")
-            params.append(fecha_ini)
+            desde, hasta = fecha_ini, None
 
         elif periodo == "mensual":
             mes_map = {
@@ -1212,49 +823,28 @@ class AppLoteria:
             anio = self.anio_resumen_var.get()
             fecha_ini = f"{anio}-{mes}-01"
             fecha_fin = f"{anio}-{mes}-31"
-            where.append("venta_fecha_solo_dia LIKE ?")
-            params.append(f"{anio}-{mes}-%")
+            desde, hasta = fecha_ini, fecha_fin
 
         elif periodo == "por período":
             fecha_ini = self.fecha_ini_entry_resumen.get_date().strftime("%Y-%m-%d")
             fecha_fin = self.fecha_fin_entry_resumen.get_date().strftime("%Y-%m-%d")
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_ini, fecha_fin])
-
-        if sorteo != "Todos":
-            where.append("sorteo_hora = ?")
-            params.append(sorteo)
-
-        query = '''
-            SELECT 
-                numero_loteria,
-                SUM(apuesta),
-                SUM(premio_potencial),
-                sorteo_hora
-            FROM ventas
-        '''
-
-        if where:
-            query += " WHERE " + " AND ".join(where)
+            desde, hasta = fecha_ini, fecha_fin
 
-        query += '''
-            GROUP BY numero_loteria, sorteo_hora
-            ORDER BY SUM(premio_potencial) DESC, sorteo_hora ASC
-        '''
-
-        cursor.execute(query, tuple(params))
-        datos = cursor.fetchall()
-        conn.close()
+        # Incluye las ventas de los años archivados
+        datos = obtener_resumen_ventas_db(desde, hasta, None if sorteo == "Todos" else sorteo)
 
         if not datos:
             self.tree_historial_resumen.insert("", "end", values=("🕵️", "Sin datos en este período", "", ""))
             return
 
+        # Se conserva el resultado tipado para exportar sin releer el Treeview
+        self.datos_resumen.extender(datos)
+
         for numero, total_apuesta, total_premio, sorteo_hora in datos:
             self.tree_historial_resumen.insert("", "end", values=(
                 numero,
-                f"C${total_apuesta:,.2f}",
-                f"C${total_premio:,.2f}",
+                formatear_cordobas(total_apuesta),
+                formatear_cordobas(total_premio),
                 sorteo_hora
             ))
 
@@ -1263,58 +853,31 @@ class AppLoteria:
 
 
     def exportar_resumen_pdf(self):
-        from fpdf import FPDF
-        from datetime import datetime
-
-        datos = []
-        for item in self.tree_historial_resumen.get_children():
-            fila = self.tree_historial_resumen.item(item)["values"]
-            if fila and "No hay ventas" not in str(fila[1]):
-                datos.append(fila)
-
-        if not datos:
+        if not self.datos_resumen:
             messagebox.showwarning("Exportar PDF", "No hay datos para exportar.")
             return
 
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Helvetica", 'B', 14)
-            pdf.cell(0, 10, "Resumen de Ventas - Filtros Actuales", ln=True, align="C")
-            pdf.ln(5)
-            pdf.set_font("Helvetica", 'B', 10)
-            col_headers = ["Número", "Apuesta", "Premio", "Sorteo"]
-            col_widths = [30, 40, 40, 30]
-            for i, h in enumerate(col_headers):
-                pdf.cell(col_widths[i], 7, h, border=1, align='C')
-            pdf.ln()
-
-            pdf.set_font("Helvetica", size=10)
-            for fila in datos:
-                for i, col in enumerate(fila):
-                    pdf.cell(col_widths[i], 7, str(col), border=1, align='C')
-                pdf.ln()
-
-            pdf.ln(5)
-            pdf.set_font("Helvetica", 'I', 9)
-            filtro = self.periodo_resumen_var.get().capitalize()
-            pdf.cell(0, 10, f"Exportado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Filtro: {filtro}", ln=True, align="L")
-
-            os.makedirs("Reportes", exist_ok=True)
-            archivo = os.path.join("Reportes", f"Resumen_Ventas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-            pdf.output(archivo)
-            os.startfile(archivo) if sys.platform == "win32" else subprocess.Popen(["xdg-open", archivo])
-            messagebox.showinfo("Exportado", f"Resumen exportado a PDF:\n{archivo}")
+        datos = list(self.datos_resumen.filas())
+        os.makedirs("Reportes", exist_ok=True)
+        archivo = os.path.join("Reportes", f"Resumen_Ventas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+        filtro = self.periodo_resumen_var.get().capitalize()
+        pie = f"Exportado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Filtro: {filtro}"
+
+        self._encolar_exportacion("Resumen de ventas (PDF)", lambda progreso: escribir_pdf_tabla_simple(
+            "Resumen de Ventas - Filtros Actuales",
+            ["Número", "Apuesta", "Premio", "Sorteo"], [30, 40, 40, 30],
+            datos, pie, archivo, progreso,
+            formateadores=[None, formatear_cordobas, formatear_cordobas, None]
+        ))
 
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar:\n{e}")
 
     def actualizar_ganadores_desde_ventas(self):
         fecha = self.fecha_registro_ganador_ventas.get_date().strftime('%Y-%m-%d')
         self.tree_ganadores_ventas.delete(*self.tree_ganadores_ventas.get_children())
 
+        ganadores = obtener_ganadores_fecha(fecha)
         for s in self.sorteo_options_all:
-            numero = consultar_numero_ganador_db(fecha, s)
+            numero = ganadores.get(s)
             if numero:
                 tag = ("confirmado",)
                 texto = numero
@@ -1360,53 +923,18 @@ class AppLoteria:
             messagebox.showerror("Error", mensaje)
 
     def exportar_resumen_excel(self):
-        try:
-            import openpyxl
-            from openpyxl.utils import get_column_letter
-            from openpyxl.styles import Font
-            from datetime import datetime
-
-            filas = []
-            for item in self.tree_historial_resumen.get_children():
-                valores = self.tree_historial_resumen.item(item)["values"]
-                if valores and "No hay ventas" not in str(valores[1]):
-                    filas.append(valores)
-
-            if not filas:
-                messagebox.showwarning("Exportar", "No hay datos que exportar.")
-                return
-
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Resumen Ventas"
-
-            # Encabezados
-            headers = ["Número", "Apuesta", "Premio", "Sorteo"]
-            ws.append(headers)
-
-            for col in range(1, len(headers)+1):
-                ws.cell(row=1, column=col).font = Font(bold=True)
-
-            for fila in filas:
-                ws.append(fila)
-
-            # Ajustar ancho
-            for i, _ in enumerate(headers, 1):
-                ws.column_dimensions[get_column_letter(i)].width = 18
-
-            os.makedirs("Reportes", exist_ok=True)
-            archivo = os.path.join("Reportes", f"Resumen_Ventas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
-            wb.save(archivo)
-
-            os.startfile(archivo) if sys.platform == "win32" else subprocess.Popen(["xdg-open", archivo])
-            messagebox.showinfo("Exportado", f"Resumen exportado exitosamente:\n{archivo}")
-
-        except ImportError:
-            messagebox.showerror("Error", "Falta el módulo openpyxl.\nEjecutá: pip install openpyxl")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar:\n{e}")
+        if not self.datos_resumen:
+            messagebox.showwarning("Exportar", "No hay datos que exportar.")
+            return
 
+        filas = list(self.datos_resumen.filas())
+        os.makedirs("Reportes", exist_ok=True)
+        archivo = os.path.join("Reportes", f"Resumen_Ventas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
 
+        self._encolar_exportacion("Resumen de ventas (Excel)", lambda progreso: escribir_excel_tabla_simple(
+            "Resumen Ventas", ["Número", "Apuesta", "Premio", "Sorteo"], filas, archivo, progreso,
+            formatos_numero=[None, FORMATO_CORDOBAS_EXCEL, FORMATO_CORDOBAS_EXCEL, None]
+        ))
 
 
     def mostrar_controles_periodo_busqueda(self):
@@ -1453,39 +981,6 @@ class AppLoteria:
             width=12
         )
         self.combo_sorteo_seleccion_venta.grid(row=0, column=1, padx=5, pady=(5, 0), sticky="w")
-        def _verificar_sorteo_venta_automatico():
-            actual_detectado = obtener_sorteo_actual_automatico()
-            sorteo_actual = self.sorteo_var.get()
-
-            if actual_detectado != sorteo_actual:
-                self.sorteo_var.set(actual_detectado)
-                self.actualizar_estado(
-                    f"⏱️ Sorteo actualizado automáticamente a {actual_detectado} según la hora del sistema."
-                )
-
-            self.root.after(60000, _verificar_sorteo_venta_automatico)  # Verifica cada minuto
-
-        self.root.after(5000, _verificar_sorteo_venta_automatico)
-
-        def _verificar_sorteo_venta_automatico():
-            actual_detectado = obtener_sorteo_actual_automatico()
-            sorteo_actual = self.sorteo_var.get()
-
-            if actual_detectado != sorteo_actual:
-                self.sorteo_var.set(actual_detectado)
-                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-                mensaje = f"⏱️ Sorteo actualizado automáticamente a {actual_detectado} según la hora del sistema."
-                self.lbl_estado.config(text=mensaje, bg="#c8e6c9", fg="black")
-                self.frame_estado.config(bg="#c8e6c9")
-
-                # Restaurar color después de 2 segundos
-                self.root.after(2000, lambda: self.frame_estado.config(bg="SystemButtonFace"))
-                self.root.after(2000, lambda: self.lbl_estado.config(bg="SystemButtonFace", fg="black"))
-
-            self.root.after(60000, _verificar_sorteo_venta_automatico)
-
-        self.root.after(5000, _verificar_sorteo_venta_automatico)
-
         # --- Número ---
         ttk.Label(self.frame_venta, text="Número (00-99):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         self.numero_entry = ttk.Entry(self.frame_venta, textvariable=self.numero_var, font=("Arial", 11, "bold"), width=6)
@@ -1719,6 +1214,10 @@ class AppLoteria:
         self.tree_historial_resumen.configure(yscrollcommand=scrollbar_historial.set)
         scrollbar_historial.pack(side="right", fill="y")
 
+        # Mapa de calor del día debajo del resumen: se actualiza celda por celda con cada venta
+        self.mapa_ventas = MapaCalorVentas(historial_frame, MatrizVentasDia().cargar())
+        self.mapa_ventas.frame.grid(row=1, column=0, padx=5, pady=(0, 5), sticky="nsew")
+
         self.frame_estadisticas = ttk.LabelFrame(self.tab_ventas, text="📊 Estadísticas rápidas")
         self.frame_estadisticas.grid(row=99, column=0, columnspan=3, sticky="ew", padx=10, pady=5)
 
@@ -1821,93 +1320,27 @@ class AppLoteria:
 
 
         # --- Lógica de persistencia de posiciones de PanedWindow ---
-        sash_positions_json = cargar_configuracion_ui_db('ventas_paned_sash_positions')
-        if sash_positions_json:
-            try:
-                sash_positions = json.loads(sash_positions_json)
-                if isinstance(sash_positions, list) and len(sash_positions) == len(self.ventas_paned_window.panes()) - 1:
-                    self.root.after(100, lambda: self.aplicar_posiciones_paned(sash_positions))
-            except json.JSONDecodeError as e:
-                print(f"Error al decodificar JSON de posiciones de PanedWindow: {e}")
-
-              
-        # Guardado automático periódico
-        self._ultimas_posiciones_paned = []
-        self._paned_sin_cambios = 0
-
-        def verificar_paned_positions():
-            try:
-                self.root.update_idletasks()
-                total_width = self.ventas_paned_window.winfo_width()
-
-                if total_width <= 1:
-                    print("⏳ PanedWindow aún no tiene ancho, reintentando...")
-                    self.root.after(1000, verificar_paned_positions)
-                    return
-
-                frames = self.ventas_paned_window.panes()
-                if len(frames) < 3:
-                    print("❌ No se detectaron 3 columnas para el paned window.")
-                    self.root.after(1000, verificar_paned_positions)
-                    return
-
-                proporciones = []
-                for frame in frames:
-                    ancho = self.root.nametowidget(frame).winfo_width()
-                    if ancho == 0:
-                        print("⚠️ Uno de los frames tiene ancho 0, reintentando...")
-                        self.root.after(1000, verificar_paned_positions)
-                        return
-                    proporciones.append(round(ancho / total_width, 4))
-
-                # Convertimos proporciones acumuladas en posiciones de sashes
-                posiciones = [round(sum(proporciones[:i+1]), 4) for i in range(len(proporciones) - 1)]
-
-                if posiciones != getattr(self, 'ventas_paned_positions', []):
-                    self.ventas_paned_positions = posiciones
-                    guardar_configuracion_ui_db('ventas_paned_sash_positions', json.dumps(posiciones))
-                    print(f"💾 Posiciones actualizadas del PanedWindow: {posiciones}")
+        sash_positions = self.config_ui.obtener_lista('ventas_paned_sash_positions',
+                                                      largo=len(self.ventas_paned_window.panes()) - 1)
+        if sash_positions:
+            self.root.after(100, lambda: self.aplicar_posiciones_paned(sash_positions))
 
-                self.root.after(1000, verificar_paned_positions)
-
-            except Exception as e:
-                print(f"❌ Error en verificar_paned_positions: {e}")
-                self.root.after(1000, verificar_paned_positions)
+        # Las posiciones se anotan al soltar un sash y se guardan tras un rato sin cambios
+        self.vigilar_sashes(self.ventas_paned_window, 'ventas_paned_sash_positions')
 
 
-    
     def actualizar_estadisticas_ventas(self, fecha_ini=None, fecha_fin=None):
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         if not fecha_ini or not fecha_fin:
             fecha_ini = fecha_fin = datetime.now().strftime("%Y-%m-%d")
 
-        # Total vendido
-        cursor.execute("""
-            SELECT SUM(apuesta) FROM ventas
-            WHERE venta_fecha_solo_dia BETWEEN ? AND ?
-        """, (fecha_ini, fecha_fin))
-        total = cursor.fetchone()[0] or 0
+        # Total vendido y número más vendido (incluye los años archivados)
+        total, fila = obtener_totales_ventas_db(fecha_ini, fecha_fin)
         self.label_total_vendido.config(text=f"Total vendido: C$ {total:,.2f}")
-
-        # Número más vendido
-        cursor.execute("""
-            SELECT numero_loteria, COUNT(*) as cantidad
-            FROM ventas
-            WHERE venta_fecha_solo_dia BETWEEN ? AND ?
-            GROUP BY numero_loteria
-            ORDER BY cantidad DESC
-            LIMIT 1
-        """, (fecha_ini, fecha_fin))
-        fila = cursor.fetchone()
         if fila:
             self.label_numero_mas_vendido.config(text=f"Número más vendido: {fila[0]} ({fila[1]} veces)")
         else:
             self.label_numero_mas_vendido.config(text="Número más vendido: -")
 
-        conn.close()
-
     
     
     def mostrar_controles_dinamicos_resumen(self, *args):
@@ -1959,14 +1392,14 @@ class AppLoteria:
 
         # Calculamos los sashes como suma acumulada
         posiciones = [round(sum(proporciones[:i+1]), 4) for i in range(len(proporciones) - 1)]
-        guardar_configuracion_ui_db('ventas_paned_sash_positions', json.dumps(posiciones))
+        self._guardar_configuracion_ui('ventas_paned_sash_positions', posiciones)
         print(f"💾 Distribución manual guardada (con widths): {posiciones}")
         messagebox.showinfo("Distribución Guardada", f"✅ Distribución guardada:\n{posiciones}")
 
 
     def restaurar_distribucion_predeterminada(self):
         predeterminado = [0.25, 0.65]  # Ajusta estos valores si quieres un layout diferente
-        guardar_configuracion_ui_db('ventas_paned_sash_positions', json.dumps(predeterminado))
+        self._guardar_configuracion_ui('ventas_paned_sash_positions', predeterminado)
         self.aplicar_posiciones_paned(predeterminado)
         messagebox.showinfo("Distribución Restaurada", "♻️ Distribución predeterminada aplicada.")
 
@@ -2007,7 +1440,7 @@ class AppLoteria:
             except Exception as e:
                 print(f"⚠️ No se pudo obtener sash {i}: {e}")
 
-        guardar_configuracion_ui_db('ventas_paned_sash_positions', json.dumps(positions))
+        self._guardar_configuracion_ui('ventas_paned_sash_positions', positions)
 
 
     def persistir_anchos_treeview(self, treeview_widget, clave_sqlite, columnas):
@@ -2018,38 +1451,72 @@ class AppLoteria:
         - columnas: lista de nombres de columnas que deseas persistir
         """
         # 1. Restaurar
-        anchos_guardados = cargar_configuracion_ui_db(clave_sqlite)
-        if anchos_guardados:
-            try:
-                datos = json.loads(anchos_guardados)
-                for col in columnas:
-                    if col in datos:
-                        treeview_widget.column(col, width=datos[col])
-            except Exception as e:
-                print(f"❌ Error al restaurar columnas {clave_sqlite}: {e}")
+        anchos_guardados = self.config_ui.obtener_anchos(clave_sqlite)
+        for col in columnas:
+            if col in anchos_guardados:
+                treeview_widget.column(col, width=anchos_guardados[col])
 
-        # 2. Variables internas para monitoreo
-        treeview_widget._ultimos_anchos = {col: treeview_widget.column(col)["width"] for col in columnas}
-        treeview_widget._ciclos_sin_cambios = 0
+        # 2. Guardar solo cuando se suelta el separador de un encabezado tras arrastrarlo
+        ultimos = {col: treeview_widget.column(col)["width"] for col in columnas}
+        en_separador = [False]
 
-        def verificar():
-            try:
-                nuevos = {col: treeview_widget.column(col)["width"] for col in columnas}
-                if nuevos != treeview_widget._ultimos_anchos:
-                    guardar_configuracion_ui_db(clave_sqlite, json.dumps(nuevos))
-                    treeview_widget._ultimos_anchos = nuevos
-                    treeview_widget._ciclos_sin_cambios = 0
-                    print(f"💾 Anchos guardados para {clave_sqlite}: {nuevos}")
-                else:
-                    treeview_widget._ciclos_sin_cambios += 1
+        def al_presionar(event):
+            en_separador[0] = treeview_widget.identify_region(event.x, event.y) == "separator"
 
-                if treeview_widget._ciclos_sin_cambios < 20:
-                    self.root.after(1000, verificar)
-            except Exception as e:
-                print(f"❌ Error al verificar cambios en columnas {clave_sqlite}: {e}")
+        def al_soltar(event):
+            if not en_separador[0]:
+                return
+            en_separador[0] = False
+            nuevos = {col: treeview_widget.column(col)["width"] for col in columnas}
+            if nuevos != ultimos:
+                ultimos.update(nuevos)
+                self._registrar_diseno(clave_sqlite, nuevos)
 
-        self.root.after(1000, verificar)
-        
+        treeview_widget.bind("<ButtonPress-1>", al_presionar, add="+")
+        treeview_widget.bind("<ButtonRelease-1>", al_soltar, add="+")
+
+
+    def vigilar_sashes(self, paned_widget, clave_sqlite):
+        """Anota las posiciones de los sashes (como fracción del ancho) cada vez que se suelta uno."""
+        def al_soltar(event):
+            posiciones = self._medir_sashes(paned_widget)
+            if posiciones:
+                self._registrar_diseno(clave_sqlite, posiciones)
+
+        paned_widget.bind("<ButtonRelease-1>", al_soltar, add="+")
+
+
+    def _medir_sashes(self, paned_widget):
+        """Posiciones de los sashes como fracción del ancho, o None si el PanedWindow todavía no tiene tamaño."""
+        total_width = paned_widget.winfo_width()
+        panes = paned_widget.panes()
+        if total_width <= 1 or len(panes) < 2:
+            return None
+        return [round(paned_widget.sashpos(i) / total_width, 4) for i in range(len(panes) - 1)]
+
+
+    def _registrar_diseno(self, clave, valor):
+        """Anota un cambio de distribución y (re)programa su guardado para cuando se deje de mover."""
+        if not self.config_ui.guardar(clave, valor):
+            return
+        if self._espera_guardado_diseno:
+            self.root.after_cancel(self._espera_guardado_diseno)
+        self._espera_guardado_diseno = self.root.after(DISENO_ESPERA_GUARDADO_MS, self._vaciar_diseno)
+
+
+    def _vaciar_diseno(self):
+        self._espera_guardado_diseno = None
+        guardadas = self.config_ui.vaciar()
+        if guardadas:
+            print(f"💾 Distribución guardada ({guardadas} cambio(s)).")
+
+
+    def _guardar_configuracion_ui(self, clave, valor):
+        """Guardado explícito (botones y preferencias de Configuración): se escribe ya, junto con lo que hubiera pendiente."""
+        self.config_ui.guardar(clave, valor)
+        if self._espera_guardado_diseno:
+            self.root.after_cancel(self._espera_guardado_diseno)
+        self._vaciar_diseno()
 
 
     def guardar_sashes_generico(self, paned_widget, clave_sqlite, nombre_amigable="Panel"):
@@ -2069,13 +1536,13 @@ class AppLoteria:
                 print(f"⚠️ Error al medir '{frame_id}': {e}")
 
         posiciones = [round(sum(proporciones[:i+1]), 4) for i in range(len(proporciones) - 1)]
-        guardar_configuracion_ui_db(clave_sqlite, json.dumps(posiciones))
+        self._guardar_configuracion_ui(clave_sqlite, posiciones)
         print(f"💾 Sashes guardadas para '{clave_sqlite}': {posiciones}")
         messagebox.showinfo("Distribución Guardada", f"✅ Distribución de {nombre_amigable} guardada:\n{posiciones}")
 
 
     def restaurar_sashes_generico(self, paned_widget, clave_sqlite, posiciones_por_defecto=[0.3, 0.7], nombre_amigable="Panel"):
-        guardar_configuracion_ui_db(clave_sqlite, json.dumps(posiciones_por_defecto))
+        self._guardar_configuracion_ui(clave_sqlite, posiciones_por_defecto)
         self.aplicar_posiciones_sashes(paned_widget, clave_sqlite)
         messagebox.showinfo("Distribución Restaurada", f"♻️ Distribución de {nombre_amigable} restaurada.")
 
@@ -2083,14 +1550,13 @@ class AppLoteria:
     def aplicar_posiciones_sashes(self, paned_widget, clave_sqlite):
         self.root.update_idletasks()
         total_width = paned_widget.winfo_width()
-        sash_json = cargar_configuracion_ui_db(clave_sqlite)
+        posiciones = self.config_ui.obtener_lista(clave_sqlite)
 
-        if not sash_json or total_width <= 1:
+        if not posiciones or total_width <= 1:
             print(f"⏳ No hay posiciones para '{clave_sqlite}' o el ancho es insuficiente.")
             return
 
         try:
-            posiciones = json.loads(sash_json)
             for i, frac in enumerate(posiciones):
                 x = int(frac * total_width)
                 paned_widget.sashpos(i, x)
@@ -2109,12 +1575,7 @@ class AppLoteria:
         cursor = conn.cursor()
 
         try:
-            cursor.execute('''
-                SELECT COUNT(*), SUM(apuesta), SUM(premio_potencial), MAX(fecha_hora)
-                FROM ventas
-                WHERE numero_loteria = ?
-            ''', (numero,))
-            total_ventas = cursor.fetchone()
+            total_ventas = obtener_totales_numero_db(numero) # Incluye los años archivados
 
             cursor.execute('''
                 SELECT COUNT(*) FROM resultados_sorteo WHERE numero_ganador = ?
@@ -2149,6 +1610,34 @@ class AppLoteria:
             messagebox.showerror("Error", "Tema no válido.")
 
 
+    def mostrar_tiempos_tareas(self):
+        """Cuánto tiempo del hilo de la interfaz consumió cada tarea periódica desde que se abrió la aplicación."""
+        messagebox.showinfo("Tareas periódicas", self.planificador.describir_estadisticas())
+
+
+    def mostrar_bloqueos_interfaz(self):
+        """Últimos momentos en que la interfaz dejó de responder y el manejador que la ocupaba."""
+        messagebox.showinfo("Bloqueos de la interfaz", self.vigilante_bucle.describir())
+
+
+    def cambiar_motor_graficos(self):
+        """Guarda el motor elegido y vuelve a crear los paneles de la pestaña Gráficos con él."""
+        nuevo = next(motor for motor, nombre in MOTORES_GRAFICOS.items() if nombre == self.motor_graficos_var.get())
+        if nuevo == self.motor_graficos:
+            return
+        self.motor_graficos = nuevo
+        self._guardar_configuracion_ui("motor_graficos", nuevo)
+        habia_graficos = bool(self.paneles_graficos)
+        for panel in self.paneles_graficos.values():
+            panel.frame.destroy()
+        self.paneles_graficos.clear()
+        if habia_graficos:
+            self.actualizar_graficos_filtrados()
+        # Si matplotlib no está instalado, _panel_grafico vuelve a Tk
+        self.motor_graficos_var.set(MOTORES_GRAFICOS[self.motor_graficos])
+        messagebox.showinfo("Motor de Gráficos", f"Los gráficos se dibujan con {MOTORES_GRAFICOS[self.motor_graficos]}.")
+
+
     def crear_widgets_tab_graficos(self):
         # --- Panel de Filtros y Visibilidad ---
         filtros_frame = ttk.LabelFrame(self.tab_graficos, text="Controles de Visualización y Filtros")
@@ -2183,12 +1672,27 @@ class AppLoteria:
 
         # Guardar referencia al frame donde se dibujarán los gráficos
         self.graficos_container = scrollable_frame
+        self.paneles_graficos = {} # clave -> PanelGrafico, creados la primera vez que se muestran
+        self.motor_graficos = self.config_ui.obtener_texto("motor_graficos", "tk")
+        if self.motor_graficos not in MOTORES_GRAFICOS:
+            self.motor_graficos = "tk"
+        # clave -> (título, tamaño inicial en píxeles, datos(agregados, desde, hasta) -> descripción del gráfico)
+        self.definiciones_graficos = {
+            "top5": ("Top 5", (600, 300), self._datos_top5),
+            "sorteos": ("Sorteos", (600, 300), self._datos_sorteos),
+            "apuestas_vs_premios": ("Apuestas vs Premios", (600, 300), self._datos_apuestas_vs_premios),
+            "estadisticas": ("Estadísticas de Números Ganadores", (1000, 500), self._datos_estadisticas),
+            "tendencias": ("Tendencia de Apuestas y Premios", (1000, 300), self._datos_tendencias),
+        }
+        self.filtros_graficos = (None, None)
+        # Los gráficos se preparan fuera del hilo de Tk y llegan por la cola de eventos
+        self.renderizador_graficos = RenderizadorGraficos(self.cola_trabajos.eventos)
 
 
         # Tipo de período
         self.tipo_periodo_graficos = tk.StringVar(value="diario")
         ttk.Label(filtros_frame, text="Tipo de Período:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        periodo_combo = ttk.Combobox(filtros_frame, textvariable=self.tipo_periodo_graficos, values=["Diario", "Semanal", "Mensual", "Por fecha"], state="readonly", width=12)
+        periodo_combo = ttk.Combobox(filtros_frame, textvariable=self.tipo_periodo_graficos, values=["Diario", "Semanal", "Mensual", "Por fecha", "Todo el historial"], state="readonly", width=14)
         periodo_combo.grid(row=0, column=1, padx=5, pady=5)
         #self.tipo_periodo_graficos.trace_add("write", lambda *args: mostrar_controles_dinamicos())
 
@@ -2243,14 +1747,24 @@ class AppLoteria:
         self.ver_top5 = tk.BooleanVar(value=True)
         self.ver_sorteos = tk.BooleanVar(value=True)
         self.ver_apuestas_vs_premios = tk.BooleanVar(value=True)
+        self.ver_estadisticas = tk.BooleanVar(value=True)
+        self.ver_tendencias = tk.BooleanVar(value=True)
         ttk.Label(filtros_frame, text="Gráficos a Mostrar:").grid(row=0, column=2, padx=10, sticky="e")
         ttk.Checkbutton(filtros_frame, text="Top 5", variable=self.ver_top5).grid(row=0, column=3, padx=2)
         ttk.Checkbutton(filtros_frame, text="Sorteos", variable=self.ver_sorteos).grid(row=0, column=4, padx=2)
         ttk.Checkbutton(filtros_frame, text="Apuestas vs Premios", variable=self.ver_apuestas_vs_premios).grid(row=0, column=5, padx=2)
+        ttk.Checkbutton(filtros_frame, text="Estadísticas de Números", variable=self.ver_estadisticas).grid(row=0, column=6, padx=2)
+        ttk.Checkbutton(filtros_frame, text="Tendencias", variable=self.ver_tendencias).grid(row=0, column=7, padx=2)
+
+        # Agrupación de la serie del gráfico de tendencias
+        self.granularidad_tendencia = tk.StringVar(value="Semanal")
+        ttk.Label(filtros_frame, text="Tendencia:").grid(row=1, column=6, padx=2, sticky="e")
+        ttk.Combobox(filtros_frame, textvariable=self.granularidad_tendencia, values=["Diaria", "Semanal", "Mensual"],
+                     state="readonly", width=10).grid(row=1, column=7, padx=2, pady=2)
 
         # Botón para aplicar filtros
         btn_aplicar_filtros = ttk.Button(filtros_frame, text="Aplicar Filtros", style="Accent.TButton", command=self.actualizar_graficos_filtrados)
-        btn_aplicar_filtros.grid(row=0, column=6, padx=10)
+        btn_aplicar_filtros.grid(row=0, column=8, padx=10)
 
         
         # Además, asegurate de que cualquier cambio en el combobox actualice los controles
@@ -2260,10 +1774,7 @@ class AppLoteria:
 
 
     def actualizar_graficos_filtrados(self):
-            # ✅ Limpiar todos los gráficos previos del contenedor con scroll
-            for widget in self.graficos_container.winfo_children():
-                widget.destroy()
-
+            # Los paneles se crean una sola vez; aquí solo se muestran/ocultan y se piden sus imágenes
             tipo = self.tipo_periodo_graficos.get()
             fecha_ini = self.fecha_inicio_var.get()
             fecha_fin = self.fecha_fin_var.get()
@@ -2278,218 +1789,204 @@ class AppLoteria:
             }
             mes_numero = meses_map.get(mes_nombre)
 
-            # --- Gráfico 1 ---
-            if self.ver_top5.get():
-                self.mostrar_top_5(tipo, fecha_ini, fecha_fin, mes_numero, anio)
-
-            # --- Gráfico 2 ---
-            if self.ver_sorteos.get():
-                self.mostrar_sorteos_semanales(tipo, fecha_ini, fecha_fin, mes_numero, anio)
-
-            # --- Gráfico 3 ---
-            if self.ver_apuestas_vs_premios.get():
-                self.mostrar_apuestas_vs_premios(tipo, fecha_ini, fecha_fin, mes_numero, anio)
-
-
-
-    def mostrar_top_5(self, tipo, fecha_ini, fecha_fin, mes, anio):
-        frame = ttk.LabelFrame(self.graficos_container, text="...")
-        frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        fig = plt.Figure(figsize=(6, 3), dpi=100)
-        ax = fig.add_subplot(111)
-        ax.set_title("Top 5 por período seleccionado")
-        ax.set_xlabel("Número")
-        ax.set_ylabel("Total Apostado")
-
-        # Query base adaptada
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        where = []
-        params = []
-
-        if tipo == "diario":
-            hoy = datetime.now().strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia = ?")
-            params.append(hoy)
-        elif tipo == "semanal":
-            lunes = (datetime.now() - timedelta(days=datetime.now().weekday())).strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia >= ?")
-            params.append(lunes)
-        elif tipo == "por_fecha":
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_ini, fecha_fin])
-        elif tipo == "mensual" and mes and anio:
-            fecha_i = f"{anio}-{mes}-01"
-            fecha_f = f"{anio}-{mes}-31"
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_i, fecha_f])
-
-        query = "SELECT numero_loteria, SUM(apuesta) FROM ventas"
-        if where:
-            query += " WHERE " + " AND ".join(where)
-        query += " GROUP BY numero_loteria ORDER BY SUM(apuesta) DESC LIMIT 5"
-
-        cursor.execute(query, tuple(params))
-        data = cursor.fetchall()
-        conn.close()
-
-        if data:
-            numeros, totales = zip(*data)
-            x = range(len(numeros))
-            ax.bar(x, totales, color="#4CAF50")
-            ax.set_xticks(x)
-            ax.set_xticklabels(numeros, rotation=45)
-            fig.subplots_adjust(bottom=0.25)
-
-        else:
-            ax.text(0.5, 0.5, "Sin datos", transform=ax.transAxes, ha="center", va="center", fontsize=12, color="gray")
-
-        canvas = FigureCanvasTkAgg(fig, frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        canvas.draw()
-
-
-
-    def mostrar_sorteos_semanales(self, tipo, fecha_ini, fecha_fin, mes, anio):
-        frame = ttk.LabelFrame(self.graficos_container, text="...")
-        frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        fig = plt.Figure(figsize=(6, 3), dpi=100)
-        ax = fig.add_subplot(111)
-        ax.set_title("Sorteos más activos")
-        ax.set_xlabel("Sorteo")
-        ax.set_ylabel("Total Apostado")
+            visibles = [
+                ("top5", self.ver_top5),
+                ("sorteos", self.ver_sorteos),
+                ("apuestas_vs_premios", self.ver_apuestas_vs_premios),
+                ("estadisticas", self.ver_estadisticas),
+                ("tendencias", self.ver_tendencias),
+            ]
+            self.filtros_graficos = rango_periodo(tipo, fecha_ini, fecha_fin, mes_numero, anio)
+            claves = [clave for clave, visible in visibles if visible.get()]
+            self._pedir_graficos(claves)
 
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        where = []
-        params = []
-
-        if tipo == "diario":
-            hoy = datetime.now().strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia = ?")
-            params.append(hoy)
-        elif tipo == "semanal":
-            lunes = (datetime.now() - timedelta(days=datetime.now().weekday())).strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia >= ?")
-            params.append(lunes)
-        elif tipo == "por_fecha":
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_ini, fecha_fin])
-        elif tipo == "mensual" and mes and anio:
-            fecha_i = f"{anio}-{mes}-01"
-            fecha_f = f"{anio}-{mes}-31"
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_i, fecha_f])
-
-        query = "SELECT sorteo_hora, SUM(apuesta) FROM ventas"
-        if where:
-            query += " WHERE " + " AND ".join(where)
-        query += " GROUP BY sorteo_hora ORDER BY sorteo_hora"
-
-        cursor.execute(query, tuple(params))
-        data = cursor.fetchall()
-        conn.close()
+            # Se vuelven a empacar en orden para que activar uno no lo mande al final
+            for clave, _ in visibles:
+                if clave in self.paneles_graficos:
+                    self.paneles_graficos[clave].frame.pack_forget()
+            for clave in claves:
+                self.paneles_graficos[clave].frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        if data:
-            sorteos, totales = zip(*data)
-            x = range(len(sorteos))
-            ax.bar(x, totales, color="#2196F3")
-            ax.set_xticks(x)
-            ax.set_xticklabels(sorteos, rotation=45)
-            fig.subplots_adjust(bottom=0.25)
 
+    def _pedir_graficos(self, claves):
+        """
+        Muestra al instante los gráficos que ya están en la caché (mismo filtro, mismos datos,
+        mismo motor y mismo tamaño) y encola los demás en el hilo de RenderizadorGraficos.
+        """
+        desde, hasta = self.filtros_graficos
+        version = self.renderizador_graficos.version_datos()
+        pendientes = []
+        for clave in claves:
+            panel = self._panel_grafico(clave)
+            describir = partial(self.definiciones_graficos[clave][2], desde=desde, hasta=hasta)
+            tamano = panel.tamano()
+            # La granularidad solo cambia el gráfico de tendencias; se lee aquí porque las
+            # variables de Tk no se pueden leer desde el hilo de dibujo
+            granularidad = self.granularidad_tendencia.get().lower() if clave == "tendencias" else None
+            if granularidad:
+                describir = partial(describir, granularidad=granularidad, ancho=tamano[0])
+            llave = (clave, self.motor_graficos, desde, hasta, granularidad, version) + tamano
+            resultado = self.renderizador_graficos.obtener(clave, llave)
+            if resultado is not None:
+                panel.mostrar(resultado)
+            else:
+                pendientes.append(PedidoGrafico(clave, llave, partial(panel.generar, describir, tamano)))
+        if not pendientes:
+            return
+        # Una sola consulta de agregados alimenta todos los paneles de ventas
+        if any(pedido.clave in ("top5", "sorteos", "apuestas_vs_premios") for pedido in pendientes):
+            comunes = partial(obtener_agregados_graficos, desde, hasta)
         else:
-            ax.text(0.5, 0.5, "Sin datos", transform=ax.transAxes, ha="center", va="center", fontsize=12, color="gray")
-
-        canvas = FigureCanvasTkAgg(fig, frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        canvas.draw()
-
-
-    def mostrar_apuestas_vs_premios(self, tipo, fecha_ini, fecha_fin, mes, anio):
-        frame = ttk.LabelFrame(self.graficos_container, text="...")
-        frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        fig = plt.Figure(figsize=(6, 3), dpi=100)
-        ax = fig.add_subplot(111)
-        ax.set_title("Por Sorteo")
-        ax.set_ylabel("Córdobas (C$)")
-        ax.set_xlabel("Sorteo")
-
-        # --- Obtener fechas
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        where = []
-        params = []
-
-        if tipo == "diario":
-            hoy = datetime.now().strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia = ?")
-            params.append(hoy)
-        elif tipo == "semanal":
-            lunes = (datetime.now() - timedelta(days=datetime.now().weekday())).strftime('%Y-%m-%d')
-            where.append("venta_fecha_solo_dia >= ?")
-            params.append(lunes)
-        elif tipo == "por_fecha":
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_ini, fecha_fin])
-        elif tipo == "mensual" and mes and anio:
-            fecha_i = f"{anio}-{mes}-01"
-            fecha_f = f"{anio}-{mes}-31"
-            where.append("venta_fecha_solo_dia BETWEEN ? AND ?")
-            params.extend([fecha_i, fecha_f])
-
-        condicional = " WHERE " + " AND ".join(where) if where else ""
-
-        # --- Total apostado
-        query_apuestas = f'''
-            SELECT sorteo_hora, SUM(apuesta)
-            FROM ventas
-            {condicional}
-            GROUP BY sorteo_hora
-        '''
-        cursor.execute(query_apuestas, tuple(params))
-        apuestas = dict(cursor.fetchall())
-
-        # --- Total premios entregados
-        query_premios = f'''
-            SELECT v.sorteo_hora, SUM(v.premio_potencial)
-            FROM ventas v
-            JOIN resultados_sorteo r
-                ON v.venta_fecha_solo_dia = r.fecha_sorteo
-                AND v.sorteo_hora = r.hora_sorteo
-                AND v.numero_loteria = r.numero_ganador
-            {condicional}
-            GROUP BY v.sorteo_hora
-        '''
-        cursor.execute(query_premios, tuple(params))
-        premios = dict(cursor.fetchall())
-
-        conn.close()
+            comunes = None
+        self.renderizador_graficos.solicitar(pendientes, comunes)
+
+
+    def _panel_grafico(self, clave):
+        """Panel persistente de la pestaña Gráficos, del motor elegido en Configuración."""
+        panel = self.paneles_graficos.get(clave)
+        if panel is None:
+            titulo, tamano, _ = self.definiciones_graficos[clave]
+            al_cambiar_tamano = lambda: self._pedir_graficos([clave])
+            panel = None
+            if self.motor_graficos == "matplotlib":
+                try:
+                    panel = PanelGraficoMatplotlib(self.graficos_container, titulo, tamano, al_cambiar_tamano)
+                except ImportError:
+                    print("⚠️ matplotlib no está instalado; se usa el motor de gráficos Tk.")
+                    self.motor_graficos = "tk"
+            if panel is None:
+                panel = PanelGraficoTk(self.graficos_container, titulo, tamano, al_cambiar_tamano)
+            if clave == "estadisticas":
+                panel.agregar_texto()
+            if clave == "tendencias":
+                # El tooltip se dibuja con ítems del tk.Canvas encima del gráfico, sin volver a dibujarlo
+                panel.anotaciones["cursor"] = panel.canvas.create_line(0, 0, 0, 0, fill="gray", dash=(4, 2), state="hidden")
+                panel.anotaciones["fondo"] = panel.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="gray", state="hidden")
+                panel.anotaciones["detalle"] = panel.canvas.create_text(0, 0, font=("Arial", 8), justify="left", state="hidden")
+                panel.canvas.bind("<Motion>", lambda evento: self._senalar_tendencia(panel, evento.x, evento.y))
+                panel.canvas.bind("<Leave>", lambda evento: self._senalar_tendencia(panel, None, None))
+            self.paneles_graficos[clave] = panel
+        return panel
+
+
+    def _mostrar_grafico_dibujado(self, clave, llave, resultado):
+        """Llega un gráfico del hilo de dibujo: se muestra si sigue siendo el del filtro actual."""
+        panel = self.paneles_graficos.get(clave)
+        if panel is not None and self.renderizador_graficos.es_vigente(clave, llave):
+            panel.mostrar(resultado)
+
+
+    def _datos_top5(self, agregados, desde, hasta):
+        data = sorted(agregados["por_numero"].items(), key=lambda item: item[1], reverse=True)[:5]
+        # Siempre 5 barras: las que sobran quedan en cero y sin etiqueta
+        numeros = [numero for numero, _ in data] + [""] * (5 - len(data))
+        totales = [total for _, total in data] + [0] * (5 - len(data))
+        return {"subgraficos": [{
+            "titulo": "Top 5 por período seleccionado", "etiqueta_x": "Número", "etiqueta_y": "Total Apostado",
+            "categorias": numeros, "barras": [{"valores": totales, "color": "#4CAF50"}],
+            "aviso": None if data else "Sin datos",
+        }]}
+
+
+    def _datos_sorteos(self, agregados, desde, hasta):
+        data = agregados["por_sorteo"]
+        return {"subgraficos": [{
+            "titulo": "Sorteos más activos", "etiqueta_x": "Sorteo", "etiqueta_y": "Total Apostado",
+            "categorias": list(SORTEOS), "barras": [{"valores": [data.get(s, 0) for s in SORTEOS], "color": "#2196F3"}],
+            "aviso": None if data else "Sin datos",
+        }]}
+
+
+    def _datos_apuestas_vs_premios(self, agregados, desde, hasta):
+        totales_apuestas = [agregados["por_sorteo"].get(s, 0) for s in SORTEOS]
+        totales_premios = [agregados["premios_por_sorteo"].get(s, 0) for s in SORTEOS]
+        return {"subgraficos": [{
+            "titulo": "Por Sorteo", "etiqueta_x": "Sorteo", "etiqueta_y": "Córdobas (C$)", "categorias": list(SORTEOS),
+            "barras": [{"valores": totales_apuestas, "color": "#2196F3", "etiqueta": "Apostado"},
+                       {"valores": totales_premios, "color": "#FFC107", "etiqueta": "Premios"}],
+            "aviso": None if any(totales_apuestas) or any(totales_premios) else "No hay datos",
+        }]}
+
+
+    def _datos_estadisticas(self, agregados, desde, hasta):
+        """Frecuencia de los 100 números en el período y atraso actual/máximo, del motor de estadísticas."""
+        estadisticas = obtener_estadisticas()
+        frecuencias = estadisticas.frecuencias(desde, hasta)
+        atraso_actual, atraso_maximo = estadisticas.atrasos(hasta)
+        calientes, frios = estadisticas.calientes_y_frios()
+        por_dia = estadisticas.frecuencias_por_dia_semana(desde, hasta).sum(axis=1)
+        numeros_calientes = {int(n) for n, _ in calientes}
+
+        return {
+            "subgraficos": [
+                {"titulo": f"Veces ganador ({estadisticas.cantidad_sorteos(desde, hasta)} sorteos)",
+                 "marcas": range(0, 100, 5),
+                 "barras": [{"valores": frecuencias.tolist(),
+                             "color": ["#F44336" if n in numeros_calientes else "#4CAF50" for n in range(100)]}],
+                 "aviso": None if frecuencias.any() else "Sin resultados en el período"},
+                {"titulo": "Sorteos sin salir", "marcas": range(0, 100, 5),
+                 "barras": [{"valores": atraso_actual.tolist(), "color": "#2196F3", "etiqueta": "Atraso actual"}],
+                 "lineas": [{"x": list(range(100)), "y": atraso_maximo.tolist(), "color": "#FF9800",
+                             "etiqueta": "Atraso máximo", "escalonada": True}]},
+                {"titulo": "Resultados por día de la semana", "categorias": [d[:3] for d in DIAS_SEMANA],
+                 "barras": [{"valores": por_dia.tolist(), "color": "#9C27B0"}]},
+            ],
+            # El renglón de texto lo actualiza el hilo de Tk al mostrar el gráfico
+            "texto": f"🔥 Calientes (últimos 60 sorteos): {', '.join(f'{n} ({v})' for n, v in calientes)}    "
+                     f"❄️ Fríos (sorteos sin salir): {', '.join(f'{n} ({v})' for n, v in frios)}",
+        }
 
-        sorteos = ['11 AM', '03 PM', '06 PM', '09 PM']
-        totales_apuestas = [apuestas.get(s, 0) for s in sorteos]
-        totales_premios = [premios.get(s, 0) for s in sorteos]
-
-        if any(totales_apuestas) or any(totales_premios):
-            bar_width = 0.35
-            x = range(len(sorteos))
-            ax.bar([i - bar_width/2 for i in x], totales_apuestas, width=bar_width, label='Apostado', color='#2196F3')
-            ax.bar([i + bar_width/2 for i in x], totales_premios, width=bar_width, label='Premios', color='#FFC107')
-            ax.set_xticks(list(x))
-            ax.set_xticklabels(sorteos, rotation=45)
-            fig.subplots_adjust(bottom=0.25)
-            ax.legend()
-        else:
-            ax.text(0.5, 0.5, "No hay datos", transform=ax.transAxes, ha="center", va="center", fontsize=12, color="gray")
 
-        canvas = FigureCanvasTkAgg(fig, frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        canvas.draw()
+    def _datos_tendencias(self, agregados, desde, hasta, granularidad, ancho):
+        """Apostado y premios pagados por día, semana o mes, agrupados en SQL y reducidos al ancho del gráfico."""
+        serie = SerieTemporal(granularidad, desde, hasta)
+        # A lo sumo un punto por píxel del área de dibujo: más no se distingue y solo hace lento el dibujo
+        reducida = serie.reducir(max(50, int(ancho * 0.8)))
+        lineas = [{"x": x.tolist(), "y": y.tolist(), "color": color, "etiqueta": etiqueta}
+                  for (x, y), color, etiqueta in ((reducida["apostado"], "#2196F3", "Apostado"),
+                                                  (reducida["premios"], "#FFC107", "Premios"))]
+        return {
+            "subgraficos": [{
+                "titulo": f"Apostado y premios pagados ({granularidad}, {len(serie)} períodos)",
+                "etiqueta_y": "Córdobas (C$)", "fechas": True, "lineas": lineas,
+                "xlim": (int(serie.dias[0]) - 1, int(serie.dias[-1]) + 1) if len(serie) else None,
+                "aviso": None if len(serie) else "Sin datos",
+            }],
+            "serie": serie,
+        }
 
 
+    def _senalar_tendencia(self, panel, x, y):
+        """Tooltip con los valores exactos (de la serie completa) del período bajo el mouse."""
+        info = panel.info
+        indice = None
+        if x is not None and info and len(info["serie"]):
+            izquierda, arriba, derecha, abajo = info["area"]
+            if izquierda <= x <= derecha and arriba <= y <= abajo:
+                xmin, xmax = info["xlim"]
+                indice = info["serie"].indice_cercano(xmin + (x - izquierda) / (derecha - izquierda) * (xmax - xmin))
+        if indice == panel.senalado:
+            return # Mismo período: no hace falta tocar el tooltip
+        panel.senalado = indice
+
+        canvas = panel.canvas
+        for item in panel.anotaciones.values():
+            canvas.itemconfig(item, state="hidden" if indice is None else "normal")
+        if indice is None:
+            return
+        serie = info["serie"]
+        dia = serie.dias[indice]
+        px = izquierda + (dia - xmin) / (xmax - xmin) * (derecha - izquierda)
+        etiqueta = {"semanal": "Semana del ", "mensual": "Mes "}.get(serie.granularidad, "")
+        # Del lado izquierdo de la línea en la mitad derecha, para que no se salga del gráfico
+        a_la_derecha = px > (izquierda + derecha) / 2
+        canvas.coords(panel.anotaciones["cursor"], px, arriba, px, abajo)
+        canvas.itemconfig(panel.anotaciones["detalle"], anchor="ne" if a_la_derecha else "nw", text=(
+            f"{etiqueta}{serie.fechas[indice]}\n"
+            f"Apostado: {formatear_cordobas(serie.apostado[indice])}\nPremios: {formatear_cordobas(serie.premios[indice])}"))
+        canvas.coords(panel.anotaciones["detalle"], px - 8 if a_la_derecha else px + 8, arriba + 8)
+        x1, y1, x2, y2 = canvas.bbox(panel.anotaciones["detalle"])
+        canvas.coords(panel.anotaciones["fondo"], x1 - 4, y1 - 3, x2 + 4, y2 + 3)
 
 
     def crear_widgets_tab_configuracion(self):
@@ -2512,6 +2009,34 @@ class AppLoteria:
         )
         self.btn_importar_ventas.pack(pady=10, fill="x", padx=20)
 
+        self.btn_sincronizar_terminales = ttk.Button(
+            self.frame_acciones,
+            text="Sincronizar terminales (carpeta compartida)",
+            command=self.configurar_sincronizacion_terminales
+        )
+        self.btn_sincronizar_terminales.pack(pady=10, fill="x", padx=20)
+
+        self.btn_exportar_datos_crudos = ttk.Button(
+            self.frame_acciones,
+            text="Exportar datos crudos (CSV/Parquet)",
+            command=self.mostrar_ventana_exportar_datos_crudos
+        )
+        self.btn_exportar_datos_crudos.pack(pady=10, fill="x", padx=20)
+
+        self.btn_rellenar_resultados = ttk.Button(
+            self.frame_acciones,
+            text="Completar resultados históricos desde la web",
+            command=self.rellenar_resultados_gui
+        )
+        self.btn_rellenar_resultados.pack(pady=10, fill="x", padx=20)
+
+        self.btn_archivar_anios = ttk.Button(
+            self.frame_acciones,
+            text="Archivar ventas de años cerrados",
+            command=self.archivar_anios_cerrados_gui
+        )
+        self.btn_archivar_anios.pack(pady=10, fill="x", padx=20)
+
         self.btn_cambiar_clave = ttk.Button(
             self.frame_acciones,
             text="Cambiar Clave de Acceso",
@@ -2545,6 +2070,43 @@ class AppLoteria:
 
         self.frame_selector_tema.columnconfigure(1, weight=1)
 
+        # 📊 Motor de gráficos
+        self.frame_motor_graficos = ttk.LabelFrame(frame_izquierdo, text="Motor de Gráficos")
+        self.frame_motor_graficos.pack(fill="x", padx=15, pady=10)
+
+        ttk.Label(self.frame_motor_graficos, text="Dibujar gráficos con:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.motor_graficos_var = tk.StringVar(value=MOTORES_GRAFICOS[self.motor_graficos])
+        ttk.Combobox(
+            self.frame_motor_graficos,
+            textvariable=self.motor_graficos_var,
+            values=list(MOTORES_GRAFICOS.values()),
+            state="readonly"
+        ).grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+        ttk.Button(
+            self.frame_motor_graficos,
+            text="Aplicar Motor",
+            command=self.cambiar_motor_graficos
+        ).grid(row=1, column=0, columnspan=2, pady=10)
+
+        self.frame_motor_graficos.columnconfigure(1, weight=1)
+
+        # 🩺 Diagnóstico
+        self.frame_diagnostico = ttk.LabelFrame(frame_izquierdo, text="Diagnóstico")
+        self.frame_diagnostico.pack(fill="x", padx=15, pady=10)
+
+        ttk.Button(
+            self.frame_diagnostico,
+            text="⏱️ Tiempos de tareas periódicas",
+            command=self.mostrar_tiempos_tareas
+        ).pack(padx=5, pady=(10, 5), fill="x")
+
+        ttk.Button(
+            self.frame_diagnostico,
+            text="🐢 Bloqueos de la interfaz",
+            command=self.mostrar_bloqueos_interfaz
+        ).pack(padx=5, pady=(0, 10), fill="x")
+
         # 💰 Premio por C$1
         self.frame_config_premio = ttk.LabelFrame(frame_izquierdo, text="Configurar Premio por C$1")
         self.frame_config_premio.pack(fill="x", padx=15, pady=10)
@@ -2732,49 +2294,22 @@ class AppLoteria:
 
         # 🎯 Restaurar automáticamente posiciones de sash
         self.root.after(200, lambda: self.aplicar_posiciones_sashes(self.paned_sorteos, "sorteos_paned_sash_positions"))
-        self._sorteos_paned_sashes = []
-
-        def verificar_sorteos_paned_positions():
-            try:
-                self.root.update_idletasks()
-                total = self.paned_sorteos.winfo_width()
-                if total <= 1:
-                    self.root.after(1000, verificar_sorteos_paned_positions)
-                    return
-
-                panes = self.paned_sorteos.panes()
-                if len(panes) < 2:
-                    self.root.after(1000, verificar_sorteos_paned_positions)
-                    return
-
-                proporciones = [round(self.root.nametowidget(p).winfo_width() / total, 4) for p in panes]
-                posiciones = [round(sum(proporciones[:i+1]), 4) for i in range(len(proporciones) - 1)]
-
-                if posiciones != self._sorteos_paned_sashes:
-                    self._sorteos_paned_sashes = posiciones
-                    guardar_configuracion_ui_db("sorteos_paned_sash_positions", json.dumps(posiciones))
-                    print(f"💾 Posiciones actualizadas para PanedWindow Sorteos: {posiciones}")
-
-                self.root.after(1000, verificar_sorteos_paned_positions)
-            except Exception as e:
-                print(f"❌ Error monitoreando PanedWindow Sorteos: {e}")
-                self.root.after(1000, verificar_sorteos_paned_positions)
-
-        self.root.after(1000, verificar_sorteos_paned_positions)
+        self.vigilar_sashes(self.paned_sorteos, "sorteos_paned_sash_positions")
 
     def consultar_resultados_web(self):
         fecha = self.date_entry_registro.get_date().strftime('%Y-%m-%d')
-        web = obtener_resultados_loto_nicaragua()
+        web = obtener_resultados_loto_nicaragua(fecha)
         if not web:
             messagebox.showwarning("Web Loto", "No se obtuvo ningún dato.")
             return
 
         encontrados = list(web.keys())
         registrados, ya, no_vistos = [], [], []
+        locales = obtener_ganadores_fecha(fecha)
 
         for sorteo in ["11 AM", "03 PM", "09 PM"] + (["06 PM"] if datetime.now().weekday()==5 else []):
             num_web = web.get(sorteo)
-            num_loc = consultar_numero_ganador_db(fecha, sorteo)
+            num_loc = locales.get(sorteo)
 
             if num_web:
                 if num_loc:
@@ -2886,6 +2421,16 @@ class AppLoteria:
         ttk.Button(botonera_reportes, text="🧾 Exportar a PDF", command=self.exportar_reporte_a_pdf, style="Accent.TButton").pack(side="left", padx=5)
         ttk.Button(botonera_reportes, text="📊 Exportar a Excel", command=self.exportar_reporte_excel, style="Naranja.TButton").pack(side="left", padx=5)
 
+        # ⏳ Progreso de exportaciones e impresiones en segundo plano
+        frame_trabajos = ttk.Frame(frame_resultado)
+        frame_trabajos.pack(fill="x", padx=5, pady=(0, 10))
+        self.progreso_trabajos_var = tk.IntVar(value=0)
+        ttk.Progressbar(frame_trabajos, variable=self.progreso_trabajos_var, maximum=100, length=200).pack(side="left", padx=5)
+        self.btn_cancelar_trabajos = ttk.Button(frame_trabajos, text="Cancelar", command=self.cola_trabajos.cancelar_todos, state="disabled")
+        self.btn_cancelar_trabajos.pack(side="left", padx=5)
+        self.lbl_trabajos = ttk.Label(frame_trabajos, text="Sin exportaciones en curso")
+        self.lbl_trabajos.pack(side="left", padx=5, fill="x", expand=True)
+
 
 
         # --- Persistencia visual ---
@@ -2896,31 +2441,7 @@ class AppLoteria:
         )
 
         self.root.after(200, lambda: self.aplicar_posiciones_sashes(self.paned_reportes, "reportes_paned_sash_positions"))
-        self._reportes_paned_sashes = []
-
-        def verificar_reportes_paned_positions():
-            try:
-                self.root.update_idletasks()
-                total_width = self.paned_reportes.winfo_width()
-                if total_width <= 1:
-                    self.root.after(1000, verificar_reportes_paned_positions)
-                    return
-
-                panes = self.paned_reportes.panes()
-                proporciones = [round(self.root.nametowidget(p).winfo_width() / total_width, 4) for p in panes]
-                posiciones = [round(sum(proporciones[:i+1]), 4) for i in range(len(proporciones) - 1)]
-
-                if posiciones != self._reportes_paned_sashes:
-                    self._reportes_paned_sashes = posiciones
-                    guardar_configuracion_ui_db("reportes_paned_sash_positions", json.dumps(posiciones))
-                    print(f"💾 Posiciones actualizadas para PanedWindow Reportes: {posiciones}")
-
-                self.root.after(1000, verificar_reportes_paned_positions)
-            except Exception as e:
-                print(f"❌ Error monitoreando sashes: {e}")
-                self.root.after(1000, verificar_reportes_paned_positions)
-
-        self.root.after(1000, verificar_reportes_paned_positions)
+        self.vigilar_sashes(self.paned_reportes, "reportes_paned_sash_positions")
 
         # 🧠 Inicializa los filtros según el tipo de reporte actual
         self.btn_generar_reporte = ttk.Button(self.frame_controles_reporte, text="Generar Reporte", command=self.generar_reporte_gui)
@@ -2988,6 +2509,7 @@ class AppLoteria:
         pestaña_actual = self.notebook.tab(self.notebook.select(), "text")
         if pestaña_actual == "Ventas":
             self.actualizar_resumen_ventas_dia()
+            self.mapa_ventas.recargar()
             self.actualizar_ganadores_desde_ventas()
         elif pestaña_actual == "Reportes":
             self.generar_reporte_gui()
@@ -3084,6 +2606,7 @@ class AppLoteria:
                 if exito:
                     self.actualizar_estado(mensaje)
                     self.actualizar_resumen_ventas_dia()  # ✅ Añadir esta línea
+                    self.mapa_ventas.sumar_venta(numero, sorteo_seleccionado, apuesta, premio)
                     self.numero_var.set("")
                     self.apuesta_var.set("")
                     self.premio_calculado_var.set("C$0")
@@ -3120,6 +2643,7 @@ class AppLoteria:
         """
         # Limpia el Treeview antes de insertar nuevos datos
         self.tree_historial_resumen.delete(*self.tree_historial_resumen.get_children())
+        self.datos_resumen = TablaColumnar(COLUMNAS_RESUMEN_VENTAS) # Estas filas informativas no se exportan
 
         # Si hay un mensaje inicial (como el del número más vendido), lo insertamos primero
         if initial_message:
@@ -3139,23 +2663,16 @@ class AppLoteria:
         
         numero_formateado = formatear_numero_loteria(int(numero_a_buscar_str))
 
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         try:
             # --- APLICAR FILTRO DE PERÍODO SELECCIONADO ---
             tipo_periodo = self.periodo_resumen_var.get()
-            where = "WHERE numero_loteria = ?"
-            params = [numero_formateado]
+            fecha_ini = fecha_fin = None
 
             if tipo_periodo == "diario":
-                where += " AND venta_fecha_solo_dia = ?"
-                params.append(datetime.now().strftime('%Y-%m-%d'))
+                fecha_ini = fecha_fin = datetime.now().strftime('%Y-%m-%d')
 
             elif tipo_periodo == "semanal":
-                lunes = (datetime.now() - timedelta(days=datetime.now().weekday())).strftime('%Y-%m-%d')
-                where += " AND venta_fecha_solo_dia >= ?"
-                params.append(lunes)
+                fecha_ini = (datetime.now() - timedelta(days=datetime.now().weekday())).strftime('%Y-%m-%d')
 
             elif tipo_periodo == "mensual":
                 meses_map = {
@@ -3167,28 +2684,17 @@ class AppLoteria:
                 anio = self.anio_resumen_var.get()
                 fecha_ini = f"{anio}-{mes}-01"
                 fecha_fin = f"{anio}-{mes}-31"
-                where += " AND venta_fecha_solo_dia BETWEEN ? AND ?"
-                params.extend([fecha_ini, fecha_fin])
 
             elif tipo_periodo == "por período":
                 fecha_ini = self.fecha_ini_resumen_var.get()
                 fecha_fin = self.fecha_fin_resumen_var.get()
-                where += " AND venta_fecha_solo_dia BETWEEN ? AND ?"
-                params.extend([fecha_ini, fecha_fin])
-
-            # Ejecutar consulta con filtros aplicados
-            cursor.execute(f'''
-                SELECT COUNT(*), SUM(apuesta), SUM(premio_potencial), MAX(fecha_hora)
-                FROM ventas
-                {where}
-            ''', params)
-            total_ventas = cursor.fetchone()
-
-            # Obtener cuántas veces ha sido ganador ese número
-            cursor.execute('''
-                SELECT COUNT(*) FROM resultados_sorteo WHERE numero_ganador = ?
-            ''', (numero_formateado,))
-            veces_ganador = cursor.fetchone()[0]
+
+            # Ejecutar consulta con filtros aplicados (incluye los años archivados)
+            total_ventas = obtener_totales_numero_db(numero_formateado, fecha_ini, fecha_fin)
+
+            # Veces ganador, atrasos y día más frecuente, del motor de estadísticas
+            estadistica_numero = obtener_estadisticas().resumen_numero(numero_formateado)
+            veces_ganador = estadistica_numero["veces"]
 
             # Preparar los datos para el Treeview en el formato deseado
             resumen_data = [
@@ -3211,7 +2717,10 @@ class AppLoteria:
                 ("Sorteos (Veces Ganador)", resumen_data[5][1]), # 'Veces ganador'
                 ("Apuesta Total", resumen_data[2][1]), # 'Total apostado'
                 ("Ganancia Potencial", resumen_data[3][1]), # 'Premio Potencial'
-                ("Última Venta", resumen_data[4][1]) # 'Última venta'
+                ("Última Venta", resumen_data[4][1]), # 'Última venta'
+                ("Atraso Actual (sorteos)", estadistica_numero["atraso_actual"]),
+                ("Atraso Máximo (sorteos)", estadistica_numero["atraso_maximo"]),
+                ("Día Más Frecuente", estadistica_numero["dia_mas_frecuente"] or "N/A")
             ]
 
             if total_ventas[0] is None and veces_ganador == 0: # Si no hay ventas ni es ganador
@@ -3223,8 +2732,6 @@ class AppLoteria:
         except Exception as e:
             self.tree_historial_resumen.insert("", "end", values=("Error", f"Ocurrió un error al buscar: {e}"))
             print(f"Error en ejecutar_busqueda_historial: {e}")
-        finally:
-            conn.close()
 
 
     def buscar_historial_numero(self):
@@ -3233,46 +2740,34 @@ class AppLoteria:
             messagebox.showwarning("Número inválido", "Ingrese un número entre 00 y 99.")
             return
 
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         try:
-            # Total de ventas
-            cursor.execute('''
-                SELECT COUNT(*), SUM(apuesta), SUM(premio_potencial), MAX(fecha_hora)
-                FROM ventas
-                WHERE numero_loteria = ?
-            ''', (numero,))
-            total_ventas = cursor.fetchone()
+            # Total de ventas (incluye los años archivados)
+            total_ventas = obtener_totales_numero_db(numero)
 
-            # Veces que ha sido ganador
-            cursor.execute('''
-                SELECT COUNT(*)
-                FROM resultados_sorteo
-                WHERE numero_ganador = ?
-            ''', (numero,))
-            veces_ganador = cursor.fetchone()[0]
+            # Veces que ha sido ganador y atraso actual
+            estadistica_numero = obtener_estadisticas().resumen_numero(numero)
+            veces_ganador = estadistica_numero["veces"]
 
             resumen = f"Número {numero}:\n"
             resumen += f"🔹 Vendido {total_ventas[0]} veces\n"
             resumen += f"🔹 Total Apostado: C${total_ventas[1] or 0:,.0f}\n"
             resumen += f"🔹 Total Premio Potencial: C${total_ventas[2] or 0:,.0f}\n"
             resumen += f"🔹 Última venta: {total_ventas[3] or 'N/A'}\n"
-            resumen += f"🔹 Ganador {veces_ganador} veces"
+            resumen += f"🔹 Ganador {veces_ganador} veces\n"
+            resumen += f"🔹 Lleva {estadistica_numero['atraso_actual']} sorteos sin salir"
 
             self.resultado_busqueda.set(resumen)
         except Exception as e:
             messagebox.showerror("Error al buscar", f"Ocurrió un error: {e}")
-        finally:
-            conn.close()
 
 
     def actualizar_estado_ganadores_ventas(self):
         fecha_actual = datetime.now().strftime('%Y-%m-%d')
         self.tree_ganadores_ventas.delete(*self.tree_ganadores_ventas.get_children())
 
+        ganadores = obtener_ganadores_fecha(fecha_actual)
         for sorteo in self.sorteo_options_all:
-            numero_ganador = consultar_numero_ganador_db(fecha_actual, sorteo)
+            numero_ganador = ganadores.get(sorteo)
             valor = numero_ganador if numero_ganador else "🚫 PENDIENTE"
             tag = ("pendiente",) if not numero_ganador else ()
             self.tree_ganadores_ventas.insert("", "end", values=(fecha_actual, sorteo, valor), tags=tag)
@@ -3428,6 +2923,7 @@ class AppLoteria:
             self.tree_ganadores.delete(item)
         
         ganadores = obtener_ultimos_ganadores_db(limite=10)
+        self.datos_ganadores = TablaColumnar.desde_filas(COLUMNAS_GANADORES, ganadores)
         for ganador in ganadores:
             self.tree_ganadores.insert("", tk.END, values=(ganador[0], ganador[1], ganador[2]))
 
@@ -3438,18 +2934,25 @@ class AppLoteria:
         sorteo = self.sorteo_registro_var.get()
 
         self.tree_ganadores.delete(*self.tree_ganadores.get_children())
+        # Solo los ganadores registrados se exportan; los pendientes son solo visuales
+        self.datos_ganadores = TablaColumnar(COLUMNAS_GANADORES)
+        ganadores = obtener_ganadores_fecha(fecha)
 
         if sorteo and sorteo in self.sorteo_options_all:
-            numero = consultar_numero_ganador_db(fecha, sorteo)
+            numero = ganadores.get(sorteo)
             valor = numero if numero else "🚫 PENDIENTE"
             tag = ("pendiente",) if not numero else ()
+            if numero:
+                self.datos_ganadores.agregar((fecha, sorteo, numero))
             self.tree_ganadores.insert("", "end", values=(fecha, sorteo, valor), tags=tag)
         else:
             # Si no hay sorteo válido, mostrar todos los sorteos del día
             for s in self.sorteo_options_all:
-                numero = consultar_numero_ganador_db(fecha, s)
+                numero = ganadores.get(s)
                 valor = numero if numero else "🚫 PENDIENTE"
                 tag = ("pendiente",) if not numero else ()
+                if numero:
+                    self.datos_ganadores.agregar((fecha, s, numero))
                 self.tree_ganadores.insert("", "end", values=(fecha, s, valor), tags=tag)
 
 
@@ -3647,22 +3150,10 @@ class AppLoteria:
                 )
                 self.report_content += "-" * (sum(col_widths_text.values()) + 5) + "\n"
 
-                conn = sqlite3.connect(DB_NAME)
-                cursor = conn.cursor()
-
+                # Las cifras ya vienen de la liquidación de cada sorteo
                 for ganador in self.report_data:
                     fecha_sorteo, hora_sorteo, numero_ganador, total_apostado, premio_pagado = ganador
 
-                    cursor.execute('''
-                        SELECT SUM(apuesta), SUM(premio_potencial)
-                        FROM ventas
-                        WHERE numero_loteria = ? AND venta_fecha_solo_dia = ? AND sorteo_hora = ?
-                    ''', (numero_ganador, fecha_sorteo, hora_sorteo))
-
-                    suma = cursor.fetchone()
-                    total_apostado = suma[0] if suma and suma[0] else 0
-                    total_premio = suma[1] if suma and suma[1] else 0
-
                     self.report_content += "{:<{f_w}} {:<{h_w}} {:<{n_w}} {:>{a_w}} {:>{p_w}}\n".format(
                         fecha_sorteo, hora_sorteo, numero_ganador,
                         f"C${total_apostado:,.0f}", f"C${premio_pagado:,.0f}",
@@ -3672,347 +3163,280 @@ class AppLoteria:
                         a_w=col_widths_text["Total Apostado"],
                         p_w=col_widths_text["Total Premios"]
                     )
-
-
-                conn.close()
                 
             
     def exportar_reporte_a_pdf(self):
         """Exporta el contenido actual del reporte a un archivo PDF en la subcarpeta 'Reportes',
         con nombre de archivo basado en la fecha y hora, y lo abre automáticamente,
-        con formato de tabla."""
+        con formato de tabla. El PDF se genera en segundo plano."""
         self.generar_reporte_gui()
         if not hasattr(self, 'report_data') or not self.report_data:
             messagebox.showwarning("Exportar a PDF", "No hay contenido de reporte para exportar.")
             return
 
-        try:
-            reportes_dir = os.path.join(os.getcwd(), "Reportes")
-            os.makedirs(reportes_dir, exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            # Ajustar el nombre del archivo según el tipo de reporte
-            if self.report_type_data == "Ventas":
-                file_name = f"Reporte_Ventas_{timestamp}.pdf"
-            elif self.report_type_data == "Ganadores":
-                file_name = f"Reporte_Ganadores_{timestamp}.pdf"
-            else:
-                file_name = f"Reporte_General_{timestamp}.pdf"
-
-            file_path = os.path.join(reportes_dir, file_name)
-
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Helvetica", size=10)
+        reportes_dir = os.path.join(os.getcwd(), "Reportes")
+        os.makedirs(reportes_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-            # Extraer el título del report_content para usarlo en el PDF
-            title_text = "Reporte de Ventas" # Default
-            match = re.search(r"--- (.*?) ---", self.report_content.split('\n')[0])
-            if match:
-                title_text = match.group(1).strip()
-            
-            pdf.set_font("Helvetica", 'B', 14)
-            pdf.cell(0, 10, title_text, 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C') 
-            pdf.ln(5)
-            pdf.set_font("Helvetica", size=10)
-            
-            line_height_pdf = 7
-
-            if self.report_type_data == "Ventas":
-                # Anchos para el PDF (ajustados para la nueva columna "Última Modificación")
-                col_widths_pdf = {
-                    "Numero": 20,
-                    "Sorteo": 20,
-                    "Apuesta Total": 40,
-                    "Premio Total": 35,
-                    "Última Modificación": 65
-                }
+        # Ajustar el nombre del archivo según el tipo de reporte
+        if self.report_type_data == "Ventas":
+            file_name = f"Reporte_Ventas_{timestamp}.pdf"
+        elif self.report_type_data == "Ganadores":
+            file_name = f"Reporte_Ganadores_{timestamp}.pdf"
+        else:
+            file_name = f"Reporte_General_{timestamp}.pdf"
+        file_path = os.path.join(reportes_dir, file_name)
 
-                # Encabezado de la tabla para Ventas
-                pdf.set_font("Helvetica", 'B', 10)
-                pdf.set_fill_color(220, 220, 220)
-                pdf.cell(col_widths_pdf["Numero"], line_height_pdf, "Número", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
-                pdf.cell(col_widths_pdf["Sorteo"], line_height_pdf, "Sorteo", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
-                pdf.cell(col_widths_pdf["Apuesta Total"], line_height_pdf, "Apuesta Total (C$)", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True) 
-                pdf.cell(col_widths_pdf["Premio Total"], line_height_pdf, "Premio Total (C$)", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True) 
-                pdf.cell(col_widths_pdf["Última Modificación"], line_height_pdf, "Última Modificación", 1, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C', fill=True)
-                pdf.set_font("Helvetica", size=10)
-                pdf.set_fill_color(255, 255, 255)
+        # Copia de los datos actuales: el usuario puede seguir filtrando mientras se genera
+        datos = list(self.report_data)
+        tipo_datos = self.report_type_data
+        titulo = self._titulo_reporte_pdf()
 
-                total_apostado_general = 0
-                total_premio_potencial_general = 0
+        def _generar(progreso):
+            escribir_pdf_reporte(datos, tipo_datos, titulo, file_path, progreso)
+            temp_pdf_files.append(file_path)
+            return file_path
 
-                for venta in self.report_data: # ventas agrupadas
-                    # numero_loteria, SUM(apuesta), SUM(premio_potencial), venta_fecha_solo_dia, sorteo_hora, MAX(fecha_hora)
-                    numero, apuesta_total, premio_total, _, sorteo_hora, ultima_modificacion_hora_venta = venta
-                    apuesta_formatted = f"{apuesta_total:,.0f}" 
-                    premio_formatted = f"{premio_total:,.0f}"
+        self._encolar_exportacion(f"Reporte de {tipo_datos} (PDF)", _generar)
 
-                    pdf.cell(col_widths_pdf["Numero"], line_height_pdf, str(numero), 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C')
-                    pdf.cell(col_widths_pdf["Sorteo"], line_height_pdf, sorteo_hora, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C')
-                    pdf.cell(col_widths_pdf["Apuesta Total"], line_height_pdf, apuesta_formatted, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='L') 
-                    pdf.cell(col_widths_pdf["Premio Total"], line_height_pdf, premio_formatted, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='L') 
-                    pdf.cell(col_widths_pdf["Última Modificación"], line_height_pdf, ultima_modificacion_hora_venta, 1, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C')
-                    
-                    total_apostado_general += apuesta_total 
-                    total_premio_potencial_general += premio_total
 
-                pdf.ln(5)
-                pdf.set_font("Helvetica", 'B', 11)
-                pdf.cell(0, 7, f"Gran Total Apostado: C${total_apostado_general:,.0f}", 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='L')
-                pdf.cell(0, 7, f"Gran Total Premio Potencial: C${total_premio_potencial_general:,.0f}", 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='L')
-            
-            elif self.report_type_data == "Ganadores":
-                col_widths_pdf = {
-                    "Fecha Sorteo": 30,
-                    "Hora Sorteo": 20,
-                    "Número Ganador": 30,
-                    "Total Apostado": 30,
-                    "Premio Pagado": 30
-                }
+    def exportar_reporte_excel(self):
+        if not hasattr(self, 'report_data') or not self.report_data:
+            messagebox.showwarning("Exportar a Excel", "No hay datos disponibles para exportar.")
+            return
 
-                # Encabezados de tabla
-                pdf.set_font("Helvetica", 'B', 10)
-                pdf.set_fill_color(220, 220, 220)
-                pdf.cell(col_widths_pdf["Fecha Sorteo"], line_height_pdf, "Fecha", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Hora Sorteo"], line_height_pdf, "Sorteo", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Número Ganador"], line_height_pdf, "Ganador", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Total Apostado"], line_height_pdf, "Apostado (C$)", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Premio Pagado"], line_height_pdf, "Pagado (C$)", 1, 1, 'C', True)
+        reportes_dir = os.path.join(os.getcwd(), "Reportes")
+        os.makedirs(reportes_dir, exist_ok=True)
+        archivo = os.path.join(reportes_dir, f"Reporte_{self.report_type_data}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
 
-                pdf.set_font("Helvetica", size=10)
-                pdf.set_fill_color(255, 255, 255)
+        datos = list(self.report_data)
+        tipo_datos = self.report_type_data
+        self._encolar_exportacion(f"Reporte de {tipo_datos} (Excel)", lambda progreso: escribir_excel_reporte(
+            datos, tipo_datos, archivo, progreso
+        ))
 
-                for fila in self.report_data:
-                    # Asegúrate de que tu self.report_data contiene estos cinco valores por fila
-                    if len(fila) < 5:
-                        messagebox.showwarning("Error de Datos", "El reporte no tiene las columnas completas. Vuelve a generarlo antes de exportar.")
-                        return
-                    fecha_sorteo, hora_sorteo, numero_ganador, total_apostado, total_pagado = fila
-                    pdf.cell(col_widths_pdf["Fecha Sorteo"], line_height_pdf, fecha_sorteo, 1, 0, 'C')
-                    pdf.cell(col_widths_pdf["Hora Sorteo"], line_height_pdf, hora_sorteo, 1, 0, 'C')
-                    pdf.cell(col_widths_pdf["Número Ganador"], line_height_pdf, numero_ganador, 1, 0, 'C')
-                    pdf.cell(col_widths_pdf["Total Apostado"], line_height_pdf, f"{total_apostado:,.0f}", 1, 0, 'R')
-                    pdf.cell(col_widths_pdf["Premio Pagado"], line_height_pdf, f"{total_pagado:,.0f}", 1, 1, 'R')
 
+    def imprimir_reporte_gui(self):
+        """Genera un PDF temporal en segundo plano y lo abre para imprimir."""
+        if not hasattr(self, 'report_data') or not self.report_data:
+            messagebox.showwarning("Imprimir Reporte", "No hay contenido de reporte para imprimir.")
+            return
 
+        temp_pdf_dir = "temp_pdfs"
+        os.makedirs(temp_pdf_dir, exist_ok=True)
+        temp_pdf_path = os.path.join(temp_pdf_dir, f"reporte_temp_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf")
 
-            pdf.output(file_path)
-            temp_pdf_files.append(file_path)
+        datos = list(self.report_data)
+        tipo_datos = self.report_type_data
+        titulo = self._titulo_reporte_pdf()
 
-            if sys.platform == "win32":
-                try:
-                    os.startfile(file_path)
-                except OSError:
-                    messagebox.showwarning("Advertencia", f"No se pudo abrir el PDF automáticamente. Por favor, ábralo manualmente desde:\n{file_path}")
-            elif sys.platform == "darwin": 
-                subprocess.Popen(["open", "open", file_path])
-            else: 
-                subprocess.Popen(["xdg-open", file_path])
-
-            messagebox.showinfo("Exportar a PDF", f"Reporte guardado y abierto exitosamente en:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Error al Exportar", f"Ocurrió un error al exportar el PDF: {e}")
-            # print(f"ERROR: Exception during PDF export: {e}")
+        def _generar(progreso):
+            escribir_pdf_reporte(datos, tipo_datos, titulo, temp_pdf_path, progreso)
+            temp_pdf_files.append(temp_pdf_path)
+            return temp_pdf_path
 
+        self._encolar_exportacion("Impresión de reporte", _generar)
 
-    def exportar_reporte_excel(self):
-        if not hasattr(self, 'report_data') or not self.report_data:
-            messagebox.showwarning("Exportar a Excel", "No hay datos disponibles para exportar.")
-            return
 
-        try:
-            import openpyxl
-            from openpyxl.styles import Font
-            from openpyxl.utils import get_column_letter
-
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = f"Reporte_{self.report_type_data}"
-
-            # Encabezado
-            if self.report_type_data == "Ventas":
-                headers = ["Número", "Sorteo", "Apuesta Total", "Premio Total", "Última Modificación"]
-            else:  # Ganadores
-                headers = ["Fecha Sorteo", "Hora Sorteo", "Número Ganador", "Total Apostado", "Premio Pagado"]
-
-            ws.append(headers)
-
-            # Estilo negrita para encabezados
-            for col in range(1, len(headers) + 1):
-                ws.cell(row=1, column=col).font = Font(bold=True)
-
-            # Agregar datos
-            if self.report_type_data == "Ventas":
-                total_apostado = 0
-                total_premios = 0
-                for fila in self.report_data:
-                    numero, total_apuesta, total_premio, _, sorteo_hora, ultima_mod = fila
-                    ws.append([numero, sorteo_hora, total_apuesta, total_premio, ultima_mod])
-                    total_apostado += total_apuesta
-                    total_premios += total_premio
+    def _titulo_reporte_pdf(self):
+        """Extrae el título del report_content para usarlo en el PDF."""
+        title_text = "Reporte de Ventas" # Default
+        match = re.search(r"--- (.*?) ---", getattr(self, 'report_content', '').split('\n')[0])
+        if match:
+            title_text = match.group(1).strip()
+        return title_text
 
-                # Fila en blanco + Totales
-                ws.append([])
-                ws.append(["", "TOTAL:", total_apostado, total_premios, ""])
 
-                # Negrita en totales
-                total_row = ws.max_row
-                for col in [3, 4]:  # Columnas C y D = índice 3 y 4
-                    ws.cell(row=total_row, column=col).font = Font(bold=True)
+    def _encolar_exportacion(self, descripcion, generar, abrir=True):
+        """
+        Encola la generación de un archivo en el hilo de trabajos.
+        'generar(progreso)' escribe el archivo y retorna su ruta; al terminar se abre
+        con la aplicación del sistema sin bloquear la interfaz.
+        """
+        def _trabajo(trabajo):
+            ruta = generar(trabajo.reportar_progreso)
+            if abrir:
+                try:
+                    abrir_archivo(ruta)
+                except OSError as e:
+                    print(f"⚠️ No se pudo abrir automáticamente {ruta}: {e}")
+            return ruta
 
-            else:
-                for fila in self.report_data:
-                    fecha, sorteo, numero, total_apostado, premio_pagado = fila
-                    ws.append([fecha, sorteo, numero, total_apostado, premio_pagado])
+        self.cola_trabajos.encolar(descripcion, _trabajo)
 
 
-            # Autosize columnas
-            for col_num, _ in enumerate(headers, start=1):
-                ws.column_dimensions[get_column_letter(col_num)].width = 18
+    def _verificar_sorteo_venta_automatico(self):
+        actual_detectado = obtener_sorteo_actual_automatico()
+        sorteo_actual = self.sorteo_var.get()
 
-            # Ruta de guardado
-            reportes_dir = os.path.join(os.getcwd(), "Reportes")
-            os.makedirs(reportes_dir, exist_ok=True)
-            archivo = os.path.join(reportes_dir, f"Reporte_{self.report_type_data}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
-            wb.save(archivo)
+        if actual_detectado != sorteo_actual:
+            self.sorteo_var.set(actual_detectado)
+            winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+            mensaje = f"⏱️ Sorteo actualizado automáticamente a {actual_detectado} según la hora del sistema."
+            self.lbl_estado.config(text=mensaje, bg="#c8e6c9", fg="black")
+            self.frame_estado.config(bg="#c8e6c9")
 
-            messagebox.showinfo("Éxito", f"Reporte exportado exitosamente a:\n{archivo}")
-            os.startfile(archivo) if sys.platform == "win32" else subprocess.Popen(["xdg-open", archivo])
+            # Restaurar color después de 2 segundos
+            self.root.after(2000, lambda: self.frame_estado.config(bg="SystemButtonFace"))
+            self.root.after(2000, lambda: self.lbl_estado.config(bg="SystemButtonFace", fg="black"))
 
-        except ImportError:
-            messagebox.showerror("Error", "El módulo openpyxl no está instalado. Ejecuta:\n\npip install openpyxl")
-        except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error al exportar: {e}")
 
-    
+    def _procesar_eventos_trabajos(self):
+        self.cola_trabajos.procesar_eventos(self._manejar_evento_trabajo)
 
 
-    def imprimir_reporte_gui(self):
-        """Genera un PDF temporal y lo abre para imprimir."""
-        if not hasattr(self, 'report_data') or not self.report_data:
-            messagebox.showwarning("Imprimir Reporte", "No hay contenido de reporte para imprimir.")
+    def _manejar_evento_trabajo(self, tipo, trabajo, dato):
+        """Refleja en la pestaña Reportes el avance de las exportaciones en segundo plano."""
+        if tipo == "resultado_web":
+            # Publicado por SondeoResultados: el ganador ya quedó registrado en la base
+            _, _, _, mensaje = dato
+            self.actualizar_estado(f"🌐 {mensaje}")
+            self._actualizar_ganadores_gestion()
+            self.actualizar_ganadores_desde_ventas()
+            self.verificar_estado_sorteos_del_dia()
+            return
+        if tipo == "grafico":
+            # Publicado por RenderizadorGraficos: la figura ya está dibujada, solo falta mostrarla
+            self._mostrar_grafico_dibujado(*dato)
+            return
+        if tipo == "grafico_error":
+            clave, error = dato
+            print(f"❌ Error al dibujar el gráfico '{clave}': {error}")
             return
 
-        try:
-            temp_pdf_dir = "temp_pdfs"
-            os.makedirs(temp_pdf_dir, exist_ok=True)
-            temp_pdf_path = os.path.join(temp_pdf_dir, f"reporte_temp_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf")
-            
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Helvetica", size=10)
-
-            # Extraer el título del report_content para usarlo en el PDF
-            title_text = "Reporte de Ventas" # Default
-            match = re.search(r"--- (.*?) ---", self.report_content.split('\n')[0])
-            if match:
-                title_text = match.group(1).strip()
-            
-            pdf.set_font("Helvetica", 'B', 14)
-            pdf.cell(0, 10, title_text, 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C')
-            pdf.ln(5)
-            pdf.set_font("Helvetica", size=10)
-
-            line_height_pdf = 7
-
-            if self.report_type_data == "Ventas":
-                # Anchos para el PDF (ajustados para la nueva columna "Última Modificación")
-                col_widths_pdf = {
-                    "Numero": 20,
-                    "Sorteo": 20,
-                    "Apuesta Total": 40,
-                    "Premio Total": 35,
-                    "Última Modificación": 65
-                }
-                
-                # Encabezado de la tabla para Ventas
-                pdf.set_font("Helvetica", 'B', 10)
-                pdf.set_fill_color(220, 220, 220)
-                pdf.cell(col_widths_pdf["Numero"], line_height_pdf, "Número", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
-                pdf.cell(col_widths_pdf["Sorteo"], line_height_pdf, "Sorteo", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
-                pdf.cell(col_widths_pdf["Apuesta Total"], line_height_pdf, "Apuesta Total (C$)", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
-                pdf.cell(col_widths_pdf["Premio Total"], line_height_pdf, "Premio Total (C$)", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
-                pdf.cell(col_widths_pdf["Última Modificación"], line_height_pdf, "Última Modificación", 1, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C', fill=True)
-                pdf.set_font("Helvetica", size=10)
-                pdf.set_fill_color(255, 255, 255)
-
-                total_apostado_general = 0
-                total_premio_potencial_general = 0
-
-                for venta in self.report_data:
-                    numero, apuesta_total, premio_total, _, sorteo_hora, ultima_modificacion_hora_venta = venta
-                    apuesta_formatted = f"{apuesta_total:,.0f}" 
-                    premio_formatted = f"{premio_total:,.0f}"
+        if trabajo.cola is self.cola_fondo:
+            self._manejar_evento_fondo(tipo, trabajo, dato)
+            return
 
-                    pdf.cell(col_widths_pdf["Numero"], line_height_pdf, str(numero), 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C')
-                    pdf.cell(col_widths_pdf["Sorteo"], line_height_pdf, sorteo_hora, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C')
-                    pdf.cell(col_widths_pdf["Apuesta Total"], line_height_pdf, apuesta_formatted, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='L')
-                    pdf.cell(col_widths_pdf["Premio Total"], line_height_pdf, premio_formatted, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='L')
-                    pdf.cell(col_widths_pdf["Última Modificación"], line_height_pdf, ultima_modificacion_hora_venta, 1, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C')
+        pendientes = self.cola_trabajos.pendientes()
+
+        if tipo == "encolado":
+            self.lbl_trabajos.config(text=f"⏳ En cola: {trabajo.descripcion} ({pendientes} pendiente(s))")
+            self.btn_cancelar_trabajos.config(state="normal")
+        elif tipo == "iniciado":
+            self.progreso_trabajos_var.set(0)
+            self.lbl_trabajos.config(text=f"⚙️ Generando: {trabajo.descripcion}...")
+        elif tipo == "progreso":
+            self.progreso_trabajos_var.set(dato)
+        elif tipo == "completado":
+            self.progreso_trabajos_var.set(100)
+            mensaje = f"✅ {trabajo.descripcion} listo: {dato}"
+            self.lbl_trabajos.config(text=mensaje)
+            self.actualizar_estado(mensaje)
+        elif tipo == "cancelado":
+            self.progreso_trabajos_var.set(0)
+            self.lbl_trabajos.config(text=f"🚫 Cancelado: {trabajo.descripcion}")
+        elif tipo == "error":
+            self.progreso_trabajos_var.set(0)
+            self.lbl_trabajos.config(text=f"❌ Error en: {trabajo.descripcion}")
+            if isinstance(dato, ImportError):
+                messagebox.showerror("Error", f"Falta el módulo {dato.name}.\nEjecutá: pip install {dato.name}")
+            else:
+                messagebox.showerror("Error en segundo plano", f"Ocurrió un error en '{trabajo.descripcion}': {dato}")
+
+        if tipo in ("completado", "cancelado", "error") and pendientes == 0:
+            self.btn_cancelar_trabajos.config(state="disabled")
+
+    def _manejar_evento_fondo(self, tipo, trabajo, dato):
+        """Los trabajos de mantenimiento y sincronización se informan en la barra de estado."""
+        if tipo == "iniciado":
+            print(f"⚙️ {trabajo.descripcion}...")
+        elif tipo == "completado":
+            self.actualizar_estado(f"✅ {trabajo.descripcion}: {dato}")
+        elif tipo == "error":
+            self.actualizar_estado(f"❌ Error en: {trabajo.descripcion}", is_error=True)
+            messagebox.showerror("Error en segundo plano", f"Ocurrió un error en '{trabajo.descripcion}': {dato}")
+
+        if trabajo is self._trabajo_mantenimiento and tipo in ("completado", "cancelado", "error"):
+            self._trabajo_mantenimiento = None
+
+        if trabajo is self._trabajo_sincronizacion and tipo in ("completado", "cancelado", "error"):
+            self._trabajo_sincronizacion = None
+            if tipo == "completado":
+                self.actualizar_resumen_ventas_dia()
+                self.mapa_ventas.recargar()
 
-                    total_apostado_general += apuesta_total
-                    total_premio_potencial_general += premio_total
 
-                pdf.ln(5)
-                pdf.set_font("Helvetica", 'B', 11)
-                pdf.cell(0, 7, f"Gran Total Apostado: C${total_apostado_general:,.0f}", 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='L')
-                pdf.cell(0, 7, f"Gran Total Premio Potencial: C${total_premio_potencial_general:,.0f}", 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='L')
-            
-            elif self.report_type_data == "Ganadores":
-                col_widths_pdf = {
-                    "Fecha Sorteo": 30,
-                    "Hora Sorteo": 20,
-                    "Número Ganador": 30,
-                    "Apostado": 30,
-                    "Pagado": 30
-                }
+    def _verificar_mantenimiento(self):
+        if self._trabajo_mantenimiento is None and mantenimiento_pendiente():
+            def _mantener(trabajo):
+                pasos = ejecutar_mantenimiento(progreso=trabajo.reportar_progreso)
+                integridad = dict((paso, resultado) for paso, _, resultado in pasos)["quick_check"]
+                if integridad != "ok":
+                    raise sqlite3.DatabaseError(f"La verificación de integridad encontró problemas: {integridad}")
+                return describir_mantenimiento(pasos)
 
-                pdf.set_font("Helvetica", 'B', 10)
-                pdf.set_fill_color(220, 220, 220)
-                pdf.cell(col_widths_pdf["Fecha Sorteo"], line_height_pdf, "Fecha", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Hora Sorteo"], line_height_pdf, "Sorteo", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Número Ganador"], line_height_pdf, "Ganador", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Apostado"], line_height_pdf, "Apostado (C$)", 1, 0, 'C', True)
-                pdf.cell(col_widths_pdf["Pagado"], line_height_pdf, "Pagado (C$)", 1, 1, 'C', True)
+            self._trabajo_mantenimiento = self.cola_fondo.encolar("Mantenimiento de la base de datos", _mantener)
 
-                pdf.set_font("Helvetica", size=10)
-                pdf.set_fill_color(255, 255, 255)
+    def archivar_anios_cerrados_gui(self):
+        """Mueve las ventas de los años cerrados a data/archive/ para que la base diaria quede liviana."""
+        anios = anios_archivables()
+        if not anios:
+            messagebox.showinfo("Archivar", "No hay años cerrados con ventas en la base principal.")
+            return
+        lista = ", ".join(str(a) for a in anios)
+        if not messagebox.askyesno("Archivar", f"Se moverán a data/archive/ las ventas de: {lista}.\n"
+                                               "Los reportes históricos las seguirán incluyendo.\n\n¿Continuar?"):
+            return
 
-                for fila in self.report_data:
-                    fecha_sorteo, hora_sorteo, numero_ganador, total_apostado, premio_pagado = fila
-                    pdf.cell(col_widths_pdf["Fecha Sorteo"], line_height_pdf, fecha_sorteo, 1, 0, 'C')
-                    pdf.cell(col_widths_pdf["Hora Sorteo"], line_height_pdf, hora_sorteo, 1, 0, 'C')
-                    pdf.cell(col_widths_pdf["Número Ganador"], line_height_pdf, numero_ganador, 1, 0, 'C')
-                    pdf.cell(col_widths_pdf["Apostado"], line_height_pdf, f"{total_apostado:,.0f}", 1, 0, 'R')
-                    pdf.cell(col_widths_pdf["Pagado"], line_height_pdf, f"{premio_pagado:,.0f}", 1, 1, 'R')
+        def _archivar(trabajo):
+            movidas = archivar_anios_cerrados()
+            return ", ".join(f"{anio}: {cantidad} ventas" for anio, cantidad in movidas.items())
 
+        self.cola_fondo.encolar("Archivado de años cerrados", _archivar)
 
-            pdf.output(temp_pdf_path)
-            temp_pdf_files.append(temp_pdf_path)
+    def rellenar_resultados_gui(self):
+        """Trae de la web los resultados que falten desde el primer día con ventas hasta ayer."""
+        conn = conectar_historial()
+        try:
+            desde = conn.execute("SELECT MIN(venta_fecha_solo_dia) FROM ventas").fetchone()[0]
+        finally:
+            conn.close()
+        hasta = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        if not desde or desde > hasta:
+            messagebox.showinfo("Resultados históricos", "No hay días anteriores con ventas.")
+            return
+        if not messagebox.askyesno("Resultados históricos",
+                                   f"Se consultarán en la web los resultados que falten del {desde} al {hasta}.\n"
+                                   "Los días ya consultados antes se omiten.\n\n¿Continuar?"):
+            return
 
-            if sys.platform == "win32":
-                os.startfile(temp_pdf_path)
-            elif sys.platform == "darwin":
-                subprocess.Popen(["open", temp_pdf_path])
-            else:
-                subprocess.Popen(["xdg-open", temp_pdf_path])
+        def _rellenar(trabajo):
+            return describir_relleno(rellenar_resultados(desde, hasta, progreso=trabajo.reportar_progreso))
 
-            messagebox.showinfo("Imprimir Reporte", f"El reporte PDF ha sido generado y se intentará abrir para imprimir:\n{temp_pdf_path}\n\nSi no se abre, por favor ábralo manualmente y use la función de impresión.")
+        self.cola_fondo.encolar("Resultados históricos", _rellenar)
 
-        except FileNotFoundError:
-            messagebox.showerror("Error de Impresión", "No se encontró un programa para abrir PDF. Asegúrese de tener un lector de PDF instalado.")
-        except Exception as e:
-            messagebox.showerror("Error al Imprimir", f"Ocurrió un error al generar/abrir el PDF para impresión: {e}")
-            # print(f"ERROR: Exception during PDF print: {e}") 
+    def configurar_sincronizacion_terminales(self):
+        """Elige la carpeta compartida con las bases de las demás terminales y sincroniza de inmediato."""
+        carpeta_actual = self.config_ui.obtener_texto("sincronizacion_carpeta")
+        carpeta = filedialog.askdirectory(
+            title="Carpeta compartida con las bases de las terminales",
+            initialdir=carpeta_actual or None
+        )
+        if not carpeta:
+            return
+        self._guardar_configuracion_ui("sincronizacion_carpeta", carpeta)
+        self._encolar_sincronizacion(carpeta)
+
+    def _encolar_sincronizacion(self, carpeta):
+        if self._trabajo_sincronizacion is not None:
+            return # Ya hay una sincronización en cola o en curso
+        self._trabajo_sincronizacion = self.cola_fondo.encolar(
+            "Sincronización de terminales",
+            lambda trabajo: describir_sincronizacion(sincronizar_carpeta(carpeta))
+        )
 
+    def _sincronizacion_periodica(self):
+        carpeta = self.config_ui.obtener_texto("sincronizacion_carpeta")
+        if carpeta and os.path.isdir(carpeta):
+            self._encolar_sincronizacion(carpeta)
 
 
     # Funcion para importar base de datos externas para excel y sqlite
     def importar_ventas_externas(self):
         ruta = filedialog.askopenfilename(
             title="Seleccionar archivo de ventas",
-            filetypes=[("Bases de datos SQLite", "*.db"), ("Archivos Excel", "*.xlsx")]
+            filetypes=[("Bases de datos SQLite", "*.db"), ("Archivos Excel", "*.xlsx"), ("Archivos CSV", "*.csv")]
         )
         if not ruta:
             return
@@ -4020,132 +3444,135 @@ class AppLoteria:
         try:
             if ruta.endswith(".db"):
                 self._importar_desde_sqlite(ruta)
-            elif ruta.endswith(".xlsx"):
-                self._importar_desde_excel(ruta)
+            elif ruta.lower().endswith((".xlsx", ".csv")):
+                self._importar_desde_archivo(ruta)
             else:
-                messagebox.showerror("Formato no compatible", "Solo se permiten archivos .db o .xlsx")
+                messagebox.showerror("Formato no compatible", "Solo se permiten archivos .db, .xlsx o .csv")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo importar: {e}")
 
     def _importar_desde_sqlite(self, ruta_externa):
-        conn_ext = sqlite3.connect(ruta_externa)
-        cursor_ext = conn_ext.cursor()
-
-        conn_local = sqlite3.connect(DB_NAME)
-        cursor_local = conn_local.cursor()
+        resumen = importar_desde_sqlite(ruta_externa)
+        messagebox.showinfo(
+            "Importación exitosa",
+            f"Ventas nuevas: {resumen['insertadas']}\n"
+            f"Ventas fusionadas con existentes: {resumen['fusionadas']}\n"
+            f"Ventas omitidas (ya importadas): {resumen['omitidas']}\n"
+            f"Resultados de sorteo nuevos: {resumen['resultados']}"
+        )
+        self.actualizar_resumen_ventas_dia()
+        self.mapa_ventas.recargar()
 
-        # Validar que exista la tabla 'ventas'
-        cursor_ext.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='ventas'")
-        if not cursor_ext.fetchone():
-            messagebox.showerror("Error", "La base seleccionada no contiene una tabla 'ventas'")
+    def _importar_desde_archivo(self, ruta):
+        """Importa un Excel o CSV: primero una simulación para revisar el resumen y luego, si se confirma, la importación."""
+        self.actualizar_estado("🔎 Analizando archivo de importación...")
+        self.root.update_idletasks()
+        vista_previa = importar_desde_archivo(ruta, simulacion=True)
+        if not vista_previa["validas"]:
+            messagebox.showwarning("Importar", "El archivo no tiene ventas válidas.\n\n" + describir_resumen_importacion(vista_previa))
+            return
+        if not messagebox.askyesno("Confirmar importación", describir_resumen_importacion(vista_previa) + "\n\n¿Desea importar estas ventas?"):
             return
 
-        cursor_ext.execute("SELECT * FROM ventas")
-        ventas = cursor_ext.fetchall()
+        resumen = importar_desde_archivo(ruta)
+        messagebox.showinfo("Importación exitosa", describir_resumen_importacion(resumen))
+        self.actualizar_resumen_ventas_dia()
+        self.mapa_ventas.recargar()
 
-        for fila in ventas:
-            try:
-                cursor_local.execute("INSERT INTO ventas VALUES (?, ?, ?, ?, ?, ?, ?)", fila)
-            except sqlite3.IntegrityError:
-                pass  # Ignorar duplicados
+    def mostrar_ventana_exportar_datos_crudos(self):
+        """Abre una ventana para exportar ventas o resultados crudos de un rango de fechas a CSV o Parquet."""
+        ventana = tk.Toplevel(self.root)
+        ventana.title("Exportar Datos Crudos")
+        ventana.resizable(False, False)
+        ventana.grab_set()
 
-        conn_local.commit()
-        conn_ext.close()
-        conn_local.close()
+        tabla_var = tk.StringVar(value="ventas")
+        formato_var = tk.StringVar(value="parquet")
 
-        messagebox.showinfo("Importación exitosa", f"Se importaron {len(ventas)} ventas desde SQLite.")
+        main_frame = ttk.Frame(ventana, padding="15 15 15 15")
+        main_frame.pack(padx=20, pady=20, expand=True)
 
-    def _importar_desde_excel(self, ruta_excel):
-        df = pd.read_excel(ruta_excel)
+        ttk.Label(main_frame, text="Tabla:").grid(row=0, column=0, pady=5, sticky="w")
+        ttk.Combobox(main_frame, textvariable=tabla_var, values=list(TABLAS_EXPORTABLES), state="readonly", width=18).grid(row=0, column=1, pady=5, sticky="ew")
+
+        ttk.Label(main_frame, text="Formato:").grid(row=1, column=0, pady=5, sticky="w")
+        formatos_frame = ttk.Frame(main_frame)
+        formatos_frame.grid(row=1, column=1, pady=5, sticky="w")
+        ttk.Radiobutton(formatos_frame, text="Parquet", variable=formato_var, value="parquet").pack(side="left", padx=5)
+        ttk.Radiobutton(formatos_frame, text="CSV", variable=formato_var, value="csv").pack(side="left", padx=5)
+
+        ttk.Label(main_frame, text="Desde:").grid(row=2, column=0, pady=5, sticky="w")
+        fecha_desde = DateEntry(main_frame, width=12, date_pattern='yyyy-mm-dd')
+        fecha_desde.set_date(datetime.now().replace(day=1))
+        fecha_desde.grid(row=2, column=1, pady=5, sticky="w")
+
+        ttk.Label(main_frame, text="Hasta:").grid(row=3, column=0, pady=5, sticky="w")
+        fecha_hasta = DateEntry(main_frame, width=12, date_pattern='yyyy-mm-dd')
+        fecha_hasta.grid(row=3, column=1, pady=5, sticky="w")
+
+        def _exportar():
+            fecha_inicio = fecha_desde.get_date().strftime('%Y-%m-%d')
+            fecha_fin = fecha_hasta.get_date().strftime('%Y-%m-%d')
+            if fecha_inicio > fecha_fin:
+                messagebox.showerror("Error de Fecha", "La fecha inicial no puede ser posterior a la fecha final.", parent=ventana)
+                return
 
-        columnas_esperadas = {"numero_loteria", "apuesta", "premio_potencial", "fecha_hora", "sorteo_hora", "venta_fecha_solo_dia"}
-        if not columnas_esperadas.issubset(set(df.columns)):
-            raise ValueError("El Excel no tiene columnas válidas. Se requieren:\n" + ", ".join(columnas_esperadas))
+            tabla = tabla_var.get()
+            formato = formato_var.get()
+            destino = filedialog.asksaveasfilename(
+                parent=ventana,
+                title="Guardar exportación",
+                defaultextension=f".{formato}",
+                initialfile=f"{tabla}_{fecha_inicio}_{fecha_fin}.{formato}",
+                filetypes=[("Parquet", "*.parquet")] if formato == "parquet" else [("CSV", "*.csv")]
+            )
+            if not destino:
+                return
 
-        # Si no tiene columna ID, la agregamos como autoincremental ficticia
-        if "id" not in df.columns:
-            df.insert(0, "id", None)
+            def _generar(progreso):
+                # Corre en el hilo de trabajos: los errores (incluido pyarrow faltante)
+                # los informa _manejar_evento_trabajo, y 'Cancelar' corta entre lotes
+                total = exportar_datos_crudos(tabla, formato, destino, fecha_inicio, fecha_fin, progreso=progreso)
+                return f"{total} filas en {destino}"
 
-        conn = sqlite3.connect(DB_NAME)
-        df.to_sql("ventas", conn, if_exists="append", index=False)
-        conn.close()
+            ventana.destroy()
+            self._encolar_exportacion(f"Datos crudos de '{tabla}' ({formato.upper()})", _generar, abrir=False)
+
+        ttk.Button(main_frame, text="Exportar", command=_exportar, style='Accent.TButton').grid(row=4, column=0, columnspan=2, pady=10)
 
-        messagebox.showinfo("Importación exitosa", f"Se importaron {len(df)} ventas desde Excel.")
+        main_frame.grid_columnconfigure(1, weight=1)
+        ventana.update_idletasks()
+        center_window(ventana)
 
     def exportar_ganadores_pdf(self):
-        datos = [self.tree_ganadores.item(i)["values"] for i in self.tree_ganadores.get_children()]
-        if not datos:
+        if not self.datos_ganadores:
             messagebox.showwarning("Exportar PDF", "No hay datos que exportar.")
             return
 
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Helvetica", 'B', 14)
-            pdf.cell(0, 10, "Últimos Ganadores Registrados", ln=True, align="C")
-            pdf.ln(5)
-
-            pdf.set_font("Helvetica", 'B', 10)
-            headers = ["Fecha", "Sorteo", "Ganador"]
-            widths = [40, 40, 40]
-
-            for i, h in enumerate(headers):
-                pdf.cell(widths[i], 7, h, border=1, align='C')
-            pdf.ln()
-
-            pdf.set_font("Helvetica", size=10)
-            for fila in datos:
-                for i, valor in enumerate(fila):
-                    pdf.cell(widths[i], 7, str(valor), border=1, align='C')
-                pdf.ln()
-
-            pdf.cell(0, 10, f"Exportado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True)
-
-            os.makedirs("Reportes", exist_ok=True)
-            archivo = os.path.join("Reportes", f"Ganadores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-            pdf.output(archivo)
-            os.startfile(archivo) if sys.platform == "win32" else subprocess.Popen(["xdg-open", archivo])
-            messagebox.showinfo("Exportado", f"Reporte exportado a PDF:\n{archivo}")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar:\n{e}")
-
-
-    def exportar_ganadores_excel(self):
-        try:
-            import openpyxl
-            from openpyxl.utils import get_column_letter
-            from openpyxl.styles import Font
-
-            datos = [self.tree_ganadores.item(i)["values"] for i in self.tree_ganadores.get_children()]
-            if not datos:
-                messagebox.showwarning("Exportar", "No hay datos que exportar.")
-                return
+        datos = list(self.datos_ganadores.filas())
+        os.makedirs("Reportes", exist_ok=True)
+        archivo = os.path.join("Reportes", f"Ganadores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+        pie = f"Exportado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Ganadores"
+        self._encolar_exportacion("Ganadores (PDF)", lambda progreso: escribir_pdf_tabla_simple(
+            "Últimos Ganadores Registrados", ["Fecha", "Sorteo", "Ganador"], [40, 40, 40],
+            datos, pie, archivo, progreso
+        ))
 
-            headers = ["Fecha", "Sorteo", "Ganador"]
-            ws.append(headers)
 
-            for col in range(1, 4):
-                ws.cell(row=1, column=col).font = Font(bold=True)
+    def exportar_ganadores_excel(self):
+        if not self.datos_ganadores:
+            messagebox.showwarning("Exportar", "No hay datos que exportar.")
+            return
 
-            for fila in datos:
-                ws.append(fila)
+        datos = list(self.datos_ganadores.filas())
+        os.makedirs("Reportes", exist_ok=True)
+        archivo = os.path.join("Reportes", f"Ganadores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
 
-            for i in range(1, 4):
-                ws.column_dimensions[get_column_letter(i)].width = 18
+        self._encolar_exportacion("Ganadores (Excel)", lambda progreso: escribir_excel_tabla_simple(
+            "Ganadores", ["Fecha", "Sorteo", "Ganador"], datos, archivo, progreso
+        ))
 
-            os.makedirs("Reportes", exist_ok=True)
-            archivo = os.path.join("Reportes", f"Ganadores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
-            wb.save(archivo)
-            os.startfile(archivo) if sys.platform == "win32" else subprocess.Popen(["xdg-open", archivo])
-            messagebox.showinfo("Exportado", f"Reporte exportado a Excel:\n{archivo}")
-        except ImportError:
-            messagebox.showerror("Error", "Falta el módulo openpyxl.\nEjecutá: pip install openpyxl")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar:\n{e}")
 
     def imprimir_ganadores_gui(self):
         self.exportar_ganadores_pdf()
@@ -4160,11 +3587,8 @@ class AppLoteria:
 
         # Lista de sorteos válidos para Diaria hoy
         sorteos_hoy = ["11 AM", "03 PM", "09 PM"] + (["06 PM"] if es_sabado else [])
-        pendientes = []
-
-        for s in sorteos_hoy:
-            if not consultar_numero_ganador_db(fecha, s):
-                pendientes.append(s)
+        ganadores = obtener_ganadores_fecha(fecha)
+        pendientes = [s for s in sorteos_hoy if not ganadores.get(s)]
 
         if pendientes:
             texto = f"⚠️ Faltan: {', '.join(pendientes)}"
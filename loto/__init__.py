@@ -0,0 +1 @@
+"""Lógica de datos de la aplicación de lotería, independiente de la interfaz Tk."""
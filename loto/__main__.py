@@ -0,0 +1,238 @@
+"""
+Línea de comandos para tareas por lotes sin abrir la interfaz (nunca importa tkinter).
+
+Ejemplos:
+    python -m loto reporte --datos ventas --periodo por_fecha --desde 2025-01-01 --hasta 2025-01-31
+    python -m loto exportar ventas --formato parquet -o ventas.parquet
+    python -m loto importar caja2.db
+    python -m loto sincronizar //servidor/loto/terminales
+    python -m loto respaldo
+    python -m loto archivar
+    python -m loto mantenimiento
+    python -m loto resultados
+    python -m loto resultados --html "Codigo html loto.txt" --fecha 2025-07-12 --solo-mostrar
+    python -m loto rellenar --desde 2024-01-01 --hasta 2024-12-31
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from loto import base_datos
+
+PERIODOS_REPORTE = ("diario", "semanal", "mensual", "por_fecha")
+
+
+def _comando_reporte(args):
+    from loto.exportacion import escribir_pdf_reporte, escribir_excel_reporte
+
+    parametros = dict(
+        tipo_reporte=args.periodo,
+        fecha_inicio=args.desde,
+        fecha_fin=args.hasta,
+        mes_numero_seleccionado=f"{args.mes:02d}" if args.mes else None,
+        anio_seleccionado=str(args.anio) if args.anio else None,
+        sorteo_seleccionado=args.sorteo,
+    )
+    if args.datos == "ventas":
+        tipo_datos = "Ventas"
+        datos = base_datos.obtener_ventas_para_reporte_db(**parametros)
+    else:
+        tipo_datos = "Ganadores"
+        datos = base_datos.obtener_ganadores_para_reporte_db(**parametros)
+
+    if not datos:
+        print("⚠️ No se encontraron datos para el reporte.")
+        return 1
+
+    salida = args.salida or os.path.join(
+        "Reportes", f"Reporte_{tipo_datos}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.formato}"
+    )
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    if args.formato == "pdf":
+        escribir_pdf_reporte(datos, tipo_datos, f"Reporte de {tipo_datos} ({args.periodo})", salida)
+    else:
+        escribir_excel_reporte(datos, tipo_datos, salida)
+    print(f"✅ Reporte de {tipo_datos.lower()} generado ({len(datos)} filas): {salida}")
+    return 0
+
+
+def _comando_exportar(args):
+    from loto.exportacion import exportar_datos_crudos
+
+    salida = args.salida or f"{args.tabla}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.formato}"
+    filas = exportar_datos_crudos(args.tabla, args.formato, salida, args.desde, args.hasta)
+    print(f"✅ {filas} filas de '{args.tabla}' exportadas a {salida}")
+    return 0
+
+
+def _comando_importar(args):
+    from loto import importacion
+
+    if args.archivo.lower().endswith(".db"):
+        if args.simulacion:
+            print("❌ La simulación solo está disponible para archivos .xlsx o .csv")
+            return 1
+        resumen = importacion.importar_desde_sqlite(args.archivo)
+        print(f"✅ Ventas nuevas: {resumen['insertadas']}, fusionadas: {resumen['fusionadas']}, "
+              f"omitidas: {resumen['omitidas']}, resultados nuevos: {resumen['resultados']}")
+    else:
+        resumen = importacion.importar_desde_archivo(args.archivo, simulacion=args.simulacion)
+        print(importacion.describir_resumen_importacion(resumen))
+    return 0
+
+
+def _comando_sincronizar(args):
+    from loto.sincronizacion import sincronizar_carpeta, describir_sincronizacion
+
+    resultados = sincronizar_carpeta(args.carpeta)
+    print(f"🔄 {describir_sincronizacion(resultados)}")
+    return 1 if any(error for _, _, error in resultados) else 0
+
+
+def _comando_respaldo(args):
+    ruta = base_datos.crear_respaldo_db(args.salida)
+    print(f"✅ Respaldo creado: {ruta}")
+    return 0
+
+
+def _comando_archivar(args):
+    from loto.archivo import archivar_anio, archivar_anios_cerrados
+
+    movidas = {args.anio: archivar_anio(args.anio)} if args.anio else archivar_anios_cerrados()
+    if not movidas:
+        print("ℹ️ No hay años cerrados con ventas en la base principal.")
+    for anio, cantidad in movidas.items():
+        print(f"📦 {anio}: {cantidad} ventas movidas al archivo")
+    return 0
+
+
+def _comando_mantenimiento(args):
+    from loto.mantenimiento import ejecutar_mantenimiento, describir_mantenimiento
+
+    pasos = ejecutar_mantenimiento()
+    print(f"✅ Mantenimiento terminado: {describir_mantenimiento(pasos)}")
+    return 0 if pasos[-1][2] == "ok" else 1
+
+
+def _comando_resultados(args):
+    from loto.resultados_web import obtener_resultados_loto_nicaragua, extraer_sorteos_pagina
+
+    fecha = args.fecha or datetime.now().strftime('%Y-%m-%d')
+    if args.html:
+        # Página guardada: permite revisar el lector sin conexión
+        with open(args.html, encoding="utf-8", errors="replace") as f:
+            sorteos = extraer_sorteos_pagina(f.read())
+        resultados = {sorteo: numero for dia, sorteo, numero in sorteos if dia == fecha}
+    else:
+        resultados = obtener_resultados_loto_nicaragua(fecha)
+    if not resultados:
+        print(f"⚠️ No se encontraron resultados para {fecha}.")
+        return 1
+
+    for sorteo, numero in sorted(resultados.items()):
+        if args.solo_mostrar:
+            print(f"🎯 {fecha} {sorteo}: {numero}")
+        else:
+            _, mensaje = base_datos.registrar_numero_ganador_db(fecha, sorteo, numero)
+            print(mensaje)
+    return 0
+
+
+def _comando_rellenar(args):
+    from loto.relleno_resultados import rellenar_resultados, describir_relleno
+
+    hasta = args.hasta or (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def progreso(actual, total):
+        print(f"\r⏳ {actual}/{total} días", end="", flush=True)
+
+    resumen = rellenar_resultados(args.desde, hasta, hilos=args.hilos, por_segundo=args.por_segundo,
+                                  forzar=args.forzar, progreso=progreso)
+    if resumen["dias"]:
+        print()
+    print(f"✅ {describir_relleno(resumen)}")
+    return 1 if resumen["errores"] else 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m loto", description="Tareas por lotes de la aplicación de lotería.")
+    parser.add_argument("--db", help=f"Ruta de la base de datos (por defecto {base_datos.DB_NAME})")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    reporte = subparsers.add_parser("reporte", help="Genera un reporte de ventas o ganadores en PDF o Excel")
+    reporte.add_argument("--datos", choices=("ventas", "ganadores"), default="ventas")
+    reporte.add_argument("--periodo", choices=PERIODOS_REPORTE, default="diario")
+    reporte.add_argument("--desde", help="Fecha inicial AAAA-MM-DD (periodo por_fecha)")
+    reporte.add_argument("--hasta", help="Fecha final AAAA-MM-DD (periodo por_fecha)")
+    reporte.add_argument("--mes", type=int, help="Mes 1-12 (periodo mensual)")
+    reporte.add_argument("--anio", type=int, help="Año (periodo mensual)")
+    reporte.add_argument("--sorteo", default="Todos", help="Sorteo, p. ej. '11 AM' (por defecto todos)")
+    reporte.add_argument("--formato", choices=("pdf", "xlsx"), default="pdf")
+    reporte.add_argument("-o", "--salida", help="Archivo de salida")
+    reporte.set_defaults(funcion=_comando_reporte)
+
+    exportar = subparsers.add_parser("exportar", help="Exporta datos crudos a CSV o Parquet")
+    exportar.add_argument("tabla", choices=("ventas", "resultados_sorteo"))
+    exportar.add_argument("--formato", choices=("csv", "parquet"), default="csv")
+    exportar.add_argument("--desde", help="Fecha inicial AAAA-MM-DD")
+    exportar.add_argument("--hasta", help="Fecha final AAAA-MM-DD")
+    exportar.add_argument("-o", "--salida", help="Archivo de salida")
+    exportar.set_defaults(funcion=_comando_exportar)
+
+    importar = subparsers.add_parser("importar", help="Importa ventas desde una base .db, un .xlsx o un .csv")
+    importar.add_argument("archivo")
+    importar.add_argument("--simulacion", action="store_true", help="Solo muestra el resumen, sin modificar la base")
+    importar.set_defaults(funcion=_comando_importar)
+
+    sincronizar = subparsers.add_parser("sincronizar", help="Sincroniza las bases de las terminales de una carpeta compartida")
+    sincronizar.add_argument("carpeta")
+    sincronizar.set_defaults(funcion=_comando_sincronizar)
+
+    respaldo = subparsers.add_parser("respaldo", help="Crea una copia de respaldo de la base de datos")
+    respaldo.add_argument("-o", "--salida", help="Archivo de respaldo")
+    respaldo.set_defaults(funcion=_comando_respaldo)
+
+    archivar = subparsers.add_parser("archivar", help="Mueve las ventas de años cerrados a data/archive/ventas_AAAA.db")
+    archivar.add_argument("--anio", type=int, help="Año a archivar (por defecto todos los cerrados)")
+    archivar.set_defaults(funcion=_comando_archivar)
+
+    mantenimiento = subparsers.add_parser("mantenimiento", help="Ejecuta optimize, ANALYZE, vacuum incremental y quick_check")
+    mantenimiento.set_defaults(funcion=_comando_mantenimiento)
+
+    resultados = subparsers.add_parser("resultados", help="Consulta los resultados del día en la web y los registra")
+    resultados.add_argument("--fecha", help="Fecha AAAA-MM-DD (por defecto hoy)")
+    resultados.add_argument("--html", help="Leer una copia guardada de la página en lugar de consultar la web")
+    resultados.add_argument("--solo-mostrar", action="store_true", help="No registra los resultados en la base")
+    resultados.set_defaults(funcion=_comando_resultados)
+
+    rellenar = subparsers.add_parser("rellenar", help="Completa los resultados de un rango de fechas desde la web")
+    rellenar.add_argument("--desde", required=True, help="Fecha inicial AAAA-MM-DD")
+    rellenar.add_argument("--hasta", help="Fecha final AAAA-MM-DD (por defecto ayer)")
+    rellenar.add_argument("--hilos", type=int, default=4, help="Consultas simultáneas (por defecto 4)")
+    rellenar.add_argument("--por-segundo", type=float, default=2.0, help="Máximo de consultas por segundo (por defecto 2)")
+    rellenar.add_argument("--forzar", action="store_true", help="Volver a consultar los días ya consultados antes")
+    rellenar.set_defaults(funcion=_comando_rellenar)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.db:
+        base_datos.DB_NAME = args.db
+        base_datos.DB_DIR = os.path.dirname(args.db) or "."
+    base_datos.crear_tabla()
+
+    try:
+        return args.funcion(args)
+    except ImportError as e:
+        print(f"❌ Falta el módulo {e.name}. Ejecutá: pip install {e.name}")
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Archivado de las ventas de años cerrados en bases separadas (data/archive/ventas_AAAA.db)."""
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from loto import base_datos
+
+
+def _crear_esquema_archivo(conn):
+    """Tabla 'ventas' del archivo: mismas columnas que la principal, conservando los ids originales."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archivo.ventas (
+            id INTEGER PRIMARY KEY,
+            numero_loteria TEXT NOT NULL,
+            apuesta INTEGER NOT NULL,
+            premio_potencial REAL NOT NULL,
+            fecha_hora TEXT NOT NULL,
+            sorteo_hora TEXT NOT NULL,
+            venta_fecha_solo_dia TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS archivo.idx_ventas_dia_sorteo_numero
+        ON ventas (venta_fecha_solo_dia, sorteo_hora, numero_loteria)
+    ''')
+
+
+def anios_archivables(ruta_db=None):
+    """Años anteriores al actual que todavía tienen ventas en la base principal."""
+    conn = sqlite3.connect(ruta_db or base_datos.DB_NAME)
+    try:
+        cursor = conn.execute('''
+            SELECT DISTINCT CAST(substr(venta_fecha_solo_dia, 1, 4) AS INTEGER) AS anio
+            FROM ventas
+            WHERE venta_fecha_solo_dia < ?
+            ORDER BY anio
+        ''', (f"{datetime.now().year}-01-01",))
+        return [fila[0] for fila in cursor]
+    finally:
+        conn.close()
+
+
+def archivar_anio(anio, ruta_db=None):
+    """
+    Mueve las ventas de 'anio' a data/archive/ventas_AAAA.db en una sola transacción:
+    las copia al archivo, verifica la cantidad y recién entonces las borra de la principal.
+    Si el archivo ya existe (p. ej. llegaron importaciones tardías) se agregan a él.
+    Solo se pueden archivar años cerrados. Retorna la cantidad de ventas movidas.
+    """
+    if anio >= datetime.now().year:
+        raise ValueError(f"Solo se pueden archivar años cerrados ({anio} no lo está)")
+
+    ruta_local = Path(ruta_db or base_datos.DB_NAME).resolve()
+    directorio = base_datos.directorio_archivo(ruta_local)
+    os.makedirs(directorio, exist_ok=True)
+    nombre_archivo = f"ventas_{anio}.db"
+    desde, hasta = f"{anio}-01-01", f"{anio}-12-31"
+
+    conn = sqlite3.connect(ruta_local, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS archivo", (os.path.join(directorio, nombre_archivo),))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _crear_esquema_archivo(conn)
+            copiadas = conn.execute(f'''
+                INSERT INTO archivo.ventas ({base_datos.COLUMNAS_VENTAS})
+                SELECT {base_datos.COLUMNAS_VENTAS} FROM main.ventas
+                WHERE venta_fecha_solo_dia BETWEEN ? AND ?
+            ''', (desde, hasta)).rowcount
+            borradas = conn.execute(
+                "DELETE FROM main.ventas WHERE venta_fecha_solo_dia BETWEEN ? AND ?", (desde, hasta)
+            ).rowcount
+            if copiadas != borradas:
+                raise sqlite3.DatabaseError(f"Archivado inconsistente de {anio}: {copiadas} copiadas, {borradas} borradas")
+
+            total = conn.execute("SELECT COUNT(*) FROM archivo.ventas").fetchone()[0]
+            conn.execute('''
+                INSERT OR REPLACE INTO main.archivos_ventas (anio, archivo, filas, fecha_archivado)
+                VALUES (?, ?, ?, ?)
+            ''', (anio, nombre_archivo, total, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("DETACH DATABASE archivo")
+        return copiadas
+    finally:
+        conn.close()
+
+
+def archivar_anios_cerrados(ruta_db=None):
+    """Archiva todos los años cerrados que sigan en la base principal. Retorna {anio: ventas movidas}."""
+    return {anio: archivar_anio(anio, ruta_db) for anio in anios_archivables(ruta_db)}
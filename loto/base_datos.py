@@ -0,0 +1,1300 @@
+"""Configuración y acceso a la base de datos SQLite de la aplicación (sin dependencias de la interfaz)."""
+import calendar
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# --- Configuración de la Base de Datos ---
+DB_DIR = 'data'
+DB_NAME = os.path.join(DB_DIR, 'loteria.db')
+ARCHIVO_SUBDIR = 'archive' # Bases ventas_AAAA.db de los años cerrados, junto a la base principal
+COLUMNAS_VENTAS = "id, numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia"
+SORTEOS = ('11 AM', '03 PM', '06 PM', '09 PM')
+ADJUNTOS_RESERVADOS = 1 # Lugar para el ATTACH propio de quien usa una conexión de historial (p. ej. la importación)
+
+
+def crear_tabla():
+    """Crea las tablas 'ventas', 'configuracion', 'resultados_sorteo' y 'ui_configuracion' en la base de datos si no existen."""
+    os.makedirs(DB_DIR, exist_ok=True)
+
+    # ¡ESTAS DOS LÍNEAS SON FUNDAMENTALES Y DEBEN ESTAR AQUÍ AL INICIO DE LA FUNCIÓN!
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+
+    # Tabla de Ventas (modificada para permitir múltiples ventas del mismo número)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            numero_loteria TEXT NOT NULL,
+            apuesta INTEGER NOT NULL,
+            premio_potencial REAL NOT NULL,
+            fecha_hora TEXT NOT NULL,
+            sorteo_hora TEXT NOT NULL,
+            venta_fecha_solo_dia TEXT NOT NULL
+        )
+    ''')
+
+    # Índices para las consultas por día/sorteo/número y para la fusión de importaciones
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ventas_dia_sorteo_numero ON ventas (venta_fecha_solo_dia, sorteo_hora, numero_loteria)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ventas_fecha_hora ON ventas (fecha_hora)")
+
+    # Procedencia de las ventas importadas de otras terminales: total importado por clave natural
+    # desde cada origen, para que reimportar el mismo archivo no duplique apuestas.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ventas_importadas (
+            origen TEXT NOT NULL,
+            numero_loteria TEXT NOT NULL,
+            venta_fecha_solo_dia TEXT NOT NULL,
+            sorteo_hora TEXT NOT NULL,
+            apuesta INTEGER NOT NULL,
+            premio_potencial REAL NOT NULL,
+            PRIMARY KEY (origen, numero_loteria, venta_fecha_solo_dia, sorteo_hora)
+        )
+    ''')
+
+    # Marca de agua de la sincronización incremental con cada terminal (último id y última modificación vistos)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sincronizacion_origenes (
+            origen TEXT PRIMARY KEY,
+            ruta TEXT,
+            ultimo_id INTEGER NOT NULL DEFAULT 0,
+            ultima_modificacion TEXT NOT NULL DEFAULT '',
+            mtime REAL,
+            ultima_sincronizacion TEXT
+        )
+    ''')
+
+    # Años de ventas movidos a bases de archivo (ver loto/archivo.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archivos_ventas (
+            anio INTEGER PRIMARY KEY,
+            archivo TEXT NOT NULL,
+            filas INTEGER NOT NULL,
+            fecha_archivado TEXT NOT NULL
+        )
+    ''')
+
+    # Tabla de Resultados del Sorteo
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resultados_sorteo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_sorteo TEXT NOT NULL,
+            hora_sorteo TEXT NOT NULL,
+            numero_ganador TEXT NOT NULL,
+            UNIQUE(fecha_sorteo, hora_sorteo)
+        )
+    ''')
+
+    # Liquidación de cada sorteo con ganador registrado (ver liquidar_sorteos)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS liquidaciones (
+            fecha_sorteo TEXT NOT NULL,
+            hora_sorteo TEXT NOT NULL,
+            numero_ganador TEXT NOT NULL,
+            total_vendido INTEGER NOT NULL,
+            apuesta_ganadora INTEGER NOT NULL,
+            premio_pagado REAL NOT NULL,
+            fecha_liquidacion TEXT NOT NULL,
+            PRIMARY KEY (fecha_sorteo, hora_sorteo)
+        )
+    ''')
+
+    # --- INICIO DE CAMBIO CRÍTICO: Nueva estructura para la tabla 'configuracion' ---
+    # Esta tabla es para configuraciones globales de la aplicación, con un ID fijo.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS configuracion (
+            id INTEGER PRIMARY KEY DEFAULT 1,
+            clave_acceso TEXT,
+            premio_por_cordoba_1 REAL DEFAULT 70.0,
+            sorteo_activo TEXT DEFAULT 'DIA',
+            hora_cierre_dia TEXT DEFAULT '13:00',
+            hora_cierre_noche TEXT DEFAULT '21:00',
+            monto_minimo_venta REAL DEFAULT 1.0,
+            max_ventas_numero_sorteo INTEGER DEFAULT 100,
+            tema TEXT DEFAULT 'clam'
+        )
+    ''')
+
+    # Asegurarse de que siempre haya una fila en configuracion con id=1 para los ajustes
+    cursor.execute("INSERT OR IGNORE INTO configuracion (id) VALUES (1)")
+
+    # --- NUEVA TABLA: ui_configuracion para configuraciones específicas de la UI (como anchos de columnas) ---
+    # Esta tabla usa el modelo clave/valor_json para settings dinámicos de UI.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ui_configuracion (
+            clave TEXT PRIMARY KEY,
+            valor_json TEXT
+        )
+    ''')
+
+    # --- LÓGICA DE MIGRACIÓN PARA TABLA 'configuracion' ---
+    # La lógica de migración que te di antes era para tu archivo "02.py".
+    # Ahora que tienes "loto_actualizado.py" y la estructura de "configuracion" ha cambiado,
+    # es mejor un enfoque de "si no existe un valor en la nueva columna, usa el por defecto o migra si es posible".
+
+    # Migrar 'clave_acceso'
+    cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
+    current_clave_acceso = cursor.fetchone()
+    if not current_clave_acceso or not current_clave_acceso[0]:
+        # Intentar migrar desde la vieja tabla de configuración si existiera
+        try:
+            temp_conn = sqlite3.connect(DB_NAME)
+            temp_cursor = temp_conn.cursor()
+            temp_cursor.execute("SELECT valor FROM configuracion WHERE clave = 'clave_acceso'")
+            old_key_value = temp_cursor.fetchone()
+            if old_key_value:
+                new_key_value = old_key_value[0]
+                cursor.execute("UPDATE configuracion SET clave_acceso = ? WHERE id = 1", (new_key_value,))
+                print("✅ Clave de acceso migrada.")
+            temp_conn.close()
+        except sqlite3.OperationalError: # Tabla vieja no existe
+            pass
+        
+        # Si después de la migración sigue sin clave o es nueva DB, inicializar
+        cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
+        final_clave = cursor.fetchone()
+        if not final_clave or not final_clave[0]:
+            # No inicializar con el hash de una cadena vacía, sino dejarla como NULL para que el login se omita.
+            # La clave se establecerá solo cuando el usuario la defina explícitamente en Configuración.
+            clave_inicial_hash = None
+            cursor.execute("UPDATE configuracion SET clave_acceso = ? WHERE id = 1", (clave_inicial_hash,))
+            print("✅ Clave de acceso inicializada.")
+
+    # Migrar 'premio_por_cordoba'
+    cursor.execute("SELECT premio_por_cordoba_1 FROM configuracion WHERE id = 1")
+    current_premio = cursor.fetchone()
+    if not current_premio or current_premio[0] == 80.0: # Si es el valor por defecto, intentar migrar
+        try:
+            temp_conn = sqlite3.connect(DB_NAME)
+            temp_cursor = temp_conn.cursor()
+            temp_cursor.execute("SELECT valor FROM configuracion WHERE clave = 'premio_por_cordoba'")
+            old_premio_value = temp_cursor.fetchone()
+            if old_premio_value:
+                try:
+                    new_premio_value = float(old_premio_value[0])
+                    cursor.execute("UPDATE configuracion SET premio_por_cordoba_1 = ? WHERE id = 1", (new_premio_value,))
+                    print("✅ Premio por cordoba migrado.")
+                except ValueError:
+                    print("❌ No se pudo convertir el valor de 'premio_por_cordoba' a número. Usando valor por defecto.")
+            temp_conn.close()
+        except sqlite3.OperationalError: # Tabla vieja no existe
+            pass
+    
+    # Asegurarse de que el tema tenga un valor
+    cursor.execute("SELECT tema FROM configuracion WHERE id = 1")
+    current_tema = cursor.fetchone()
+    if not current_tema or not current_tema[0]:
+        # Intentar migrar desde la vieja tabla de configuración si existiera
+        try:
+            temp_conn = sqlite3.connect(DB_NAME)
+            temp_cursor = temp_conn.cursor()
+            temp_cursor.execute("SELECT valor FROM configuracion WHERE clave = 'tema'")
+            old_tema_value = temp_cursor.fetchone()
+            if old_tema_value:
+                new_tema_value = old_tema_value[0]
+                cursor.execute("UPDATE configuracion SET tema = ? WHERE id = 1", (new_tema_value,))
+                print("✅ Tema migrado.")
+            temp_conn.close()
+        except sqlite3.OperationalError:
+            pass
+
+        cursor.execute("SELECT tema FROM configuracion WHERE id = 1")
+        final_tema = cursor.fetchone()
+        if not final_tema or not final_tema[0]:
+            cursor.execute("UPDATE configuracion SET tema = 'clam' WHERE id = 1")
+            print("✅ Tema inicializado.")
+
+    # --- FIN DE CAMBIO CRÍTICO ---
+
+    # ¡ESTAS DOS LÍNEAS DEBEN ESTAR AL FINAL DE LA FUNCIÓN, DESPUÉS DE TODAS LAS CREACIONES DE TABLAS Y MIGRACIONES!
+    conn.commit()
+    conn.close()
+
+    # Primera vez con la tabla de liquidaciones: liquidar los sorteos ya registrados
+    conn = conectar_historial()
+    try:
+        sin_liquidar = conn.execute('''
+            SELECT COUNT(*) FROM resultados_sorteo r
+            WHERE NOT EXISTS (SELECT 1 FROM liquidaciones l WHERE l.fecha_sorteo = r.fecha_sorteo AND l.hora_sorteo = r.hora_sorteo)
+        ''').fetchone()[0]
+        if sin_liquidar:
+            liquidar_sorteos(conn)
+            conn.commit()
+            print(f"✅ {sin_liquidar} sorteos liquidados.")
+    finally:
+        conn.close()
+
+# --- Lectura transparente de años archivados ---
+
+def directorio_archivo(ruta_db=None):
+    return os.path.join(os.path.dirname(os.path.abspath(ruta_db or DB_NAME)), ARCHIVO_SUBDIR)
+
+
+def conectar_historial(fecha_inicio=None, fecha_fin=None, ruta_db=None, solo_lectura=False):
+    """
+    Abre la base para consultas de solo lectura que pueden abarcar años archivados.
+
+    Si el rango [fecha_inicio, fecha_fin] (AAAA-MM-DD, cualquiera puede ser None) incluye años
+    archivados, adjunta sus bases y crea la vista temporal 'ventas' (UNION ALL de la tabla
+    principal y las archivadas). Como el esquema temporal tiene prioridad, las consultas
+    existentes sobre 'ventas' leen todo el historial sin cambios. Para escribir en 'ventas'
+    se debe usar main.ventas.
+    """
+    ruta = Path(ruta_db or DB_NAME).resolve()
+    conn = sqlite3.connect(ruta.as_uri() + ("?mode=ro" if solo_lectura else ""), uri=True)
+    return adjuntar_historial(conn, fecha_inicio, fecha_fin)
+
+
+def adjuntar_historial(conn, fecha_inicio=None, fecha_fin=None):
+    """
+    Igual que conectar_historial pero sobre una conexión ya abierta a la base principal,
+    también dentro de una transacción (p. ej. para liquidar sorteos durante una importación).
+    Llamarla de nuevo con otro rango agrega a la vista los años que falten.
+    """
+    try:
+        condiciones, params = [], []
+        if fecha_inicio:
+            condiciones.append("anio >= ?")
+            params.append(int(fecha_inicio[:4]))
+        if fecha_fin:
+            condiciones.append("anio <= ?")
+            params.append(int(fecha_fin[:4]))
+        query = "SELECT anio, archivo FROM main.archivos_ventas"
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        archivados = conn.execute(query + " ORDER BY anio", params).fetchall()
+    except sqlite3.OperationalError:
+        archivados = [] # Base sin la tabla archivos_ventas (anterior al archivado)
+    if not archivados:
+        return conn
+
+    en_transaccion = conn.in_transaction
+    bases = {nombre: archivo for _, nombre, archivo in conn.execute("PRAGMA database_list")}
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS historial_anios (anio INTEGER PRIMARY KEY)")
+    incluidos = {fila[0] for fila in conn.execute("SELECT anio FROM temp.historial_anios")}
+    directorio = directorio_archivo(bases["main"])
+    nuevos = []
+    for anio, archivo in archivados:
+        ruta_archivo = Path(directorio, archivo)
+        if anio in incluidos:
+            continue
+        if ruta_archivo.exists():
+            nuevos.append((anio, ruta_archivo.resolve()))
+        else:
+            print(f"⚠️ Falta el archivo de ventas de {anio}: {ruta_archivo}")
+    if not nuevos:
+        return conn
+
+    # SQLite admite pocas bases adjuntas (10 por defecto): los años más recientes se adjuntan
+    # y los que no entran se copian a una tabla temporal leyéndolos con otra conexión
+    # (DETACH no se puede usar dentro de una transacción)
+    cupo = _cupo_adjuntos(conn, len(set(bases) - {"main", "temp"}))
+    copiados, adjuntos = nuevos[:max(len(nuevos) - cupo, 0)], nuevos[-cupo:] if cupo else []
+    for anio, ruta_archivo in copiados:
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS ventas_archivadas AS SELECT {COLUMNAS_VENTAS} FROM main.ventas WHERE 0")
+        archivo = sqlite3.connect(ruta_archivo.as_uri() + "?mode=ro", uri=True)
+        try:
+            cursor = archivo.execute(f"SELECT {COLUMNAS_VENTAS} FROM ventas")
+            marcadores = ", ".join("?" for _ in COLUMNAS_VENTAS.split(", "))
+            while True:
+                lote = cursor.fetchmany(5000)
+                if not lote:
+                    break
+                conn.executemany(f"INSERT INTO temp.ventas_archivadas VALUES ({marcadores})", lote)
+        finally:
+            archivo.close()
+    for anio, ruta_archivo in adjuntos:
+        conn.execute(f"ATTACH DATABASE ? AS archivo_{anio}", (ruta_archivo.as_uri() + "?mode=ro",))
+    conn.executemany("INSERT INTO temp.historial_anios (anio) VALUES (?)", [(anio,) for anio, _ in nuevos])
+
+    # La vista se rehace con todo lo incluido hasta ahora
+    selects = [f"SELECT {COLUMNAS_VENTAS} FROM main.ventas"]
+    if conn.execute("SELECT 1 FROM temp.sqlite_master WHERE name = 'ventas_archivadas'").fetchone():
+        selects.append(f"SELECT {COLUMNAS_VENTAS} FROM temp.ventas_archivadas")
+    for _, nombre, _ in conn.execute("PRAGMA database_list").fetchall():
+        if nombre.startswith("archivo_"):
+            selects.append(f"SELECT {COLUMNAS_VENTAS} FROM {nombre}.ventas")
+    conn.execute("DROP VIEW IF EXISTS temp.ventas")
+    conn.execute("CREATE TEMP VIEW ventas AS " + " UNION ALL ".join(selects))
+    if not en_transaccion and conn.in_transaction:
+        conn.commit() # Que las escrituras en temp no dejen abierta una transacción implícita
+    return conn
+
+
+def _cupo_adjuntos(conn, ya_adjuntas=0):
+    """Cuántos archivos anuales más se pueden adjuntar a 'conn' sin pasar el límite de SQLite."""
+    if hasattr(conn, "getlimit"): # Python 3.11+
+        limite = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    else:
+        limite = 10 # SQLITE_MAX_ATTACHED por defecto
+    return max(limite - ya_adjuntas - ADJUNTOS_RESERVADOS, 0)
+
+
+def _rango_reporte(tipo_reporte, fecha_inicio, fecha_fin, mes_numero_seleccionado, anio_seleccionado):
+    """Rango de fechas (AAAA-MM-DD o None) que cubre un reporte, para saber qué años archivados adjuntar."""
+    ahora = datetime.now()
+    if tipo_reporte == 'diario':
+        return ahora.strftime('%Y-%m-%d'), None
+    if tipo_reporte == 'semanal':
+        return (ahora - timedelta(days=ahora.weekday())).strftime('%Y-%m-%d'), None
+    if tipo_reporte == 'mensual' and anio_seleccionado:
+        return f"{anio_seleccionado}-01-01", f"{anio_seleccionado}-12-31"
+    if tipo_reporte == 'por_fecha' and fecha_inicio and fecha_fin:
+        return fecha_inicio, fecha_fin
+    return None, None
+
+
+# --- Liquidación de sorteos ---
+
+def liquidar_sorteos(conn, condicion="1", parametros=()):
+    """
+    Calcula en una sola pasada (INSERT ... SELECT) la liquidación de los sorteos de
+    resultados_sorteo que cumplen 'condicion' (sobre el alias r): total vendido del
+    sorteo, apuesta al número ganador y premio pagado. Reemplaza la liquidación anterior,
+    así que sirve tanto al registrar como al corregir un ganador o al llegar ventas tardías.
+    No hace commit; retorna la cantidad de sorteos liquidados.
+    """
+    return conn.execute(f'''
+        INSERT OR REPLACE INTO main.liquidaciones
+            (fecha_sorteo, hora_sorteo, numero_ganador, total_vendido, apuesta_ganadora, premio_pagado, fecha_liquidacion)
+        SELECT r.fecha_sorteo, r.hora_sorteo, r.numero_ganador,
+               COALESCE(SUM(v.apuesta), 0),
+               COALESCE(SUM(CASE WHEN v.numero_loteria = r.numero_ganador THEN v.apuesta END), 0),
+               COALESCE(SUM(CASE WHEN v.numero_loteria = r.numero_ganador THEN v.premio_potencial END), 0),
+               ?
+        FROM main.resultados_sorteo r
+        LEFT JOIN ventas v
+               ON v.venta_fecha_solo_dia = r.fecha_sorteo AND v.sorteo_hora = r.hora_sorteo
+        WHERE {condicion}
+        GROUP BY r.fecha_sorteo, r.hora_sorteo
+    ''', (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), *parametros)).rowcount
+
+
+# --- Funciones de Lógica de Negocio ---
+
+def obtener_premio_por_cordoba_db():
+    """Obtiene el valor del premio por cada 1 córdoba de la base de datos."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("SELECT premio_por_cordoba_1 FROM configuracion WHERE id = 1")
+    resultado = cursor.fetchone()
+    conn.close()
+    try:
+        return int(resultado[0]) if resultado else 70
+    except ValueError:
+        return 70 # En caso de que el valor almacenado no sea un número válido
+    
+
+# --- Nuevas Funciones Auxiliares para Resumen Diario ---
+
+def obtener_numero_mas_vendido_hoy():
+    """Calcula y retorna el número más vendido del día actual y la cantidad de veces que se vendió."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    hoy_str = datetime.now().strftime("%Y-%m-%d")
+
+    cursor.execute("""
+        SELECT numero, COUNT(numero) as cantidad_ventas
+        FROM ventas
+        WHERE substr(fecha_venta, 1, 10) = ?
+        GROUP BY numero
+        ORDER BY cantidad_ventas DESC, numero ASC
+        LIMIT 1
+    """, (hoy_str,))
+    resultado = cursor.fetchone()
+    conn.close()
+
+    if resultado:
+        return f"{resultado[0]} (Vend. {resultado[1]} veces)"
+    return "N/A"
+
+def calcular_total_apostado_hoy():
+    """Calcula y retorna la suma total de las apuestas realizadas el día actual."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    hoy_str = datetime.now().strftime("%Y-%m-%d")
+
+    cursor.execute("""
+        SELECT SUM(apuesta)
+        FROM ventas
+        WHERE substr(fecha_venta, 1, 10) = ?
+    """, (hoy_str,))
+    total = cursor.fetchone()[0]
+    conn.close()
+    return total if total is not None else 0.0
+
+def calcular_ganancia_potencial_total_hoy():
+    """Calcula y retorna la suma total de la ganancia potencial del día actual."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    hoy_str = datetime.now().strftime("%Y-%m-%d")
+
+    cursor.execute("""
+        SELECT SUM(premio_potencial)
+        FROM ventas
+        WHERE substr(fecha_venta, 1, 10) = ?
+    """, (hoy_str,))
+    total = cursor.fetchone()[0]
+    conn.close()
+    return total if total is not None else 0.0
+    
+def obtener_monto_minimo_venta_db():
+    """Obtiene el monto mínimo de venta de la base de datos."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("SELECT monto_minimo_venta FROM configuracion WHERE id = 1")
+    resultado = cursor.fetchone()
+    conn.close()
+    return float(resultado[0]) if resultado else 1.0 # Por defecto 1.0 si no se encuentra
+
+def guardar_configuracion_ui_db(clave, valor_json):
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("INSERT OR REPLACE INTO ui_configuracion (clave, valor_json) VALUES (?, ?)", (clave, valor_json))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error al guardar configuración UI '{clave}': {e}")
+    finally:
+        conn.close()
+
+def guardar_configuraciones_ui_db(valores):
+    """Guarda varias claves de ui_configuracion ({clave: valor_json}) en una sola transacción."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO ui_configuracion (clave, valor_json) VALUES (?, ?)",
+                             list(valores.items()))
+        return True
+    except sqlite3.Error as e:
+        print(f"Error al guardar configuración UI {sorted(valores)}: {e}")
+        return False
+    finally:
+        conn.close()
+
+def cargar_configuracion_ui_db(clave):
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT valor_json FROM ui_configuracion WHERE clave = ?", (clave,))
+        resultado = cursor.fetchone()
+        return resultado[0] if resultado else None
+    except sqlite3.Error as e:
+        print(f"Error al cargar configuración UI '{clave}': {e}")
+        return None
+    finally:
+        conn.close()
+
+def cargar_configuraciones_ui_db():
+    """Toda la tabla ui_configuracion como {clave: valor_json}, en una sola consulta."""
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return dict(conn.execute("SELECT clave, valor_json FROM ui_configuracion").fetchall())
+    except sqlite3.Error as e:
+        print(f"Error al cargar la configuración UI: {e}")
+        return {}
+    finally:
+        conn.close()
+
+def obtener_numero_mas_vendido_del_dia():
+    """
+    Obtiene el número de lotería más vendido del día actual.
+    Retorna el número como una cadena (ej. "05") y su conteo,
+    o None, 0 si no hay ventas hoy.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    
+    hoy = datetime.now().strftime('%Y-%m-%d')
+    
+    cursor.execute(f"""
+        SELECT numero_loteria, COUNT(numero_loteria) as ventas_count
+        FROM ventas
+        WHERE venta_fecha_solo_dia = ?
+        GROUP BY numero_loteria
+        ORDER BY ventas_count DESC, numero_loteria ASC
+        LIMIT 1
+    """, (hoy,))
+    
+    resultado = cursor.fetchone()
+    conn.close()
+    
+    if resultado:
+        return resultado[0], resultado[1] # Retorna (numero_loteria, ventas_count)
+    else:
+        return None, 0 # No hay ventas para hoy
+
+def obtener_tema_db():
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("SELECT tema FROM configuracion WHERE id = 1")
+    tema = cursor.fetchone()
+    conn.close()
+    return tema[0] if tema else 'clam' # Retorna el tema o 'clam' por defecto
+
+def obtener_sorteo_actual_automatico():
+    ahora = datetime.now().time()
+    if ahora < datetime.strptime("12:00", "%H:%M").time():
+        return "11 AM"
+    elif ahora < datetime.strptime("16:00", "%H:%M").time():
+        return "03 PM"
+    elif ahora < datetime.strptime("19:00", "%H:%M").time():
+        return "06 PM"
+    else:
+        return "09 PM"
+
+
+def actualizar_tema_db(nuevo_tema):
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("UPDATE configuracion SET tema = ? WHERE id = 1", (nuevo_tema,))
+    conn.commit()
+    conn.close()
+
+def calcular_premio(apuesta):
+    """Calcula el premio potencial basado en la apuesta y el valor configurado."""
+    premio_por_cordoba = obtener_premio_por_cordoba_db()
+    try:
+        apuesta_int = int(apuesta)
+        return apuesta_int * premio_por_cordoba if apuesta_int > 0 else 0
+    except ValueError:
+        return 0
+
+def formatear_numero_loteria(numero):
+    """Asegura que el número de lotería tenga siempre 2 dígitos (ej. 05 en vez de 5)."""
+    try:
+        numero_int = int(numero)
+        return f"{numero_int:02d}"
+    except ValueError:
+        return ""
+
+# --- Funciones de Interacción con la Base de Datos (Ventas) ---
+
+def registrar_venta_db(numero, apuesta, premio, sorteo_hora):
+    """
+    Registra o actualiza una venta de lotería en la base de datos.
+    Si ya existe una venta para el mismo número, fecha y sorteo, se actualiza la apuesta y el premio,
+    y la 'fecha_hora' de la última modificación. De lo contrario, se inserta una nueva venta.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    fecha_actual_solo_dia = datetime.now().strftime('%Y-%m-%d')
+    fecha_hora_completa_actual = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    numero_formateado = formatear_numero_loteria(numero)
+
+    try:
+        # Intentar encontrar una venta existente para el mismo número, día y sorteo
+        cursor.execute('''
+            SELECT apuesta, premio_potencial FROM ventas
+            WHERE numero_loteria = ? AND venta_fecha_solo_dia = ? AND sorteo_hora = ?
+        ''', (numero_formateado, fecha_actual_solo_dia, sorteo_hora))
+        
+        venta_existente = cursor.fetchone()
+
+        if venta_existente:
+            apuesta_existente, premio_existente = venta_existente
+            nueva_apuesta_total = apuesta_existente + apuesta
+            # El nuevo premio potencial se calcula de nuevo, no se suma, para evitar errores si el multiplicador de premio cambia
+            nuevo_premio_total = calcular_premio(nueva_apuesta_total)
+            
+            cursor.execute('''
+                UPDATE ventas
+                SET apuesta = ?, premio_potencial = ?, fecha_hora = ?
+                WHERE numero_loteria = ? AND venta_fecha_solo_dia = ? AND sorteo_hora = ?
+            ''', (nueva_apuesta_total, nuevo_premio_total, fecha_hora_completa_actual,
+                  numero_formateado, fecha_actual_solo_dia, sorteo_hora))
+            conn.commit()
+            return True, f"✅ Venta actualizada: Número {numero_formateado} ({sorteo_hora}), Apuesta Total C${nueva_apuesta_total}, Premio Total C${nuevo_premio_total} (última mod: {fecha_hora_completa_actual})"
+        else:
+            # Insertar una nueva venta si no existe
+            cursor.execute('''
+                INSERT INTO ventas (numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (numero_formateado, apuesta, premio, fecha_hora_completa_actual, sorteo_hora, fecha_actual_solo_dia))
+            conn.commit()
+            return True, f"✅ Venta registrada: Número {numero_formateado} ({sorteo_hora}), Apuesta C${apuesta}, Premio C${premio}, Fecha: {fecha_hora_completa_actual}"
+
+    except sqlite3.Error as e:
+        return False, f"❌ Error al registrar/actualizar la venta: {e}"
+    finally:
+        conn.close()
+
+def obtener_top_numeros_mas_vendidos_hoy(limit=5):
+    """Devuelve los N números más vendidos hoy con el total de apuesta."""
+    fecha_actual = datetime.now().strftime('%Y-%m-%d')
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    SELECT numero_loteria, SUM(apuesta) as total
+    FROM ventas
+    WHERE venta_fecha_solo_dia = ?
+    GROUP BY numero_loteria
+    ORDER BY total DESC
+    LIMIT ?
+    ''', (fecha_actual, limit))
+
+    resultados = cursor.fetchall()
+    conn.close()
+    return resultados  # Lista de tuplas (numero, total_apuesta)
+
+def obtener_total_apostado_por_sorteo_semana():
+    """Devuelve una lista con el total apostado en la semana por sorteo."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+
+    hoy = datetime.now()
+    lunes = hoy - timedelta(days=hoy.weekday())  # lunes de esta semana
+    fecha_inicio = lunes.strftime('%Y-%m-%d')
+
+    cursor.execute('''
+        SELECT sorteo_hora, SUM(apuesta) as total_apuesta
+        FROM ventas
+        WHERE venta_fecha_solo_dia >= ?
+        GROUP BY sorteo_hora
+        ORDER BY sorteo_hora
+    ''', (fecha_inicio,))
+    
+    resultados = cursor.fetchall()
+    conn.close()
+    return resultados  # Ejemplo: [('03 PM', 450), ('06 PM', 620), ...]
+
+def rango_periodo(tipo, fecha_inicio=None, fecha_fin=None, mes=None, anio=None):
+    """
+    (desde, hasta) en AAAA-MM-DD de un período 'diario', 'semanal', 'mensual' o 'por_fecha'
+    (también acepta las etiquetas de los combos, como "Diario" o "Por fecha"). None es sin límite.
+    """
+    tipo = tipo.lower().replace(" ", "_")
+    hoy = datetime.now()
+    if tipo == "diario":
+        return hoy.strftime('%Y-%m-%d'), hoy.strftime('%Y-%m-%d')
+    if tipo == "semanal":
+        return (hoy - timedelta(days=hoy.weekday())).strftime('%Y-%m-%d'), None
+    if tipo == "por_fecha" and fecha_inicio and fecha_fin:
+        return fecha_inicio, fecha_fin
+    if tipo == "mensual" and mes and anio:
+        ultimo_dia = calendar.monthrange(int(anio), int(mes))[1]
+        return f"{anio}-{int(mes):02d}-01", f"{anio}-{int(mes):02d}-{ultimo_dia:02d}"
+    return None, None
+
+
+def obtener_agregados_graficos(desde=None, hasta=None, ruta_db=None):
+    """
+    Todos los totales que usan los gráficos, en una sola consulta: lo apostado agrupado por
+    número y sorteo (a lo sumo 400 filas, de las que salen los totales por número y por
+    sorteo) y los premios pagados por sorteo según las liquidaciones.
+
+    Retorna un diccionario con 'por_numero' {numero: apostado}, 'por_sorteo' {sorteo: apostado}
+    y 'premios_por_sorteo' {sorteo: premio pagado}.
+    """
+    condiciones, params = [], []
+    if desde:
+        condiciones.append("{dia} >= ?")
+        params.append(desde)
+    if hasta:
+        condiciones.append("{dia} <= ?")
+        params.append(hasta)
+    where = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+
+    conn = conectar_historial(desde, hasta, ruta_db, solo_lectura=True)
+    try:
+        filas = conn.execute(f'''
+            SELECT 'apuesta', numero_loteria, sorteo_hora, SUM(apuesta)
+            FROM ventas{where.format(dia="venta_fecha_solo_dia")}
+            GROUP BY numero_loteria, sorteo_hora
+            UNION ALL
+            SELECT 'premio', NULL, hora_sorteo, SUM(premio_pagado)
+            FROM liquidaciones{where.format(dia="fecha_sorteo")}
+            GROUP BY hora_sorteo
+        ''', params * 2).fetchall()
+    finally:
+        conn.close()
+
+    agregados = {"por_numero": {}, "por_sorteo": {}, "premios_por_sorteo": {}}
+    for tipo, numero, sorteo, total in filas:
+        if tipo == "premio":
+            agregados["premios_por_sorteo"][sorteo] = total or 0
+        else:
+            agregados["por_numero"][numero] = agregados["por_numero"].get(numero, 0) + total
+            agregados["por_sorteo"][sorteo] = agregados["por_sorteo"].get(sorteo, 0) + total
+    return agregados
+
+
+# Inicio del período (AAAA-MM-DD) al que pertenece un día, por granularidad; las semanas empiezan el lunes
+_INICIO_PERIODO_SQL = {
+    "diaria": "{dia}",
+    "semanal": "date({dia}, printf('-%d days', (strftime('%w', {dia}) + 6) % 7))",
+    "mensual": "substr({dia}, 1, 7) || '-01'",
+}
+
+
+def obtener_serie_temporal(granularidad, desde=None, hasta=None, ruta_db=None):
+    """
+    Serie de lo apostado y los premios pagados por día, semana o mes ('diaria', 'semanal',
+    'mensual'), agrupada en SQL: primero por día (recorriendo el índice por fecha) y luego
+    por período, así que trae a lo sumo una fila por período aunque abarque años de ventas.
+
+    Retorna [(inicio del período AAAA-MM-DD, apostado, premios pagados)] en orden cronológico.
+    """
+    inicio = _INICIO_PERIODO_SQL[granularidad.lower()]
+    condiciones, params = [], []
+    if desde:
+        condiciones.append("{dia} >= ?")
+        params.append(desde)
+    if hasta:
+        condiciones.append("{dia} <= ?")
+        params.append(hasta)
+    where = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+
+    conn = conectar_historial(desde, hasta, ruta_db, solo_lectura=True)
+    try:
+        return conn.execute(f'''
+            SELECT periodo, SUM(apostado), SUM(premios) FROM (
+                SELECT {inicio.format(dia="dia")} AS periodo, apostado, 0 AS premios FROM (
+                    SELECT venta_fecha_solo_dia AS dia, SUM(apuesta) AS apostado
+                    FROM ventas{where.format(dia="venta_fecha_solo_dia")}
+                    GROUP BY venta_fecha_solo_dia
+                )
+                UNION ALL
+                SELECT {inicio.format(dia="fecha_sorteo")}, 0, SUM(premio_pagado)
+                FROM liquidaciones{where.format(dia="fecha_sorteo")}
+                GROUP BY fecha_sorteo
+            )
+            GROUP BY periodo
+            ORDER BY periodo
+        ''', params * 2).fetchall()
+    finally:
+        conn.close()
+
+
+def obtener_apuestas_vs_premios_semana():
+    """
+    Devuelve una lista con cada sorteo y su total apostado vs total pagado en premios,
+    desde el lunes hasta hoy.
+    """
+    agregados = obtener_agregados_graficos(*rango_periodo("semanal"))
+    return [(sorteo, agregados["por_sorteo"].get(sorteo, 0), agregados["premios_por_sorteo"].get(sorteo, 0))
+            for sorteo in SORTEOS]
+
+
+def eliminar_ultima_venta_valida_db():
+    """
+    Elimina el último registro real de venta basado en la fecha y hora más reciente.
+    Si su sorteo ya tiene ganador, lo vuelve a liquidar sin esa venta.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT id, venta_fecha_solo_dia, sorteo_hora FROM ventas
+            ORDER BY fecha_hora DESC
+            LIMIT 1
+        ''')
+        ultima = cursor.fetchone()
+        if ultima:
+            id_venta, fecha, sorteo = ultima
+            cursor.execute('DELETE FROM ventas WHERE id = ?', (id_venta,))
+            # Solo hay algo que liquidar si el sorteo ya tiene resultado
+            adjuntar_historial(conn, fecha, fecha)
+            liquidar_sorteos(conn, "r.fecha_sorteo = ? AND r.hora_sorteo = ?", (fecha, sorteo))
+            conn.commit()
+            return True, "✅ Última venta eliminada correctamente."
+        else:
+            return False, "❌ No hay ventas para eliminar."
+    except sqlite3.Error as e:
+        return False, f"❌ Error al eliminar la última venta: {e}"
+    finally:
+        conn.close()
+
+def obtener_todas_las_ventas_db():
+    """Obtiene todos los registros de ventas de la base de datos (individuales, sin agrupar)."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia FROM ventas ORDER BY fecha_hora DESC")
+    ventas = cursor.fetchall()
+    conn.close()
+    return ventas
+
+def obtener_historial_ventas_numero_db(numero):
+    """
+    Obtiene el historial de ventas para un número de lotería específico.
+    Retorna una lista de tuplas con los datos de venta (incluye los años archivados).
+    """
+    conn = conectar_historial()
+    cursor = conn.cursor()
+    numero_formateado = formatear_numero_loteria(numero)
+    cursor.execute('''
+        SELECT fecha_hora, sorteo_hora, apuesta, premio_potencial
+        FROM ventas
+        WHERE numero_loteria = ?
+        ORDER BY fecha_hora DESC
+    ''', (numero_formateado,))
+    historial = cursor.fetchall()
+    conn.close()
+    return historial
+
+def _condicion_rango_ventas(fecha_inicio, fecha_fin):
+    """Condiciones sobre venta_fecha_solo_dia para el rango [fecha_inicio, fecha_fin] (None es sin límite)."""
+    where, params = [], []
+    if fecha_inicio:
+        where.append("venta_fecha_solo_dia >= ?")
+        params.append(fecha_inicio)
+    if fecha_fin:
+        where.append("venta_fecha_solo_dia <= ?")
+        params.append(fecha_fin)
+    return where, params
+
+
+def obtener_resumen_ventas_db(fecha_inicio=None, fecha_fin=None, sorteo=None):
+    """
+    Ventas agrupadas por número y sorteo en el rango (incluye los años archivados), de mayor
+    a menor premio potencial. Retorna [(numero, total_apuesta, total_premio, sorteo)].
+    """
+    where, params = _condicion_rango_ventas(fecha_inicio, fecha_fin)
+    if sorteo:
+        where.append("sorteo_hora = ?")
+        params.append(sorteo)
+    query = "SELECT numero_loteria, SUM(apuesta), SUM(premio_potencial), sorteo_hora FROM ventas"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += '''
+        GROUP BY numero_loteria, sorteo_hora
+        ORDER BY SUM(premio_potencial) DESC, sorteo_hora ASC
+    '''
+    conn = conectar_historial(fecha_inicio, fecha_fin)
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+
+def obtener_totales_ventas_db(fecha_inicio, fecha_fin):
+    """
+    (total vendido, (número más vendido, cantidad de ventas) o None) entre las dos fechas,
+    incluidos los años archivados.
+    """
+    conn = conectar_historial(fecha_inicio, fecha_fin)
+    try:
+        total = conn.execute('''
+            SELECT SUM(apuesta) FROM ventas
+            WHERE venta_fecha_solo_dia BETWEEN ? AND ?
+        ''', (fecha_inicio, fecha_fin)).fetchone()[0] or 0
+        mas_vendido = conn.execute('''
+            SELECT numero_loteria, COUNT(*) AS cantidad
+            FROM ventas
+            WHERE venta_fecha_solo_dia BETWEEN ? AND ?
+            GROUP BY numero_loteria
+            ORDER BY cantidad DESC
+            LIMIT 1
+        ''', (fecha_inicio, fecha_fin)).fetchone()
+        return total, mas_vendido
+    finally:
+        conn.close()
+
+
+def obtener_totales_numero_db(numero, fecha_inicio=None, fecha_fin=None):
+    """
+    (ventas, total apostado, premio potencial, última venta) de 'numero' en el rango,
+    incluidos los años archivados. Sin ventas, las sumas y la última venta son None.
+    """
+    where, params = _condicion_rango_ventas(fecha_inicio, fecha_fin)
+    query = '''
+        SELECT COUNT(*), SUM(apuesta), SUM(premio_potencial), MAX(fecha_hora)
+        FROM ventas
+        WHERE numero_loteria = ?
+    ''' + "".join(f" AND {condicion}" for condicion in where)
+    conn = conectar_historial(fecha_inicio, fecha_fin)
+    try:
+        return conn.execute(query, [formatear_numero_loteria(numero), *params]).fetchone()
+    finally:
+        conn.close()
+
+# <<< CAMBIO INICIADO: Modificar la firma de la función para aceptar un rango de fechas.
+def obtener_ventas_para_reporte_db(tipo_reporte=None, fecha_inicio=None, fecha_fin=None, mes_numero_seleccionado=None, anio_seleccionado=None, sorteo_seleccionado=None):
+# <<< CAMBIO FINALIZADO
+    """
+    Obtiene las ventas para un período específico (diario, semanal, mensual) o por fecha/sorteo.
+    Agrupa por numero_loteria, venta_fecha_solo_dia y sorteo para mostrar la suma total.
+    Ordena por la última fecha_hora de modificación de cada grupo.
+    """
+    conn = conectar_historial(*_rango_reporte(tipo_reporte, fecha_inicio, fecha_fin, mes_numero_seleccionado, anio_seleccionado))
+    cursor = conn.cursor()
+    ahora = datetime.now()
+    
+    where_clauses = []
+    params = []
+
+    if tipo_reporte:
+        if tipo_reporte == 'diario':
+            fecha_comienzo = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+            where_clauses.append("fecha_hora >= ?")
+            params.append(fecha_comienzo.strftime('%Y-%m-%d %H:%M:%S'))
+        elif tipo_reporte == 'semanal':
+            dias_restar = ahora.weekday() # 0 para lunes, 6 para domingo
+            fecha_comienzo = ahora - timedelta(days=dias_restar)
+            fecha_comienzo = fecha_comienzo.replace(hour=0, minute=0, second=0, microsecond=0)
+            where_clauses.append("fecha_hora >= ?")
+            params.append(fecha_comienzo.strftime('%Y-%m-%d %H:%M:%S'))
+        elif tipo_reporte == 'mensual':
+            if mes_numero_seleccionado and anio_seleccionado:
+                try:
+                    mes_int = int(mes_numero_seleccionado)
+                    anio_int = int(anio_seleccionado)
+                    if mes_int == 12:
+                        fecha_fin_mes = datetime(anio_int + 1, 1, 1) - timedelta(days=1)
+                    else:
+                        fecha_fin_mes = datetime(anio_int, mes_int + 1, 1) - timedelta(days=1)
+                    
+                    fecha_inicio_mes = datetime(anio_int, mes_int, 1)
+
+                    where_clauses.append("fecha_hora BETWEEN ? AND ?")
+                    params.append(fecha_inicio_mes.strftime('%Y-%m-%d 00:00:00'))
+                    params.append(fecha_fin_mes.strftime('%Y-%m-%d 23:59:59'))
+                except ValueError:
+                    pass
+        # <<< CAMBIO INICIADO: Usar BETWEEN para el rango de fechas.
+        elif tipo_reporte == 'por_fecha':
+            if fecha_inicio and fecha_fin:
+                where_clauses.append("venta_fecha_solo_dia BETWEEN ? AND ?")
+                params.append(fecha_inicio)
+                params.append(fecha_fin)
+        # <<< CAMBIO FINALIZADO
+    
+    if sorteo_seleccionado and sorteo_seleccionado != "Todos":
+        where_clauses.append("sorteo_hora = ?")
+        params.append(sorteo_seleccionado)
+
+    query = '''
+        SELECT 
+            numero_loteria, 
+            SUM(apuesta) AS total_apuesta, 
+            SUM(premio_potencial) AS total_premio, 
+            venta_fecha_solo_dia, 
+            sorteo_hora,
+            MAX(fecha_hora) AS ultima_modificacion_hora_venta -- Obtener la última fecha_hora de venta
+        FROM ventas
+    '''
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    
+    query += '''
+        GROUP BY numero_loteria, venta_fecha_solo_dia, sorteo_hora
+        ORDER BY ultima_modificacion_hora_venta DESC, numero_loteria ASC -- Ordenar por la última modificación
+    '''
+    # print(f"DEBUG: SQL Query (ventas agrupadas, ordenado por ultima_modificacion_hora_venta): {query}")
+    # print(f"DEBUG: SQL Params (ventas agrupadas): {params}")
+
+    cursor.execute(query, tuple(params))
+    ventas = cursor.fetchall()
+    # print(f"DEBUG: Resultados de la consulta (ventas agrupadas): {ventas}")
+    conn.close()
+    return ventas
+
+# --- Funciones de Interacción con la Base de Datos (Resultados de Sorteo) ---
+
+def registrar_numero_ganador_db(fecha, sorteo, numero_ganador):
+    """
+    Registra el número ganador para una fecha y sorteo específicos.
+    Si ya existe, lo actualiza.
+    """
+    # La liquidación tiene que ver también las ventas del año si ya se archivó
+    conn = conectar_historial(fecha, fecha)
+    cursor = conn.cursor()
+    
+    numero_formateado = formatear_numero_loteria(numero_ganador)
+
+    try:
+        cursor.execute('''
+            SELECT id FROM resultados_sorteo
+            WHERE fecha_sorteo = ? AND hora_sorteo = ?
+        ''', (fecha, sorteo))
+        
+        registro_existente = cursor.fetchone()
+
+        if registro_existente:
+            cursor.execute('''
+                UPDATE resultados_sorteo
+                SET numero_ganador = ?
+                WHERE fecha_sorteo = ? AND hora_sorteo = ?
+            ''', (numero_formateado, fecha, sorteo))
+            liquidar_sorteos(conn, "r.fecha_sorteo = ? AND r.hora_sorteo = ?", (fecha, sorteo))
+            conn.commit()
+            _guardar_ganador_en_cache(fecha, sorteo, numero_formateado)
+            return True, f"✅ Número ganador para {fecha} - {sorteo} actualizado a {numero_formateado}."
+        else:
+            cursor.execute('''
+                INSERT INTO resultados_sorteo (fecha_sorteo, hora_sorteo, numero_ganador)
+                VALUES (?, ?, ?)
+            ''', (fecha, sorteo, numero_formateado))
+            liquidar_sorteos(conn, "r.fecha_sorteo = ? AND r.hora_sorteo = ?", (fecha, sorteo))
+            conn.commit()
+            _guardar_ganador_en_cache(fecha, sorteo, numero_formateado)
+            return True, f"✅ Número ganador {numero_formateado} registrado para {fecha} - {sorteo}."
+    except sqlite3.Error as e:
+        return False, f"❌ Error al registrar/actualizar número ganador: {e}"
+    finally:
+        conn.close()
+
+# Caché en memoria de resultados: {(fecha, sorteo): numero_ganador}. registrar_numero_ganador_db
+# escribe a través de ella; las importaciones que agregan resultados la invalidan, y se descarta
+# sola cuando cambia el PRAGMA data_version de la base (ver _revisar_version_cache).
+_cache_ganadores = {}
+_fechas_en_cache = set()
+_lock_cache_ganadores = threading.Lock()
+_conexion_version = None # (ruta, conexión que solo lee PRAGMA data_version)
+_version_cache = None
+# Funciones que se enteran de cada cambio de la caché: oyente((fecha, sorteo, numero)) por
+# cada ganador registrado y oyente(None) cuando se invalida todo (ver al_cambiar_ganadores).
+_oyentes_ganadores = []
+
+
+def al_cambiar_ganadores(oyente):
+    """Registra un oyente de los resultados registrados (p. ej. el motor de estadísticas)."""
+    _oyentes_ganadores.append(oyente)
+
+
+def quitar_oyente_ganadores(oyente):
+    """Quita un oyente registrado con al_cambiar_ganadores; no hace nada si no estaba."""
+    if oyente in _oyentes_ganadores:
+        _oyentes_ganadores.remove(oyente)
+
+
+def _guardar_ganador_en_cache(fecha, sorteo, numero):
+    with _lock_cache_ganadores:
+        _cache_ganadores[(fecha, sorteo)] = numero
+    for oyente in list(_oyentes_ganadores):
+        oyente((fecha, sorteo, numero))
+
+
+def invalidar_cache_ganadores():
+    """Descarta la caché de resultados (p. ej. después de importar resultados de otra base)."""
+    with _lock_cache_ganadores:
+        _cache_ganadores.clear()
+        _fechas_en_cache.clear()
+    for oyente in list(_oyentes_ganadores):
+        oyente(None)
+
+
+def _revisar_version_cache():
+    """
+    Con el lock de la caché tomado: la vacía si desde la última revisión otra conexión, de
+    este u otro proceso (p. ej. 'python -m loto rellenar' o la sincronización), confirmó
+    cambios en la base. PRAGMA data_version es una lectura en memoria, sin consultar tablas.
+    """
+    global _conexion_version, _version_cache
+    if _conexion_version is None or _conexion_version[0] != DB_NAME:
+        if _conexion_version is not None:
+            _conexion_version[1].close()
+        # La usan todos los hilos, siempre bajo _lock_cache_ganadores
+        _conexion_version = (DB_NAME, sqlite3.connect(DB_NAME, check_same_thread=False))
+        _version_cache = None
+    version = _conexion_version[1].execute("PRAGMA data_version").fetchone()[0]
+    if version != _version_cache:
+        _cache_ganadores.clear()
+        _fechas_en_cache.clear()
+        _version_cache = version
+
+
+def obtener_ganadores_fecha(fecha):
+    """
+    Retorna {sorteo: numero_ganador} con los resultados registrados de 'fecha' (AAAA-MM-DD).
+
+    Todos los sorteos del día se leen con una sola consulta y quedan en caché mientras
+    la base no cambie. Una fecha en caché de hoy (o futura) a la que le falta algún sorteo
+    se vuelve a consultar igual, por si el resultado está por llegar.
+    """
+    with _lock_cache_ganadores:
+        try:
+            _revisar_version_cache()
+        except sqlite3.Error as e:
+            print(f"Error al revisar la caché de números ganadores: {e}")
+            _cache_ganadores.clear()
+            _fechas_en_cache.clear()
+        if fecha in _fechas_en_cache:
+            ganadores = {s: n for (f, s), n in _cache_ganadores.items() if f == fecha}
+            if fecha < datetime.now().strftime('%Y-%m-%d') or len(ganadores) == len(SORTEOS):
+                return ganadores
+
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        filas = conn.execute(
+            "SELECT hora_sorteo, numero_ganador FROM resultados_sorteo WHERE fecha_sorteo = ?", (fecha,)
+        ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al consultar números ganadores: {e}")
+        return {}
+    finally:
+        conn.close()
+
+    ganadores = dict(filas)
+    with _lock_cache_ganadores:
+        for sorteo, numero in ganadores.items():
+            _cache_ganadores[(fecha, sorteo)] = numero
+        _fechas_en_cache.add(fecha)
+    return ganadores
+
+
+def consultar_numero_ganador_db(fecha, sorteo):
+    """Consulta el número ganador para una fecha y sorteo específicos (usa la caché de obtener_ganadores_fecha)."""
+    return obtener_ganadores_fecha(fecha).get(sorteo)
+
+def obtener_ultimos_ganadores_db(limite=5):
+    """Obtiene los últimos números ganadores registrados."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT fecha_sorteo, hora_sorteo, numero_ganador
+            FROM resultados_sorteo
+            ORDER BY fecha_sorteo DESC, hora_sorteo DESC
+            LIMIT ?
+        ''', (limite,))
+        ganadores = cursor.fetchall()
+        return ganadores
+    except sqlite3.Error as e:
+        print(f"Error al obtener últimos ganadores: {e}")
+        return []
+    finally:
+        conn.close()
+
+# <<< CAMBIO INICIADO: Modificar la firma de la función para aceptar un rango de fechas.
+def obtener_ganadores_para_reporte_db(tipo_reporte=None, fecha_inicio=None, fecha_fin=None, mes_numero_seleccionado=None, anio_seleccionado=None, sorteo_seleccionado=None):
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    ahora = datetime.now()
+    
+    where_clauses = []
+    params = []
+
+    if tipo_reporte:
+        if tipo_reporte == 'diario':
+            fecha_comienzo = ahora.strftime('%Y-%m-%d')
+            where_clauses.append("r.fecha_sorteo >= ?")
+            params.append(fecha_comienzo)
+        elif tipo_reporte == 'semanal':
+            lunes = (ahora - timedelta(days=ahora.weekday())).strftime('%Y-%m-%d')
+            where_clauses.append("r.fecha_sorteo >= ?")
+            params.append(lunes)
+        elif tipo_reporte == 'mensual':
+            if mes_numero_seleccionado and anio_seleccionado:
+                fecha_inicio = f"{anio_seleccionado}-{mes_numero_seleccionado}-01"
+                if mes_numero_seleccionado == "12":
+                    fecha_fin = f"{int(anio_seleccionado)+1}-01-01"
+                else:
+                    fecha_fin = f"{anio_seleccionado}-{int(mes_numero_seleccionado)+1:02d}-01"
+                where_clauses.append("r.fecha_sorteo BETWEEN ? AND ?")
+                params.extend([fecha_inicio, fecha_fin])
+        elif tipo_reporte == 'por_fecha':
+            if fecha_inicio and fecha_fin:
+                where_clauses.append("r.fecha_sorteo BETWEEN ? AND ?")
+                params.extend([fecha_inicio, fecha_fin])
+
+    if sorteo_seleccionado and sorteo_seleccionado != "Todos":
+        where_clauses.append("r.hora_sorteo = ?")
+        params.append(sorteo_seleccionado)
+
+    # Cifras de la liquidación de cada sorteo (ver liquidar_sorteos)
+    query = '''
+        SELECT
+            r.fecha_sorteo,
+            r.hora_sorteo,
+            r.numero_ganador,
+            r.apuesta_ganadora AS total_apostado,
+            r.premio_pagado
+        FROM liquidaciones r
+    '''
+
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+
+    query += '''
+        ORDER BY r.fecha_sorteo DESC, r.hora_sorteo ASC
+    '''
+
+    cursor.execute(query, tuple(params))
+    resultados = cursor.fetchall()
+    conn.close()
+    return resultados
+
+# --- Funciones de Acceso y Configuración ---
+
+def verificar_clave_db(clave_ingresada):
+    """Verifica si la clave ingresada coincide con la almacenada en la DB."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
+    clave_hash_almacenada = cursor.fetchone()
+    conn.close()
+
+    if clave_hash_almacenada:
+        return hashlib.sha256(clave_ingresada.encode()).hexdigest() == clave_hash_almacenada[0]
+    return False
+
+def actualizar_clave_db(nueva_clave):
+    """Actualiza la clave de acceso en la base de datos."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    nueva_clave_hash = hashlib.sha256(nueva_clave.encode()).hexdigest()
+    try:
+        cursor.execute("UPDATE configuracion SET clave_acceso = ? WHERE id = 1", (nueva_clave_hash,))
+        return True, "✅ Clave de acceso actualizada correctamente."
+    except sqlite3.Error as e:
+        return False, f"❌ Error al actualizar la clave: {e}"
+    finally:
+        conn.close()
+
+def actualizar_premio_por_cordoba_db(nuevo_valor):
+    """Actualiza el valor del premio por cada C$1 en la base de datos."""
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE configuracion SET premio_por_cordoba_1 = ? WHERE id = 1", (nuevo_valor,))
+        conn.commit()
+        return True, "✅ Premio por cada C$1 actualizado correctamente."
+    except sqlite3.Error as e:
+        return False, f"❌ Error al actualizar el premio por C$1: {e}"
+    finally:
+        conn.close()
+
+def existe_clave_acceso_configurada():
+    """
+    Verifica si existe una clave de acceso configurada en la base de datos
+    que NO sea el hash de una cadena vacía.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute("SELECT clave_acceso FROM configuracion WHERE id = 1")
+    clave_hash_almacenada = cursor.fetchone()
+    conn.close()
+
+    # Calcular el hash de una cadena vacía para compararlo
+    hash_clave_vacia = hashlib.sha256("".encode()).hexdigest()
+
+    # Retorna True solo si hay una clave almacenada Y es diferente al hash de una cadena vacía
+    # Si clave_hash_almacenada es None (porque el campo es NULL), el primer 'if' es falso y retorna False.
+    if clave_hash_almacenada and clave_hash_almacenada[0] != hash_clave_vacia:
+        return True
+    return False
+
+def crear_respaldo_db(destino=None):
+    """
+    Crea una copia consistente de la base con la API de respaldo de SQLite (segura aunque
+    la aplicación esté abierta). Por defecto en data/respaldos/loteria_AAAAMMDD_HHMMSS.db.
+    Retorna la ruta del respaldo.
+    """
+    if not destino:
+        destino = os.path.join(DB_DIR, 'respaldos', f"loteria_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+
+    origen = sqlite3.connect(DB_NAME)
+    copia = sqlite3.connect(destino)
+    try:
+        origen.backup(copia)
+    finally:
+        copia.close()
+        origen.close()
+    return destino
@@ -0,0 +1,59 @@
+"""Almacén columnar compacto para los resultados tipados que se muestran en las grillas."""
+from array import array
+
+# Código de array.array para cada tipo lógico; los textos se guardan en listas.
+_CODIGOS_TIPO = {
+    "entero": "q",
+    "decimal": "d",
+    "texto": None,
+}
+
+
+class TablaColumnar:
+    """
+    Guarda un resultado de consulta por columnas: las numéricas en array.array
+    y las de texto en listas. Es la fuente de datos de las exportaciones, de modo
+    que éstas usan los valores originales y no el texto formateado del Treeview.
+    """
+
+    def __init__(self, columnas):
+        """'columnas' es una lista de tuplas (nombre, tipo) con tipo 'entero', 'decimal' o 'texto'."""
+        self.columnas = list(columnas)
+        self._datos = {}
+        for nombre, tipo in self.columnas:
+            codigo = _CODIGOS_TIPO[tipo]
+            self._datos[nombre] = array(codigo) if codigo else []
+
+    @classmethod
+    def desde_filas(cls, columnas, filas):
+        tabla = cls(columnas)
+        tabla.extender(filas)
+        return tabla
+
+    @property
+    def nombres(self):
+        return [nombre for nombre, _ in self.columnas]
+
+    def agregar(self, fila):
+        for (nombre, tipo), valor in zip(self.columnas, fila):
+            if tipo != "texto" and valor is None:
+                valor = 0
+            self._datos[nombre].append(valor)
+
+    def extender(self, filas):
+        for fila in filas:
+            self.agregar(fila)
+
+    def columna(self, nombre):
+        return self._datos[nombre]
+
+    def filas(self):
+        """Itera las filas como tuplas en el orden de las columnas."""
+        return zip(*(self._datos[nombre] for nombre in self.nombres))
+
+    def __len__(self):
+        primera = self.columnas[0][0] if self.columnas else None
+        return len(self._datos[primera]) if primera else 0
+
+    def __bool__(self):
+        return len(self) > 0
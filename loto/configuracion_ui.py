@@ -0,0 +1,78 @@
+"""Configuración de la interfaz (sashes, anchos de columnas, preferencias) en memoria, respaldada por ui_configuracion."""
+import json
+
+from loto import base_datos
+
+
+class ConfiguracionUI:
+    """
+    Todas las claves de ui_configuracion, leídas con una sola consulta al iniciar. Las
+    lecturas salen del diccionario en memoria (ya decodificadas y con el tipo esperado);
+    'guardar' solo cambia el valor y lo marca como pendiente si es distinto, y 'vaciar'
+    escribe todos los pendientes en una única transacción. Quién la usa decide cuándo
+    vaciar: tras un rato sin cambios, al cerrar la aplicación o enseguida si el usuario
+    pidió guardar.
+    """
+
+    def __init__(self):
+        self._valores = {} # clave -> valor_json
+        self._pendientes = set()
+
+    def cargar(self):
+        """Relee la tabla completa (descarta lo que no se haya guardado todavía)."""
+        self._valores = base_datos.cargar_configuraciones_ui_db()
+        self._pendientes.clear()
+        return self
+
+    def obtener(self, clave, defecto=None):
+        """Valor decodificado de 'clave', o 'defecto' si no existe o no es JSON válido."""
+        valor_json = self._valores.get(clave)
+        if valor_json is None:
+            return defecto
+        try:
+            return json.loads(valor_json)
+        except ValueError:
+            print(f"⚠️ Configuración UI '{clave}' no es JSON válido; se usa el valor por defecto.")
+            return defecto
+
+    def obtener_texto(self, clave, defecto=""):
+        valor = self.obtener(clave)
+        return valor if isinstance(valor, str) else defecto
+
+    def obtener_lista(self, clave, largo=None):
+        """Lista de números (p. ej. posiciones de sashes); None si falta o no tiene 'largo' elementos."""
+        valor = self.obtener(clave)
+        if not isinstance(valor, list) or not all(isinstance(v, (int, float)) for v in valor):
+            return None
+        if largo is not None and len(valor) != largo:
+            return None
+        return valor
+
+    def obtener_anchos(self, clave):
+        """{columna: ancho en píxeles} de un Treeview; {} si falta o no es válido."""
+        valor = self.obtener(clave)
+        if not isinstance(valor, dict):
+            return {}
+        return {columna: int(ancho) for columna, ancho in valor.items() if isinstance(ancho, (int, float))}
+
+    def guardar(self, clave, valor):
+        """Cambia 'clave' en memoria (se guarda como JSON). Retorna True si cambió y quedó pendiente."""
+        valor_json = json.dumps(valor)
+        if self._valores.get(clave) == valor_json:
+            return False
+        self._valores[clave] = valor_json
+        self._pendientes.add(clave)
+        return True
+
+    def hay_pendientes(self):
+        return bool(self._pendientes)
+
+    def vaciar(self):
+        """Escribe los cambios pendientes; retorna cuántas claves se guardaron."""
+        if not self._pendientes:
+            return 0
+        pendientes = {clave: self._valores[clave] for clave in self._pendientes}
+        if not base_datos.guardar_configuraciones_ui_db(pendientes):
+            return 0 # Quedan pendientes para el próximo vaciado
+        self._pendientes.clear()
+        return len(pendientes)
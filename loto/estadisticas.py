@@ -0,0 +1,215 @@
+"""Estadísticas de los números ganadores (frecuencia, atrasos, días de la semana) calculadas con NumPy."""
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from loto import base_datos
+
+CANTIDAD_NUMEROS = 100
+DIAS_SEMANA = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+_INDICE_SORTEO = {sorteo: i for i, sorteo in enumerate(base_datos.SORTEOS)}
+
+
+def _dia_a_entero(fecha):
+    """'AAAA-MM-DD' -> días desde 1970-01-01 (lo que usa datetime64[D])."""
+    return int(np.datetime64(fecha, 'D').astype(np.int64))
+
+
+def _entero_a_dia(dia):
+    return str(np.datetime64(int(dia), 'D'))
+
+
+class EstadisticasSorteos:
+    """
+    Resultados de resultados_sorteo en arreglos NumPy (día, sorteo, número), en orden
+    cronológico. Todas las estadísticas se calculan para los 100 números a la vez con
+    bincount / ufunc.at sobre esos arreglos, sin una consulta por número.
+
+    'aplicar_cambio' incorpora un ganador nuevo o corregido sin releer la tabla; la
+    primera consulta después de una importación (cambio None) la recarga completa.
+    """
+
+    def __init__(self, ruta_db=None):
+        self.ruta_db = ruta_db
+        self._lock = threading.Lock()
+        self._cargado = False
+        self._ordenado = True
+        self._dias = np.empty(0, dtype=np.int64)
+        self._sorteos = np.empty(0, dtype=np.int8)
+        self._numeros = np.empty(0, dtype=np.int16)
+        self._posicion = {} # (dia, indice de sorteo) -> posición en los arreglos
+
+    def _cargar(self):
+        conn = sqlite3.connect(self.ruta_db or base_datos.DB_NAME)
+        try:
+            filas = conn.execute(
+                "SELECT fecha_sorteo, hora_sorteo, numero_ganador FROM resultados_sorteo"
+            ).fetchall()
+        finally:
+            conn.close()
+        filas = [(f, _INDICE_SORTEO[s], n) for f, s, n in filas if s in _INDICE_SORTEO and n.isdigit()]
+        if filas:
+            fechas, sorteos, numeros = zip(*filas)
+            self._dias = np.array(fechas, dtype='datetime64[D]').astype(np.int64)
+            self._sorteos = np.array(sorteos, dtype=np.int8)
+            self._numeros = np.array(numeros, dtype=np.int16)
+        else:
+            self._dias = np.empty(0, dtype=np.int64)
+            self._sorteos = np.empty(0, dtype=np.int8)
+            self._numeros = np.empty(0, dtype=np.int16)
+        self._ordenado = False
+        self._ordenar()
+        self._cargado = True
+
+    def _ordenar(self):
+        if not self._ordenado:
+            orden = np.lexsort((self._sorteos, self._dias))
+            self._dias, self._sorteos, self._numeros = self._dias[orden], self._sorteos[orden], self._numeros[orden]
+            self._posicion = {(int(d), int(s)): i for i, (d, s) in enumerate(zip(self._dias, self._sorteos))}
+            self._ordenado = True
+
+    def _datos(self):
+        """Arreglos listos para calcular (carga u ordena si hace falta). Llamar con el lock tomado."""
+        if not self._cargado:
+            self._cargar()
+        self._ordenar()
+        return self._dias, self._sorteos, self._numeros
+
+    def aplicar_cambio(self, cambio):
+        """Oyente de base_datos: (fecha, sorteo, numero) registrado o corregido, o None para recargar todo."""
+        with self._lock:
+            if cambio is None or not self._cargado:
+                self._cargado = False
+                return
+            fecha, sorteo, numero = cambio
+            if sorteo not in _INDICE_SORTEO:
+                return
+            clave = (_dia_a_entero(fecha), _INDICE_SORTEO[sorteo])
+            self._ordenar()
+            posicion = self._posicion.get(clave)
+            if posicion is not None:
+                self._numeros[posicion] = int(numero)
+                return
+            if len(self._dias) and clave < (int(self._dias[-1]), int(self._sorteos[-1])):
+                self._ordenado = False # Llegó un resultado atrasado: se reordena en la próxima consulta
+            self._posicion[clave] = len(self._dias)
+            self._dias = np.append(self._dias, clave[0])
+            self._sorteos = np.append(self._sorteos, np.int8(clave[1]))
+            self._numeros = np.append(self._numeros, np.int16(int(numero)))
+
+    def _filtro(self, dias, sorteos, desde=None, hasta=None, sorteo=None):
+        mascara = np.ones(len(dias), dtype=bool)
+        if desde:
+            mascara &= dias >= _dia_a_entero(desde)
+        if hasta:
+            mascara &= dias <= _dia_a_entero(hasta)
+        if sorteo and sorteo in _INDICE_SORTEO:
+            mascara &= sorteos == _INDICE_SORTEO[sorteo]
+        return mascara
+
+    def cantidad_sorteos(self, desde=None, hasta=None, sorteo=None):
+        with self._lock:
+            dias, sorteos, _ = self._datos()
+            return int(self._filtro(dias, sorteos, desde, hasta, sorteo).sum())
+
+    def frecuencias(self, desde=None, hasta=None, sorteo=None):
+        """Veces que salió cada número (arreglo de 100) en el período y sorteo indicados."""
+        with self._lock:
+            dias, sorteos, numeros = self._datos()
+            mascara = self._filtro(dias, sorteos, desde, hasta, sorteo)
+            return np.bincount(numeros[mascara], minlength=CANTIDAD_NUMEROS)
+
+    def frecuencias_por_sorteo(self, desde=None, hasta=None):
+        """Matriz (sorteos x 100): veces que salió cada número en cada sorteo, en el orden de SORTEOS."""
+        with self._lock:
+            dias, sorteos, numeros = self._datos()
+            mascara = self._filtro(dias, sorteos, desde, hasta)
+            claves = sorteos[mascara].astype(np.int64) * CANTIDAD_NUMEROS + numeros[mascara]
+            return np.bincount(claves, minlength=len(base_datos.SORTEOS) * CANTIDAD_NUMEROS).reshape(
+                len(base_datos.SORTEOS), CANTIDAD_NUMEROS)
+
+    def frecuencias_por_dia_semana(self, desde=None, hasta=None, sorteo=None):
+        """Matriz (7 x 100): veces que salió cada número cada día de la semana (0 = lunes)."""
+        with self._lock:
+            dias, sorteos, numeros = self._datos()
+            mascara = self._filtro(dias, sorteos, desde, hasta, sorteo)
+            dia_semana = (dias[mascara] + 3) % 7 # 1970-01-01 fue jueves
+            claves = dia_semana * CANTIDAD_NUMEROS + numeros[mascara]
+            return np.bincount(claves, minlength=7 * CANTIDAD_NUMEROS).reshape(7, CANTIDAD_NUMEROS)
+
+    def atrasos(self, hasta=None, sorteo=None):
+        """
+        (actual, maximo): para cada número, cuántos sorteos seguidos lleva sin salir y la
+        racha más larga sin salir, contando sorteos registrados (hasta 'hasta', si se indica).
+        Un número que nunca salió tiene como atraso la cantidad total de sorteos.
+        """
+        with self._lock:
+            dias, sorteos, numeros = self._datos()
+            numeros = numeros[self._filtro(dias, sorteos, None, hasta, sorteo)]
+        total = len(numeros)
+        posiciones = np.arange(total)
+        orden = np.lexsort((posiciones, numeros)) # Por número y, dentro de cada uno, cronológico
+        num_ordenados, pos_ordenadas = numeros[orden], posiciones[orden]
+
+        primera = np.ones(total, dtype=bool)
+        primera[1:] = num_ordenados[1:] != num_ordenados[:-1]
+        anterior = np.empty(total, dtype=np.int64)
+        anterior[0:1] = -1
+        anterior[1:] = pos_ordenadas[:-1]
+        anterior[primera] = -1 # Antes de la primera salida se cuenta desde el primer sorteo
+        huecos = pos_ordenadas - anterior - 1
+
+        maximo = np.zeros(CANTIDAD_NUMEROS, dtype=np.int64)
+        np.maximum.at(maximo, num_ordenados, huecos)
+        ultima = np.full(CANTIDAD_NUMEROS, -1, dtype=np.int64)
+        np.maximum.at(ultima, num_ordenados, pos_ordenadas)
+        actual = total - 1 - ultima
+        return actual, np.maximum(maximo, actual)
+
+    def calientes_y_frios(self, cantidad=5, ultimos_sorteos=60, sorteo=None):
+        """
+        Números calientes (los que más salieron en los últimos 'ultimos_sorteos') y fríos
+        (los de mayor atraso actual), como listas de ('NN', valor).
+        """
+        with self._lock:
+            dias, sorteos, numeros = self._datos()
+            recientes = numeros[self._filtro(dias, sorteos, sorteo=sorteo)][-ultimos_sorteos:]
+        frecuencia = np.bincount(recientes, minlength=CANTIDAD_NUMEROS)
+        actual, _ = self.atrasos(sorteo=sorteo)
+        # argsort estable sobre el negativo: ante empates queda primero el número menor
+        calientes = np.argsort(-frecuencia, kind="stable")[:cantidad]
+        frios = np.argsort(-actual, kind="stable")[:cantidad]
+        return ([(f"{n:02d}", int(frecuencia[n])) for n in calientes],
+                [(f"{n:02d}", int(actual[n])) for n in frios])
+
+    def resumen_numero(self, numero):
+        """Veces ganador, atraso actual y máximo, y día de la semana en que más salió un número."""
+        numero = int(numero)
+        actual, maximo = self.atrasos()
+        por_dia = self.frecuencias_por_dia_semana()[:, numero]
+        veces = int(por_dia.sum())
+        return {
+            "veces": veces,
+            "atraso_actual": int(actual[numero]),
+            "atraso_maximo": int(maximo[numero]),
+            "dia_mas_frecuente": DIAS_SEMANA[int(np.argmax(por_dia))] if veces else None,
+        }
+
+
+_motor = None
+_lock_motor = threading.Lock()
+
+
+def obtener_estadisticas():
+    """Motor de estadísticas compartido de la base actual; se mantiene al día con los ganadores registrados."""
+    global _motor
+    ruta = str(Path(base_datos.DB_NAME).resolve())
+    with _lock_motor:
+        if _motor is None or _motor.ruta_db != ruta:
+            if _motor is not None:
+                base_datos.quitar_oyente_ganadores(_motor.aplicar_cambio)
+            _motor = EstadisticasSorteos(ruta)
+            base_datos.al_cambiar_ganadores(_motor.aplicar_cambio)
+        return _motor
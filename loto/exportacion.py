@@ -0,0 +1,417 @@
+"""Exportación de datos crudos (ventas y resultados) a CSV y Parquet para análisis."""
+import csv
+import sqlite3
+from pathlib import Path
+
+from loto import base_datos
+
+TAMANO_LOTE_EXPORTACION = 5000
+
+# Columnas de cada tabla exportable con su tipo lógico (se usa para el esquema Parquet)
+# y la columna de fecha por la que se filtra el rango.
+TABLAS_EXPORTABLES = {
+    "ventas": {
+        "columna_fecha": "venta_fecha_solo_dia",
+        "columnas": [
+            ("id", "entero"),
+            ("numero_loteria", "texto"),
+            ("apuesta", "entero"),
+            ("premio_potencial", "decimal"),
+            ("fecha_hora", "fecha_hora"),
+            ("sorteo_hora", "texto"),
+            ("venta_fecha_solo_dia", "fecha"),
+        ],
+    },
+    "resultados_sorteo": {
+        "columna_fecha": "fecha_sorteo",
+        "columnas": [
+            ("id", "entero"),
+            ("fecha_sorteo", "fecha"),
+            ("hora_sorteo", "texto"),
+            ("numero_ganador", "texto"),
+        ],
+    },
+}
+
+FORMATOS_EXPORTACION = ("csv", "parquet")
+
+
+def conectar_solo_lectura(ruta_db=None):
+    """Abre la base en modo solo lectura para no bloquear ni modificar el archivo en uso."""
+    ruta = Path(ruta_db or base_datos.DB_NAME).resolve()
+    return sqlite3.connect(ruta.as_uri() + "?mode=ro", uri=True)
+
+
+def _filtro_fechas(tabla, fecha_inicio, fecha_fin):
+    """Cláusula WHERE (o '') y parámetros para el rango [fecha_inicio, fecha_fin] de 'tabla'."""
+    columna_fecha = TABLAS_EXPORTABLES[tabla]["columna_fecha"]
+    where = []
+    params = []
+    if fecha_inicio:
+        where.append(f"{columna_fecha} >= ?")
+        params.append(fecha_inicio)
+    if fecha_fin:
+        where.append(f"{columna_fecha} <= ?")
+        params.append(fecha_fin)
+    return (" WHERE " + " AND ".join(where) if where else ""), tuple(params)
+
+
+def _conectar_tabla(tabla, fecha_inicio, fecha_fin, ruta_db):
+    if tabla == "ventas":
+        # Incluye las ventas de los años archivados que caen en el rango
+        return base_datos.conectar_historial(fecha_inicio, fecha_fin, ruta_db, solo_lectura=True)
+    return conectar_solo_lectura(ruta_db)
+
+
+def contar_filas_tabla(tabla, fecha_inicio=None, fecha_fin=None, ruta_db=None):
+    """Cantidad de filas de 'tabla' en el rango de fechas (para informar el progreso)."""
+    where, params = _filtro_fechas(tabla, fecha_inicio, fecha_fin)
+    conn = _conectar_tabla(tabla, fecha_inicio, fecha_fin, ruta_db)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {tabla}{where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def leer_lotes_tabla(tabla, fecha_inicio=None, fecha_fin=None, tamano_lote=TAMANO_LOTE_EXPORTACION, ruta_db=None):
+    """
+    Genera lotes de filas de 'tabla' (lista de tuplas) leídos con fetchmany,
+    filtrando por el rango de fechas [fecha_inicio, fecha_fin] (formato YYYY-MM-DD).
+    Nunca carga la tabla completa en memoria.
+    """
+    nombres = [nombre for nombre, _ in TABLAS_EXPORTABLES[tabla]["columnas"]]
+    where, params = _filtro_fechas(tabla, fecha_inicio, fecha_fin)
+    query = f"SELECT {', '.join(nombres)} FROM {tabla}{where} ORDER BY id"
+
+    conn = _conectar_tabla(tabla, fecha_inicio, fecha_fin, ruta_db)
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            filas = cursor.fetchmany(tamano_lote)
+            if not filas:
+                break
+            yield filas
+    finally:
+        conn.close()
+
+
+def _escribir_csv(lotes, nombres, destino):
+    total = 0
+    with open(destino, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(nombres)
+        for filas in lotes:
+            writer.writerows(filas)
+            total += len(filas)
+    return total
+
+
+def _esquema_parquet(columnas):
+    import pyarrow as pa
+
+    tipos = {
+        "entero": pa.int64(),
+        "decimal": pa.float64(),
+        "texto": pa.string(),
+        "fecha": pa.date32(),
+        "fecha_hora": pa.timestamp("s"),
+    }
+    return pa.schema([(nombre, tipos[tipo]) for nombre, tipo in columnas])
+
+
+def _escribir_parquet(lotes, columnas, destino, compresion="zstd"):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_parquet(columnas)
+    total = 0
+    with pq.ParquetWriter(destino, esquema, compression=compresion) as writer:
+        for filas in lotes:
+            valores_por_columna = list(zip(*filas))
+            arreglos = []
+            for (nombre, tipo), valores in zip(columnas, valores_por_columna):
+                campo = esquema.field(nombre)
+                if tipo in ("fecha", "fecha_hora"):
+                    # SQLite guarda las fechas como texto ISO; Arrow las convierte al tipo nativo.
+                    arreglos.append(pa.array(valores, type=pa.string()).cast(campo.type))
+                else:
+                    arreglos.append(pa.array(valores, type=campo.type))
+            writer.write_table(pa.Table.from_arrays(arreglos, schema=esquema))
+            total += len(filas)
+    return total
+
+
+def _lotes_con_progreso(lotes, total, progreso):
+    """Reenvía los lotes llamando a 'progreso(filas leídas, total)' antes de cada uno."""
+    leidas = 0
+    for filas in lotes:
+        leidas += len(filas)
+        _avanzar(progreso, leidas, total)
+        yield filas
+
+
+def exportar_datos_crudos(tabla, formato, destino, fecha_inicio=None, fecha_fin=None,
+                          tamano_lote=TAMANO_LOTE_EXPORTACION, ruta_db=None, progreso=None):
+    """
+    Exporta las filas crudas de 'ventas' o 'resultados_sorteo' en el rango de fechas
+    a un archivo CSV o Parquet (columnas tipadas, comprimido con zstd).
+    Lee la base en lotes con fetchmany y escribe cada lote a medida que llega,
+    reportando el avance por lote con 'progreso(actual, total)' (que puede cancelar
+    la exportación lanzando una excepción). Retorna la cantidad de filas exportadas.
+    """
+    if tabla not in TABLAS_EXPORTABLES:
+        raise ValueError(f"Tabla no exportable: {tabla}")
+    formato = formato.lower()
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(f"Formato no soportado: {formato}")
+
+    columnas = TABLAS_EXPORTABLES[tabla]["columnas"]
+    lotes = leer_lotes_tabla(tabla, fecha_inicio, fecha_fin, tamano_lote, ruta_db)
+    if progreso:
+        total = contar_filas_tabla(tabla, fecha_inicio, fecha_fin, ruta_db)
+        lotes = _lotes_con_progreso(lotes, total, progreso)
+
+    if formato == "csv":
+        return _escribir_csv(lotes, [nombre for nombre, _ in columnas], destino)
+    return _escribir_parquet(lotes, columnas, destino)
+
+
+# --- Reportes formateados (PDF / Excel) ---
+# Estas funciones no dependen de la interfaz: reciben los datos ya consultados,
+# escriben el archivo y reportan el avance fila por fila mediante 'progreso(actual, total)'.
+
+FORMATO_CORDOBAS_EXCEL = '"C$"#,##0.00'
+
+
+def formatear_cordobas(valor):
+    """Formato de moneda usado en las grillas y PDFs (ej. C$1,234.00)."""
+    return f"C${valor:,.2f}"
+
+
+def _avanzar(progreso, actual, total):
+    if progreso:
+        progreso(actual, total)
+
+
+def abrir_archivo(ruta):
+    """Abre el archivo con la aplicación predeterminada del sistema."""
+    import os
+    import subprocess
+    import sys
+
+    if sys.platform == "win32":
+        os.startfile(ruta)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", ruta])
+    else:
+        subprocess.Popen(["xdg-open", ruta])
+
+
+def escribir_pdf_reporte(datos, tipo_datos, titulo, ruta, progreso=None):
+    """
+    Escribe el reporte de la pestaña Reportes en formato de tabla PDF.
+    'datos' son las filas de obtener_ventas_para_reporte_db u obtener_ganadores_para_reporte_db
+    según 'tipo_datos' ("Ventas" o "Ganadores").
+    """
+    from fpdf import FPDF, enums
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", 'B', 14)
+    pdf.cell(0, 10, titulo, 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C')
+    pdf.ln(5)
+    pdf.set_font("Helvetica", size=10)
+
+    line_height_pdf = 7
+    total = len(datos)
+
+    if tipo_datos == "Ventas":
+        col_widths_pdf = {
+            "Numero": 20,
+            "Sorteo": 20,
+            "Apuesta Total": 40,
+            "Premio Total": 35,
+            "Última Modificación": 65
+        }
+
+        pdf.set_font("Helvetica", 'B', 10)
+        pdf.set_fill_color(220, 220, 220)
+        pdf.cell(col_widths_pdf["Numero"], line_height_pdf, "Número", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
+        pdf.cell(col_widths_pdf["Sorteo"], line_height_pdf, "Sorteo", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
+        pdf.cell(col_widths_pdf["Apuesta Total"], line_height_pdf, "Apuesta Total (C$)", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
+        pdf.cell(col_widths_pdf["Premio Total"], line_height_pdf, "Premio Total (C$)", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C', fill=True)
+        pdf.cell(col_widths_pdf["Última Modificación"], line_height_pdf, "Última Modificación", 1, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C', fill=True)
+        pdf.set_font("Helvetica", size=10)
+        pdf.set_fill_color(255, 255, 255)
+
+        total_apostado_general = 0
+        total_premio_potencial_general = 0
+
+        for i, venta in enumerate(datos):
+            # numero_loteria, SUM(apuesta), SUM(premio_potencial), venta_fecha_solo_dia, sorteo_hora, MAX(fecha_hora)
+            numero, apuesta_total, premio_total, _, sorteo_hora, ultima_modificacion_hora_venta = venta
+
+            pdf.cell(col_widths_pdf["Numero"], line_height_pdf, str(numero), 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C')
+            pdf.cell(col_widths_pdf["Sorteo"], line_height_pdf, sorteo_hora, 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='C')
+            pdf.cell(col_widths_pdf["Apuesta Total"], line_height_pdf, f"{apuesta_total:,.0f}", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='L')
+            pdf.cell(col_widths_pdf["Premio Total"], line_height_pdf, f"{premio_total:,.0f}", 1, new_x=enums.XPos.RIGHT, new_y=enums.YPos.TOP, align='L')
+            pdf.cell(col_widths_pdf["Última Modificación"], line_height_pdf, ultima_modificacion_hora_venta, 1, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='C')
+
+            total_apostado_general += apuesta_total
+            total_premio_potencial_general += premio_total
+            _avanzar(progreso, i + 1, total)
+
+        pdf.ln(5)
+        pdf.set_font("Helvetica", 'B', 11)
+        pdf.cell(0, 7, f"Gran Total Apostado: C${total_apostado_general:,.0f}", 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='L')
+        pdf.cell(0, 7, f"Gran Total Premio Potencial: C${total_premio_potencial_general:,.0f}", 0, new_x=enums.XPos.LMARGIN, new_y=enums.YPos.NEXT, align='L')
+
+    elif tipo_datos == "Ganadores":
+        col_widths_pdf = {
+            "Fecha Sorteo": 30,
+            "Hora Sorteo": 20,
+            "Número Ganador": 30,
+            "Total Apostado": 30,
+            "Premio Pagado": 30
+        }
+
+        pdf.set_font("Helvetica", 'B', 10)
+        pdf.set_fill_color(220, 220, 220)
+        pdf.cell(col_widths_pdf["Fecha Sorteo"], line_height_pdf, "Fecha", 1, 0, 'C', True)
+        pdf.cell(col_widths_pdf["Hora Sorteo"], line_height_pdf, "Sorteo", 1, 0, 'C', True)
+        pdf.cell(col_widths_pdf["Número Ganador"], line_height_pdf, "Ganador", 1, 0, 'C', True)
+        pdf.cell(col_widths_pdf["Total Apostado"], line_height_pdf, "Apostado (C$)", 1, 0, 'C', True)
+        pdf.cell(col_widths_pdf["Premio Pagado"], line_height_pdf, "Pagado (C$)", 1, 1, 'C', True)
+
+        pdf.set_font("Helvetica", size=10)
+        pdf.set_fill_color(255, 255, 255)
+
+        for i, fila in enumerate(datos):
+            fecha_sorteo, hora_sorteo, numero_ganador, total_apostado, total_pagado = fila
+            pdf.cell(col_widths_pdf["Fecha Sorteo"], line_height_pdf, fecha_sorteo, 1, 0, 'C')
+            pdf.cell(col_widths_pdf["Hora Sorteo"], line_height_pdf, hora_sorteo, 1, 0, 'C')
+            pdf.cell(col_widths_pdf["Número Ganador"], line_height_pdf, numero_ganador, 1, 0, 'C')
+            pdf.cell(col_widths_pdf["Total Apostado"], line_height_pdf, f"{total_apostado:,.0f}", 1, 0, 'R')
+            pdf.cell(col_widths_pdf["Premio Pagado"], line_height_pdf, f"{total_pagado:,.0f}", 1, 1, 'R')
+            _avanzar(progreso, i + 1, total)
+
+    pdf.output(ruta)
+    return ruta
+
+
+def escribir_excel_reporte(datos, tipo_datos, ruta, progreso=None):
+    """Escribe el reporte de la pestaña Reportes en un libro de Excel con valores numéricos."""
+    import openpyxl
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = f"Reporte_{tipo_datos}"
+
+    if tipo_datos == "Ventas":
+        headers = ["Número", "Sorteo", "Apuesta Total", "Premio Total", "Última Modificación"]
+    else:  # Ganadores
+        headers = ["Fecha Sorteo", "Hora Sorteo", "Número Ganador", "Total Apostado", "Premio Pagado"]
+
+    ws.append(headers)
+    for col in range(1, len(headers) + 1):
+        ws.cell(row=1, column=col).font = Font(bold=True)
+
+    total = len(datos)
+    if tipo_datos == "Ventas":
+        total_apostado = 0
+        total_premios = 0
+        for i, fila in enumerate(datos):
+            numero, total_apuesta, total_premio, _, sorteo_hora, ultima_mod = fila
+            ws.append([numero, sorteo_hora, total_apuesta, total_premio, ultima_mod])
+            total_apostado += total_apuesta
+            total_premios += total_premio
+            _avanzar(progreso, i + 1, total)
+
+        # Fila en blanco + Totales
+        ws.append([])
+        ws.append(["", "TOTAL:", total_apostado, total_premios, ""])
+        total_row = ws.max_row
+        for col in [3, 4]:
+            ws.cell(row=total_row, column=col).font = Font(bold=True)
+    else:
+        for i, fila in enumerate(datos):
+            fecha, sorteo, numero, total_apostado, premio_pagado = fila
+            ws.append([fecha, sorteo, numero, total_apostado, premio_pagado])
+            _avanzar(progreso, i + 1, total)
+
+    for col_num, _ in enumerate(headers, start=1):
+        ws.column_dimensions[get_column_letter(col_num)].width = 18
+
+    wb.save(ruta)
+    return ruta
+
+
+def escribir_pdf_tabla_simple(titulo, encabezados, anchos, filas, pie, ruta, progreso=None, formateadores=None):
+    """
+    Escribe una tabla PDF sencilla (resumen de ventas, últimos ganadores) con un pie de página.
+    'formateadores' es una lista opcional con una función por columna para convertir el valor a texto.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", 'B', 14)
+    pdf.cell(0, 10, titulo, ln=True, align="C")
+    pdf.ln(5)
+
+    pdf.set_font("Helvetica", 'B', 10)
+    for i, h in enumerate(encabezados):
+        pdf.cell(anchos[i], 7, h, border=1, align='C')
+    pdf.ln()
+
+    pdf.set_font("Helvetica", size=10)
+    total = len(filas)
+    for n, fila in enumerate(filas):
+        for i, valor in enumerate(fila):
+            texto = formateadores[i](valor) if formateadores and formateadores[i] else str(valor)
+            pdf.cell(anchos[i], 7, texto, border=1, align='C')
+        pdf.ln()
+        _avanzar(progreso, n + 1, total)
+
+    pdf.ln(5)
+    pdf.set_font("Helvetica", 'I', 9)
+    pdf.cell(0, 10, pie, ln=True, align="L")
+
+    pdf.output(ruta)
+    return ruta
+
+
+def escribir_excel_tabla_simple(titulo_hoja, encabezados, filas, ruta, progreso=None, formatos_numero=None):
+    """
+    Escribe una tabla sencilla en un libro de Excel. Los valores se guardan con su tipo
+    (los montos quedan numéricos y se pueden sumar); 'formatos_numero' es una lista
+    opcional con el number_format de cada columna.
+    """
+    import openpyxl
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = titulo_hoja
+
+    ws.append(encabezados)
+    for col in range(1, len(encabezados) + 1):
+        ws.cell(row=1, column=col).font = Font(bold=True)
+
+    total = len(filas)
+    for n, fila in enumerate(filas):
+        ws.append(list(fila))
+        if formatos_numero:
+            for col, formato in enumerate(formatos_numero, start=1):
+                if formato:
+                    ws.cell(row=ws.max_row, column=col).number_format = formato
+        _avanzar(progreso, n + 1, total)
+
+    for i in range(1, len(encabezados) + 1):
+        ws.column_dimensions[get_column_letter(i)].width = 18
+
+    wb.save(ruta)
+    return ruta
@@ -0,0 +1,383 @@
+"""Importación de ventas de otras terminales (bases SQLite, Excel o CSV) a la base local."""
+import os
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+from loto import base_datos
+
+COLUMNAS_VENTAS_IMPORTACION = ("numero_loteria", "apuesta", "premio_potencial", "fecha_hora", "sorteo_hora", "venta_fecha_solo_dia")
+TAMANO_BLOQUE_IMPORTACION = 5000
+
+# Clave natural de una venta agrupada: una fila por número, día y sorteo (igual que registrar_venta_db)
+_CLAVE_NATURAL = ("numero_loteria", "venta_fecha_solo_dia", "sorteo_hora")
+
+
+def _condicion_clave(alias_a, alias_b):
+    return " AND ".join(f"{alias_a}.{c} = {alias_b}.{c}" for c in _CLAVE_NATURAL)
+
+
+def _crear_lote(conn):
+    """Crea (vacía) la tabla temporal '_lote' donde se cargan las ventas a fusionar."""
+    conn.execute("DROP TABLE IF EXISTS temp._lote")
+    conn.execute(f"CREATE TEMP TABLE _lote ({', '.join(COLUMNAS_VENTAS_IMPORTACION)})")
+
+
+def _fusionar_lote(conn, origen, dias_completos=()):
+    """
+    Fusiona las ventas de la tabla temporal '_lote' en 'ventas' dentro de la transacción en curso.
+
+    Las filas se agrupan por la clave natural (número, día, sorteo). 'ventas_importadas'
+    recuerda cuánto se importó de cada clave desde 'origen', de modo que al reimportar
+    el mismo archivo solo se aplica la diferencia y no se duplican apuestas.
+
+    'dias_completos' son días (AAAA-MM-DD) de los que el lote trae todas las ventas del
+    origen, aunque sean ninguna; las claves importadas antes para esos días que ya no
+    aparecen (ventas eliminadas en el origen) se descuentan.
+    Retorna un diccionario con las claves 'insertadas', 'fusionadas' y 'omitidas'.
+    """
+    clave = ", ".join(_CLAVE_NATURAL)
+    if dias_completos:
+        conn.execute("DROP TABLE IF EXISTS temp._dias")
+        conn.execute("CREATE TEMP TABLE _dias (dia TEXT PRIMARY KEY)")
+        conn.executemany("INSERT OR IGNORE INTO temp._dias VALUES (?)", [(dia,) for dia in dias_completos])
+        conn.execute(f'''
+            INSERT INTO temp._lote (numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia)
+            SELECT p.numero_loteria, 0, 0, NULL, p.sorteo_hora, p.venta_fecha_solo_dia
+            FROM main.ventas_importadas p
+            WHERE p.origen = ?
+              AND p.venta_fecha_solo_dia IN (SELECT dia FROM temp._dias)
+              AND NOT EXISTS (SELECT 1 FROM temp._lote l WHERE {_condicion_clave('l', 'p')})
+        ''', (origen,))
+        conn.execute("DROP TABLE temp._dias")
+    conn.execute("DROP TABLE IF EXISTS temp._delta")
+    conn.execute(f'''
+        CREATE TEMP TABLE _delta AS
+        SELECT g.numero_loteria, g.venta_fecha_solo_dia, g.sorteo_hora, g.fecha_hora,
+               g.apuesta, g.premio_potencial,
+               g.apuesta - COALESCE(p.apuesta, 0) AS delta_apuesta,
+               g.premio_potencial - COALESCE(p.premio_potencial, 0) AS delta_premio,
+               EXISTS (SELECT 1 FROM main.ventas v WHERE {_condicion_clave('v', 'g')}) AS existe
+        FROM (
+            SELECT {clave}, SUM(apuesta) AS apuesta, SUM(premio_potencial) AS premio_potencial,
+                   MAX(fecha_hora) AS fecha_hora
+            FROM temp._lote
+            GROUP BY {clave}
+        ) g
+        LEFT JOIN main.ventas_importadas p
+               ON p.origen = ? AND {_condicion_clave('p', 'g')}
+    ''', (origen,))
+    conn.execute(f"CREATE INDEX temp.idx_delta_clave ON _delta ({clave})")
+
+    omitidas = conn.execute("SELECT COUNT(*) FROM temp._delta WHERE delta_apuesta = 0 AND delta_premio = 0").fetchone()[0]
+    conn.execute("DELETE FROM temp._delta WHERE delta_apuesta = 0 AND delta_premio = 0")
+
+    # Ventas que ya existen localmente: se suma la diferencia sobre una sola fila por clave
+    # (bases antiguas pueden tener filas repetidas para la misma clave).
+    fusionadas = conn.execute(f'''
+        UPDATE main.ventas
+        SET apuesta = apuesta + (SELECT d.delta_apuesta FROM temp._delta d WHERE {_condicion_clave('d', 'ventas')}),
+            premio_potencial = premio_potencial + (SELECT d.delta_premio FROM temp._delta d WHERE {_condicion_clave('d', 'ventas')}),
+            fecha_hora = MAX(fecha_hora, COALESCE((SELECT d.fecha_hora FROM temp._delta d WHERE {_condicion_clave('d', 'ventas')}), fecha_hora))
+        WHERE id IN (
+            SELECT MIN(v.id) FROM main.ventas v
+            JOIN temp._delta d ON {_condicion_clave('v', 'd')}
+            WHERE d.existe
+            GROUP BY v.numero_loteria, v.venta_fecha_solo_dia, v.sorteo_hora
+        )
+    ''').rowcount
+
+    # Las claves eliminadas en el origen llegan sin fecha_hora: si localmente ya no existen
+    # (se borraron o archivaron) no hay nada que descontar
+    insertadas = conn.execute(f'''
+        INSERT INTO main.ventas ({', '.join(COLUMNAS_VENTAS_IMPORTACION)})
+        SELECT numero_loteria, delta_apuesta, delta_premio, fecha_hora, sorteo_hora, venta_fecha_solo_dia
+        FROM temp._delta
+        WHERE NOT existe AND fecha_hora IS NOT NULL
+    ''').rowcount
+
+    conn.execute(f'''
+        INSERT OR REPLACE INTO main.ventas_importadas (origen, {clave}, apuesta, premio_potencial)
+        SELECT ?, {clave}, apuesta, premio_potencial FROM temp._delta
+    ''', (origen,))
+
+    if dias_completos:
+        # Ventas que quedaron en cero porque el origen las eliminó
+        conn.execute(f'''
+            DELETE FROM main.ventas
+            WHERE apuesta <= 0
+              AND EXISTS (SELECT 1 FROM temp._delta d WHERE {_condicion_clave('d', 'ventas')})
+        ''')
+        conn.execute("DELETE FROM main.ventas_importadas WHERE origen = ? AND apuesta <= 0", (origen,))
+
+    # Los sorteos ya liquidados de los días tocados se vuelven a liquidar con las ventas nuevas,
+    # contando también las de los años archivados
+    desde, hasta = conn.execute(
+        "SELECT MIN(venta_fecha_solo_dia), MAX(venta_fecha_solo_dia) FROM temp._delta").fetchone()
+    if desde:
+        base_datos.adjuntar_historial(conn, desde, hasta)
+    base_datos.liquidar_sorteos(conn, '''EXISTS (SELECT 1 FROM temp._delta d
+        WHERE d.venta_fecha_solo_dia = r.fecha_sorteo AND d.sorteo_hora = r.hora_sorteo)''')
+
+    conn.execute("DROP TABLE temp._delta")
+    conn.execute("DROP TABLE temp._lote")
+    return {"insertadas": insertadas, "fusionadas": fusionadas, "omitidas": omitidas}
+
+
+def _validar_ventas_externas(conn):
+    cursor = conn.execute("SELECT name FROM ext.sqlite_master WHERE type='table' AND name='ventas'")
+    if not cursor.fetchone():
+        raise ValueError("La base seleccionada no contiene una tabla 'ventas'")
+    columnas = {fila[1] for fila in conn.execute("PRAGMA ext.table_info(ventas)")}
+    faltantes = set(COLUMNAS_VENTAS_IMPORTACION) - columnas
+    if faltantes:
+        raise ValueError("La tabla 'ventas' externa no tiene las columnas: " + ", ".join(sorted(faltantes)))
+
+
+def _conectar_con_externa(ruta_externa, ruta_db=None):
+    """
+    Abre la base local en modo de transacciones manuales y adjunta 'ruta_externa'
+    como 'ext' en solo lectura, validando que tenga una tabla 'ventas' compatible.
+    """
+    ruta_local = ruta_db or base_datos.DB_NAME
+    if os.path.exists(ruta_local) and os.path.samefile(ruta_externa, ruta_local):
+        raise ValueError("No se puede importar la base de datos en uso sobre sí misma")
+
+    # uri=True en la conexión principal es necesario para que ATTACH acepte el modo solo lectura
+    conn = sqlite3.connect(Path(ruta_local).resolve().as_uri(), uri=True, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS ext", (Path(ruta_externa).resolve().as_uri() + "?mode=ro",))
+        _validar_ventas_externas(conn)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _cargar_lote_externo(conn, condicion="1", parametros=()):
+    """Copia a '_lote' las ventas de ext.ventas que cumplen 'condicion', con el número normalizado a dos dígitos."""
+    _crear_lote(conn)
+    conn.execute(f'''
+        INSERT INTO temp._lote
+        SELECT CASE WHEN length(trim(numero_loteria)) = 1 THEN '0' || trim(numero_loteria)
+                    ELSE trim(numero_loteria) END,
+               apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia
+        FROM ext.ventas
+        WHERE {condicion}
+    ''', parametros)
+
+
+def _importar_resultados_externos(conn):
+    """Agrega los resultados de sorteo de 'ext' que no existan localmente; retorna cuántos se agregaron."""
+    if not conn.execute("SELECT 1 FROM ext.sqlite_master WHERE type='table' AND name='resultados_sorteo'").fetchone():
+        return 0
+    agregados = conn.execute('''
+        INSERT OR IGNORE INTO main.resultados_sorteo (fecha_sorteo, hora_sorteo, numero_ganador)
+        SELECT fecha_sorteo, hora_sorteo, numero_ganador FROM ext.resultados_sorteo
+    ''').rowcount
+    if agregados:
+        sin_liquidar = '''NOT EXISTS (SELECT 1 FROM main.liquidaciones l
+            WHERE l.fecha_sorteo = r.fecha_sorteo AND l.hora_sorteo = r.hora_sorteo)'''
+        desde, hasta = conn.execute(
+            f"SELECT MIN(r.fecha_sorteo), MAX(r.fecha_sorteo) FROM main.resultados_sorteo r WHERE {sin_liquidar}"
+        ).fetchone()
+        if desde:
+            base_datos.adjuntar_historial(conn, desde, hasta)
+        base_datos.liquidar_sorteos(conn, sin_liquidar)
+    return agregados
+
+
+def importar_desde_sqlite(ruta_externa, origen=None, ruta_db=None):
+    """
+    Importa las ventas (y los resultados de sorteo, si los tiene) de otra base SQLite
+    con ATTACH: un INSERT ... SELECT por tabla dentro de una sola transacción, sin
+    pasar las filas por Python. Los ids de la base externa se ignoran.
+
+    'origen' identifica la terminal para no duplicar reimportaciones (por defecto el
+    nombre del archivo). Retorna un diccionario con 'insertadas', 'fusionadas',
+    'omitidas' y 'resultados' (resultados de sorteo nuevos).
+    """
+    origen = origen or os.path.basename(ruta_externa)
+    conn = _conectar_con_externa(ruta_externa, ruta_db)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _cargar_lote_externo(conn)
+            resumen = _fusionar_lote(conn, origen)
+            resumen["resultados"] = _importar_resultados_externos(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if resumen["resultados"]:
+            base_datos.invalidar_cache_ganadores()
+        conn.execute("DETACH DATABASE ext")
+        return resumen
+    finally:
+        conn.close()
+
+
+# --- Importación por bloques desde Excel (.xlsx) y CSV ---
+
+def _leer_bloques_excel(ruta, tamano_bloque):
+    import openpyxl
+    import pandas as pd
+
+    # read_only recorre la hoja fila a fila sin cargar el libro completo
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [str(c).strip() if c is not None else "" for c in next(filas, ())]
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= tamano_bloque:
+                yield pd.DataFrame(bloque, columns=encabezados)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezados)
+    finally:
+        libro.close()
+
+
+def leer_bloques_archivo(ruta, tamano_bloque=TAMANO_BLOQUE_IMPORTACION):
+    """Genera DataFrames de a lo más 'tamano_bloque' filas de un archivo .xlsx o .csv."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".csv":
+        import pandas as pd
+        lector = pd.read_csv(ruta, chunksize=tamano_bloque, dtype=str, keep_default_na=False, skipinitialspace=True)
+        with lector:
+            yield from lector
+    elif extension == ".xlsx":
+        yield from _leer_bloques_excel(ruta, tamano_bloque)
+    else:
+        raise ValueError("Solo se permiten archivos .db, .xlsx o .csv")
+
+
+def _normalizar_bloque(df):
+    """
+    Valida y normaliza un bloque con operaciones vectorizadas de pandas.
+    Retorna (DataFrame válido con COLUMNAS_VENTAS_IMPORTACION, Counter de motivos de rechazo).
+    """
+    import pandas as pd
+
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    faltantes = set(COLUMNAS_VENTAS_IMPORTACION) - set(df.columns) - {"venta_fecha_solo_dia"}
+    if faltantes:
+        raise ValueError("El archivo no tiene columnas válidas. Faltan: " + ", ".join(sorted(faltantes)))
+
+    numero = pd.to_numeric(df["numero_loteria"], errors="coerce")
+    apuesta = pd.to_numeric(df["apuesta"], errors="coerce")
+    premio = pd.to_numeric(df["premio_potencial"], errors="coerce")
+
+    # Sorteo: acepta '3 pm' o '3PM' y lo lleva a la forma de la aplicación ('03 PM')
+    partes = df["sorteo_hora"].astype(str).str.strip().str.upper().str.extract(r"^(\d{1,2})\s*(AM|PM)$")
+    sorteo = partes[0].str.zfill(2) + " " + partes[1]
+
+    # format="ISO8601": sin formato pandas adivina uno con la primera fila del bloque y
+    # descarta como inválidas las demás formas ISO ('2024-01-02 11:00', '2024-01-02')
+    fecha_hora = pd.to_datetime(df["fecha_hora"], errors="coerce", format="ISO8601")
+    if "venta_fecha_solo_dia" in df.columns:
+        dia = pd.to_datetime(df["venta_fecha_solo_dia"], errors="coerce", format="ISO8601")
+        dia = dia.dt.normalize().fillna(fecha_hora.dt.normalize())
+    else:
+        dia = fecha_hora.dt.normalize()
+
+    # El primer motivo que falla es el que se informa para la fila
+    validaciones = [
+        ("número fuera de 00-99", numero.notna() & (numero % 1 == 0) & numero.between(0, 99)),
+        ("apuesta inválida", apuesta.notna() & (apuesta % 1 == 0) & (apuesta > 0)),
+        ("premio inválido", premio.notna() & (premio >= 0)),
+        ("sorteo desconocido", sorteo.isin(base_datos.SORTEOS)),
+        ("fecha inválida", fecha_hora.notna() & dia.notna()),
+    ]
+    rechazos = Counter()
+    validas = pd.Series(True, index=df.index)
+    for motivo, condicion in validaciones:
+        fallan = validas & ~condicion
+        if fallan.any():
+            rechazos[motivo] += int(fallan.sum())
+        validas &= condicion
+
+    resultado = pd.DataFrame({
+        "numero_loteria": numero[validas].astype(int).map("{:02d}".format),
+        "apuesta": apuesta[validas].astype(int),
+        "premio_potencial": premio[validas].astype(float),
+        "fecha_hora": fecha_hora[validas].dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "sorteo_hora": sorteo[validas],
+        "venta_fecha_solo_dia": dia[validas].dt.strftime("%Y-%m-%d"),
+    }, columns=list(COLUMNAS_VENTAS_IMPORTACION))
+    return resultado, rechazos
+
+
+def importar_desde_archivo(ruta, simulacion=False, origen=None, tamano_bloque=TAMANO_BLOQUE_IMPORTACION,
+                           ruta_db=None, progreso=None):
+    """
+    Importa ventas de un .xlsx o .csv leyendo por bloques: cada bloque se valida y
+    normaliza con pandas, se descartan las filas repetidas del archivo y el resto se
+    escribe con executemany en la tabla temporal que luego se fusiona con 'ventas'
+    igual que en importar_desde_sqlite.
+
+    Con simulacion=True todo se ejecuta y se deshace al final (ROLLBACK), de modo que el
+    resumen muestra exactamente lo que haría la importación sin modificar la base.
+    'progreso(filas_leidas)' se llama después de cada bloque.
+
+    Retorna un diccionario con 'leidas', 'validas', 'duplicadas', 'rechazadas' (Counter por
+    motivo), 'insertadas', 'fusionadas', 'omitidas' y 'simulacion'.
+    """
+    import pandas as pd
+
+    origen = origen or os.path.basename(ruta)
+    resumen = {"leidas": 0, "validas": 0, "duplicadas": 0, "rechazadas": Counter(), "simulacion": simulacion}
+    vistos = set()
+    marcadores = ", ".join("?" for _ in COLUMNAS_VENTAS_IMPORTACION)
+
+    conn = sqlite3.connect(ruta_db or base_datos.DB_NAME, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _crear_lote(conn)
+            for bloque in leer_bloques_archivo(ruta, tamano_bloque):
+                resumen["leidas"] += len(bloque)
+                validas, rechazos = _normalizar_bloque(bloque)
+                resumen["rechazadas"].update(rechazos)
+
+                # Filas idénticas repetidas dentro del archivo (p. ej. exportaciones pegadas dos veces)
+                huellas = pd.util.hash_pandas_object(validas, index=False)
+                repetidas = huellas.duplicated() | huellas.isin(vistos)
+                vistos.update(huellas[~repetidas].tolist())
+                resumen["duplicadas"] += int(repetidas.sum())
+                validas = validas[~repetidas]
+
+                resumen["validas"] += len(validas)
+                conn.executemany(f"INSERT INTO temp._lote VALUES ({marcadores})",
+                                 validas.itertuples(index=False, name=None))
+                if progreso:
+                    progreso(resumen["leidas"])
+
+            resumen.update(_fusionar_lote(conn, origen))
+            conn.execute("ROLLBACK" if simulacion else "COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return resumen
+    finally:
+        conn.close()
+
+
+def describir_resumen_importacion(resumen):
+    """Texto legible del resumen de importar_desde_archivo (para la vista previa y la confirmación)."""
+    lineas = [
+        f"Filas leídas: {resumen['leidas']}",
+        f"Filas válidas: {resumen['validas']}",
+        f"Filas repetidas en el archivo: {resumen['duplicadas']}",
+        f"Filas rechazadas: {sum(resumen['rechazadas'].values())}",
+    ]
+    lineas += [f"   • {motivo}: {cantidad}" for motivo, cantidad in resumen["rechazadas"].most_common()]
+    prefijo = "Se insertarían" if resumen["simulacion"] else "Se insertaron"
+    lineas += [
+        f"{prefijo} {resumen['insertadas']} ventas nuevas",
+        f"Ventas fusionadas con existentes: {resumen['fusionadas']}",
+        f"Ventas omitidas (ya importadas): {resumen['omitidas']}",
+    ]
+    return "\n".join(lineas)
@@ -0,0 +1,111 @@
+"""Mantenimiento periódico de la base: optimize, ANALYZE, vacuum incremental y verificación de integridad."""
+import sqlite3
+import time
+from datetime import datetime
+
+from loto import base_datos
+
+HORA_MANTENIMIENTO = "21:30" # Después del sorteo de las 09 PM, con la venta ya cerrada
+
+
+def _crear_historial(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS mantenimiento_historial (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_hora TEXT NOT NULL,
+            paso TEXT NOT NULL,
+            segundos REAL NOT NULL,
+            resultado TEXT
+        )
+    ''')
+
+
+def ultima_fecha_mantenimiento(ruta_db=None):
+    """Fecha (AAAA-MM-DD) del último mantenimiento registrado, o None."""
+    conn = sqlite3.connect(ruta_db or base_datos.DB_NAME)
+    try:
+        _crear_historial(conn)
+        fila = conn.execute("SELECT MAX(substr(fecha_hora, 1, 10)) FROM mantenimiento_historial").fetchone()
+        return fila[0] if fila else None
+    finally:
+        conn.close()
+
+
+def mantenimiento_pendiente(ahora=None, ruta_db=None):
+    """True si ya pasó HORA_MANTENIMIENTO y hoy todavía no se hizo el mantenimiento."""
+    ahora = ahora or datetime.now()
+    if ahora.strftime('%H:%M') < HORA_MANTENIMIENTO:
+        return False
+    return ultima_fecha_mantenimiento(ruta_db) != ahora.strftime('%Y-%m-%d')
+
+
+def ejecutar_mantenimiento(ruta_db=None, progreso=None):
+    """
+    Ejecuta el mantenimiento completo y registra la duración de cada paso en
+    'mantenimiento_historial'. Retorna una lista de (paso, segundos, resultado).
+
+    La primera vez convierte la base a auto_vacuum=INCREMENTAL (requiere un VACUUM
+    completo); desde entonces basta con 'PRAGMA incremental_vacuum' para devolver al
+    sistema las páginas libres que dejan los borrados y el archivado.
+    'progreso(actual, total)' se llama después de cada paso.
+    """
+    # timeout alto: si una venta tiene la base bloqueada, se espera en lugar de fallar
+    conn = sqlite3.connect(ruta_db or base_datos.DB_NAME, timeout=30, isolation_level=None)
+    pasos = []
+
+    def medir(paso, funcion):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        pasos.append((paso, segundos, resultado))
+        print(f"🛠️ Mantenimiento: {paso} en {segundos:.2f}s ({resultado})")
+        if progreso:
+            progreso(len(pasos), 5)
+
+    def convertir_auto_vacuum():
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return "ya estaba en INCREMENTAL"
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return "convertida a INCREMENTAL"
+
+    def optimizar():
+        conn.execute("PRAGMA optimize")
+        return "ok"
+
+    def analizar():
+        conn.execute("ANALYZE")
+        return "ok"
+
+    def vacuum_incremental():
+        libres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+        return f"{libres} páginas liberadas"
+
+    def verificar():
+        filas = [fila[0] for fila in conn.execute("PRAGMA quick_check")]
+        return "ok" if filas == ["ok"] else "; ".join(filas[:10])
+
+    try:
+        medir("auto_vacuum", convertir_auto_vacuum)
+        medir("optimize", optimizar)
+        medir("analyze", analizar)
+        medir("incremental_vacuum", vacuum_incremental)
+        medir("quick_check", verificar)
+
+        _crear_historial(conn)
+        fecha_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.executemany(
+            "INSERT INTO mantenimiento_historial (fecha_hora, paso, segundos, resultado) VALUES (?, ?, ?, ?)",
+            [(fecha_hora, paso, round(segundos, 3), resultado) for paso, segundos, resultado in pasos]
+        )
+    finally:
+        conn.close()
+    return pasos
+
+
+def describir_mantenimiento(pasos):
+    """Resumen de una línea para la barra de estado."""
+    total = sum(segundos for _, segundos, _ in pasos)
+    integridad = next((resultado for paso, _, resultado in pasos if paso == "quick_check"), "?")
+    return f"{total:.1f}s, integridad: {integridad}"
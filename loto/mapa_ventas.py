@@ -0,0 +1,79 @@
+"""Matriz de ventas del día (100 números x 4 sorteos) que respalda el mapa de calor de la pestaña Ventas."""
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+from loto import base_datos
+
+CANTIDAD_NUMEROS = 100
+NIVELES_CALOR = 8 # Nivel 0 = sin ventas; 1..NIVELES_CALOR-1 según el premio potencial
+_INDICE_SORTEO = {sorteo: i for i, sorteo in enumerate(base_datos.SORTEOS)}
+
+
+class MatrizVentasDia:
+    """
+    Apuesta y premio potencial acumulados del día en dos arreglos NumPy (número x sorteo).
+
+    'cargar' lee la tabla una sola vez con una consulta agrupada; después cada venta se
+    suma con 'sumar' sin volver a consultar la base. 'niveles' reparte los premios en
+    NIVELES_CALOR tonos relativos al mayor premio del día, de modo que la interfaz solo
+    repinta las celdas cuyo tono cambió.
+    """
+
+    def __init__(self, ruta_db=None):
+        self.ruta_db = ruta_db
+        self.fecha = None
+        self.apuestas = np.zeros((CANTIDAD_NUMEROS, len(base_datos.SORTEOS)))
+        self.premios = np.zeros((CANTIDAD_NUMEROS, len(base_datos.SORTEOS)))
+
+    def cargar(self, fecha=None):
+        """Relee las ventas de 'fecha' (AAAA-MM-DD, por defecto hoy)."""
+        self.fecha = fecha or datetime.now().strftime('%Y-%m-%d')
+        self.apuestas[:] = 0
+        self.premios[:] = 0
+        conn = sqlite3.connect(self.ruta_db or base_datos.DB_NAME)
+        try:
+            filas = conn.execute('''
+                SELECT numero_loteria, sorteo_hora, SUM(apuesta), SUM(premio_potencial)
+                FROM ventas
+                WHERE venta_fecha_solo_dia = ?
+                GROUP BY numero_loteria, sorteo_hora
+            ''', (self.fecha,)).fetchall()
+        finally:
+            conn.close()
+        for numero, sorteo, apuesta, premio in filas:
+            if sorteo in _INDICE_SORTEO and str(numero).isdigit() and int(numero) < CANTIDAD_NUMEROS:
+                self.apuestas[int(numero), _INDICE_SORTEO[sorteo]] = apuesta or 0
+                self.premios[int(numero), _INDICE_SORTEO[sorteo]] = premio or 0
+        return self
+
+    def sumar(self, numero, sorteo, apuesta, premio):
+        """
+        Suma una venta recién registrada. Retorna la celda (fila, columna) que cambió, o
+        None si cambió el día y se recargó toda la matriz.
+        """
+        if self.fecha != datetime.now().strftime('%Y-%m-%d'):
+            self.cargar()
+            return None
+        celda = (int(numero), _INDICE_SORTEO[sorteo])
+        self.apuestas[celda] += apuesta
+        self.premios[celda] += premio
+        return celda
+
+    def niveles(self):
+        """Tono (0..NIVELES_CALOR-1) de cada celda según su premio potencial respecto del mayor del día."""
+        maximo = self.premios.max()
+        if maximo <= 0:
+            return np.zeros(self.premios.shape, dtype=np.int8)
+        return np.ceil(self.premios / maximo * (NIVELES_CALOR - 1)).astype(np.int8)
+
+    def celda(self, numero, sorteo):
+        """(apuesta, premio potencial) de un número en un sorteo."""
+        fila, columna = int(numero), _INDICE_SORTEO[sorteo]
+        return float(self.apuestas[fila, columna]), float(self.premios[fila, columna])
+
+    def totales_por_sorteo(self):
+        """{sorteo: (apuesta, premio potencial)} del día."""
+        return {sorteo: (float(self.apuestas[:, i].sum()), float(self.premios[:, i].sum()))
+                for sorteo, i in _INDICE_SORTEO.items()}
@@ -0,0 +1,119 @@
+"""Planificador único de las tareas periódicas que corren en el hilo de Tk, con el tiempo que consume cada una."""
+import random
+import time
+
+JITTER_PREDETERMINADO = 0.05 # Fracción del intervalo que se corre al azar para que las tareas no coincidan
+
+
+class EstadisticaTarea:
+    """Ejecuciones y tiempo (en segundos) que una tarea ocupó el hilo de Tk."""
+
+    def __init__(self):
+        self.ejecuciones = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.ultimo = 0.0
+
+    @property
+    def promedio(self):
+        return self.total / self.ejecuciones if self.ejecuciones else 0.0
+
+    def anotar(self, duracion):
+        self.ejecuciones += 1
+        self.total += duracion
+        self.ultimo = duracion
+        self.maximo = max(self.maximo, duracion)
+
+
+class _Tarea:
+    def __init__(self, nombre, intervalo_ms, funcion, pausar_minimizado, jitter):
+        self.nombre = nombre
+        self.intervalo_ms = intervalo_ms
+        self.funcion = funcion
+        self.pausar_minimizado = pausar_minimizado
+        self.jitter = jitter
+        self.id_after = None
+        self.en_pausa = False
+
+
+class PlanificadorTk:
+    """
+    Dueño de todas las cadenas root.after periódicas. Cada tarea se registra con un
+    nombre: registrar otra vez el mismo nombre reemplaza la anterior en lugar de dejar
+    dos cadenas corriendo. Los intervalos llevan un pequeño jitter y las tareas que solo
+    actualizan la pantalla se saltean mientras la ventana está minimizada (corren en
+    cuanto se restaura). Una excepción en una tarea se informa y no corta la cadena.
+
+    Cada ejecución se mide con perf_counter; 'estadisticas' dice cuánto tiempo del hilo
+    de Tk consumió cada tarea.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._tareas = {}
+        self.estadisticas = {} # nombre -> EstadisticaTarea
+        self.root.bind("<Map>", self._al_restaurar, add="+")
+
+    def registrar(self, nombre, intervalo_ms, funcion, demora_inicial_ms=None, pausar_minimizado=True,
+                  jitter=JITTER_PREDETERMINADO):
+        """
+        Corre 'funcion()' cada 'intervalo_ms' (la primera vez tras 'demora_inicial_ms', por
+        defecto un intervalo). 'pausar_minimizado=False' para trabajo que no es de pantalla.
+        """
+        self.cancelar(nombre)
+        tarea = _Tarea(nombre, intervalo_ms, funcion, pausar_minimizado, jitter)
+        self._tareas[nombre] = tarea
+        self.estadisticas.setdefault(nombre, EstadisticaTarea())
+        self._programar(tarea, intervalo_ms if demora_inicial_ms is None else demora_inicial_ms)
+        return tarea
+
+    def cancelar(self, nombre):
+        tarea = self._tareas.pop(nombre, None)
+        if tarea is not None and tarea.id_after is not None:
+            self.root.after_cancel(tarea.id_after)
+
+    def _programar(self, tarea, demora_ms):
+        if tarea.jitter:
+            demora_ms *= 1 + random.uniform(-tarea.jitter, tarea.jitter)
+        tarea.id_after = self.root.after(max(int(demora_ms), 1), lambda: self._ejecutar(tarea))
+
+    def _minimizada(self):
+        try:
+            return self.root.state() in ("iconic", "withdrawn")
+        except Exception:
+            return False
+
+    def _ejecutar(self, tarea):
+        tarea.id_after = None
+        if self._tareas.get(tarea.nombre) is not tarea:
+            return # Se canceló o se reemplazó
+        if tarea.pausar_minimizado and self._minimizada():
+            tarea.en_pausa = True # Se retoma en _al_restaurar
+            return
+        tarea.en_pausa = False
+        inicio = time.perf_counter()
+        try:
+            tarea.funcion()
+        except Exception as e:
+            print(f"❌ Error en la tarea periódica '{tarea.nombre}': {e}")
+        finally:
+            self.estadisticas[tarea.nombre].anotar(time.perf_counter() - inicio)
+        if self._tareas.get(tarea.nombre) is tarea:
+            self._programar(tarea, tarea.intervalo_ms)
+
+    def _al_restaurar(self, event):
+        if event.widget is not self.root:
+            return # <Map> de la ventana principal llega también por cada widget hijo
+        for tarea in self._tareas.values():
+            if tarea.en_pausa:
+                tarea.en_pausa = False
+                self._programar(tarea, 0)
+
+    def describir_estadisticas(self):
+        """Renglones por tarea, de la que más tiempo ocupó el hilo de Tk a la que menos."""
+        orden = sorted(self.estadisticas.items(), key=lambda item: item[1].total, reverse=True)
+        return "\n".join(
+            f"{nombre}: {e.ejecuciones} ejecuciones, total {e.total:.2f} s, "
+            f"promedio {e.promedio * 1000:.1f} ms, máximo {e.maximo * 1000:.1f} ms"
+            for nombre, e in orden
+        ) or "Sin tareas periódicas registradas."
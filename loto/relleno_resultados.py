@@ -0,0 +1,197 @@
+"""Relleno de los resultados históricos de la Diaria desde la web, con varias consultas en paralelo."""
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import requests
+
+from loto import base_datos
+from loto.resultados_web import URL_SORTEOS, consultar_sorteos_dia
+from loto.sondeo_resultados import sorteos_del_dia
+
+HILOS_RELLENO = 4
+CONSULTAS_POR_SEGUNDO = 2.0 # Por servidor, sumando todos los hilos
+TAMANO_LOTE_RELLENO = 30 # Días que se guardan por transacción (cada lote es un punto de control)
+
+
+class LimiteConsultas:
+    """Espacia las consultas a cada servidor para no pasar de 'por_segundo', sin importar cuántos hilos consulten."""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo else 0
+        self._lock = threading.Lock()
+        self._proxima = {}
+
+    def esperar(self, url):
+        servidor = urlparse(url).netloc
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proxima.get(servidor, ahora))
+            self._proxima[servidor] = turno + self.intervalo
+        if turno > ahora:
+            time.sleep(turno - ahora)
+
+
+def _crear_control(conn):
+    """Días ya consultados: permite retomar un relleno interrumpido sin repetir consultas."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS relleno_resultados (
+            fecha TEXT PRIMARY KEY,
+            sorteos INTEGER NOT NULL,
+            fecha_consulta TEXT NOT NULL
+        )
+    ''')
+
+
+def dias_pendientes(desde, hasta, forzar=False, ruta_db=None):
+    """
+    Días del rango (hasta ayer como máximo) a los que les falta algún sorteo y que no se
+    consultaron en un relleno anterior ('forzar' vuelve a consultarlos igual).
+    """
+    inicio = datetime.strptime(desde, '%Y-%m-%d').date()
+    fin = datetime.strptime(hasta, '%Y-%m-%d').date()
+    if fin < inicio:
+        raise ValueError("La fecha final es anterior a la inicial")
+    fin = min(fin, datetime.now().date() - timedelta(days=1)) # Los del día los trae SondeoResultados
+
+    conn = sqlite3.connect(ruta_db or base_datos.DB_NAME)
+    try:
+        _crear_control(conn)
+        consultados = set() if forzar else {fila[0] for fila in conn.execute(
+            "SELECT fecha FROM relleno_resultados WHERE fecha BETWEEN ? AND ?", (desde, hasta)
+        )}
+        registrados = Counter(fila[0] for fila in conn.execute(
+            "SELECT fecha_sorteo FROM resultados_sorteo WHERE fecha_sorteo BETWEEN ? AND ?", (desde, hasta)
+        ))
+    finally:
+        conn.close()
+
+    dias = []
+    dia = inicio
+    while dia <= fin:
+        fecha = dia.strftime('%Y-%m-%d')
+        if fecha not in consultados and registrados[fecha] < len(sorteos_del_dia(dia)):
+            dias.append(fecha)
+        dia += timedelta(days=1)
+    return dias
+
+
+def _guardar_lote(conn, consultas, resumen):
+    """
+    Guarda en una transacción los sorteos de varios días [(fecha, sorteos)] y sus puntos de
+    control. Un resultado local distinto del publicado se corrige, y los días tocados se
+    vuelven a liquidar. Los días sin sorteos publicados no se anotan como consultados.
+    """
+    filas = [sorteo for _, sorteos in consultas for sorteo in sorteos]
+    fechas = [fecha for fecha, _ in consultas]
+    marcadores = ", ".join("?" for _ in fechas)
+    try:
+        existentes = dict(((f, s), n) for f, s, n in conn.execute(
+            f"SELECT fecha_sorteo, hora_sorteo, numero_ganador FROM main.resultados_sorteo WHERE fecha_sorteo IN ({marcadores})",
+            fechas
+        ))
+        conn.executemany('''
+            INSERT INTO main.resultados_sorteo (fecha_sorteo, hora_sorteo, numero_ganador)
+            VALUES (?, ?, ?)
+            ON CONFLICT (fecha_sorteo, hora_sorteo) DO UPDATE SET numero_ganador = excluded.numero_ganador
+            WHERE numero_ganador <> excluded.numero_ganador
+        ''', filas)
+        base_datos.liquidar_sorteos(conn, f"r.fecha_sorteo IN ({marcadores})", fechas)
+        fecha_consulta = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.executemany(
+            "INSERT OR REPLACE INTO main.relleno_resultados (fecha, sorteos, fecha_consulta) VALUES (?, ?, ?)",
+            [(fecha, len(sorteos), fecha_consulta) for fecha, sorteos in consultas if sorteos]
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    for fecha, sorteo, numero in filas:
+        anterior = existentes.get((fecha, sorteo))
+        if anterior is None:
+            resumen["nuevos"] += 1
+        elif anterior != numero:
+            resumen["corregidos"] += 1
+    resumen["consultados"] += len(consultas)
+    resumen["sin_resultados"] += sum(1 for _, sorteos in consultas if not sorteos)
+
+
+def rellenar_resultados(desde, hasta, hilos=HILOS_RELLENO, por_segundo=CONSULTAS_POR_SEGUNDO, forzar=False,
+                        url=URL_SORTEOS, ruta_db=None, progreso=None):
+    """
+    Completa resultados_sorteo con los resultados publicados entre 'desde' y 'hasta' (AAAA-MM-DD).
+
+    Los días se consultan en paralelo ('hilos' como máximo, a 'por_segundo' consultas por
+    servidor) y se guardan de a TAMANO_LOTE_RELLENO días por transacción. Cada día guardado
+    queda anotado en 'relleno_resultados', así que si el relleno se interrumpe (o se cancela
+    desde 'progreso'), al repetirlo se sigue desde donde quedó. Un día sin sorteos publicados
+    o con error (de red o una respuesta que no se pudo leer) no se anota y se vuelve a
+    intentar la próxima vez; el error no detiene el relleno de los demás días.
+
+    Retorna {'dias', 'consultados', 'nuevos', 'corregidos', 'sin_resultados', 'errores'}.
+    """
+    dias = dias_pendientes(desde, hasta, forzar, ruta_db)
+    resumen = {"dias": len(dias), "consultados": 0, "nuevos": 0, "corregidos": 0, "sin_resultados": 0, "errores": 0}
+    if not dias:
+        return resumen
+
+    limite = LimiteConsultas(por_segundo)
+
+    def consultar(fecha):
+        limite.esperar(url)
+        return consultar_sorteos_dia(fecha, url)
+
+    # conectar_historial: para liquidar también con las ventas de años archivados
+    conn = base_datos.conectar_historial(desde, hasta, ruta_db)
+    lote = []
+    try:
+        _crear_control(conn)
+        ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="RellenoResultados")
+        try:
+            futuros = {ejecutor.submit(consultar, fecha): fecha for fecha in dias}
+            for completados, futuro in enumerate(as_completed(futuros), 1):
+                fecha = futuros[futuro]
+                try:
+                    lote.append((fecha, futuro.result()))
+                except requests.RequestException as e:
+                    resumen["errores"] += 1
+                    print(f"⚠️ No se pudieron consultar los resultados del {fecha}: {e}")
+                except Exception as e:
+                    resumen["errores"] += 1
+                    print(f"❌ Respuesta inesperada al consultar los resultados del {fecha} "
+                          f"({type(e).__name__}: {e}); se omite ese día")
+                if len(lote) >= TAMANO_LOTE_RELLENO:
+                    pendiente, lote = lote, []
+                    _guardar_lote(conn, pendiente, resumen)
+                if progreso:
+                    progreso(completados, len(dias))
+        finally:
+            ejecutor.shutdown(wait=True, cancel_futures=True)
+            # Lo ya consultado se guarda aunque el relleno se haya cancelado
+            if lote:
+                pendiente, lote = lote, []
+                _guardar_lote(conn, pendiente, resumen)
+    finally:
+        conn.close()
+
+    if resumen["nuevos"] or resumen["corregidos"]:
+        base_datos.invalidar_cache_ganadores()
+    return resumen
+
+
+def describir_relleno(resumen):
+    """Resumen de una línea para la barra de estado."""
+    texto = (f"{resumen['consultados']} de {resumen['dias']} días consultados, "
+             f"{resumen['nuevos']} resultados nuevos, {resumen['corregidos']} corregidos")
+    if resumen["sin_resultados"]:
+        texto += f", {resumen['sin_resultados']} sin resultados publicados"
+    if resumen["errores"]:
+        texto += f", {resumen['errores']} días con error"
+    if resumen["sin_resultados"] or resumen["errores"]:
+        texto += " (se reintentan la próxima vez)"
+    return texto
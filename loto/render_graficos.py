@@ -0,0 +1,121 @@
+"""Preparación de los gráficos en un hilo aparte y caché de los resultados ya preparados."""
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from loto import base_datos
+
+CAPACIDAD_CACHE_GRAFICOS = 32 # Resultados guardados; una imagen de matplotlib ocupa alrededor de 1 MB
+
+# ppm: imagen lista para tk.PhotoImage(data=...); info: lo que retornó la función que preparó la figura
+ImagenGrafico = namedtuple("ImagenGrafico", "ppm ancho alto info")
+# generar(comunes) corre en el hilo de dibujo y retorna lo que el panel sabe mostrar: la
+# descripción del gráfico (motor Tk) o una ImagenGrafico ya dibujada (motor matplotlib)
+PedidoGrafico = namedtuple("PedidoGrafico", "clave llave generar")
+
+
+def imagen_ppm(lienzo):
+    """Último dibujo de un FigureCanvasAgg como PPM binario (P6), que Tk carga sin convertir."""
+    rgba = np.asarray(lienzo.buffer_rgba())
+    alto, ancho = rgba.shape[:2]
+    return b"P6 %d %d 255\n" % (ancho, alto) + rgba[:, :, :3].tobytes()
+
+
+class CacheImagenes:
+    """Caché LRU de resultados por llave; se usa desde el hilo de Tk y desde el de dibujo."""
+
+    def __init__(self, capacidad=CAPACIDAD_CACHE_GRAFICOS):
+        self.capacidad = capacidad
+        self._imagenes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, llave):
+        with self._lock:
+            imagen = self._imagenes.get(llave)
+            if imagen is not None:
+                self._imagenes.move_to_end(llave)
+            return imagen
+
+    def guardar(self, llave, imagen):
+        with self._lock:
+            self._imagenes[llave] = imagen
+            self._imagenes.move_to_end(llave)
+            while len(self._imagenes) > self.capacidad:
+                self._imagenes.popitem(last=False)
+
+    def __len__(self):
+        return len(self._imagenes)
+
+
+class RenderizadorGraficos:
+    """
+    Prepara los gráficos en un único hilo de fondo (una figura de matplotlib nunca se toca
+    desde dos hilos a la vez) y publica cada resultado como ('grafico', None, (clave, llave,
+    resultado)) en 'eventos', la cola que la interfaz atiende desde el hilo de Tk.
+
+    Los resultados quedan en una caché LRU por llave. La llave la arma quien pide el dibujo
+    e incluye 'version_datos()', así que volver a un filtro ya visto con los mismos datos
+    no dibuja nada. Si mientras tanto se pidió otra llave para el mismo gráfico, el pedido
+    viejo se descarta sin dibujarlo.
+    """
+
+    def __init__(self, eventos, capacidad=CAPACIDAD_CACHE_GRAFICOS, ruta_db=None):
+        self.eventos = eventos
+        self.cache = CacheImagenes(capacidad)
+        self.ruta_db = ruta_db
+        self._conn = None
+        self._vigentes = {} # clave -> última llave pedida
+        self._lock = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="RenderGraficos")
+
+    def version_datos(self):
+        """
+        PRAGMA data_version de una conexión propia que nunca escribe: cambia cada vez que
+        cualquier otra conexión (ventas, resultados, importaciones) confirma cambios.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.ruta_db or base_datos.DB_NAME)
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def obtener(self, clave, llave):
+        """
+        Resultado ya preparado para 'llave', o None. En ambos casos 'llave' pasa a ser la vigente
+        del gráfico 'clave', así que un dibujo pendiente de otro filtro se descarta.
+        """
+        with self._lock:
+            self._vigentes[clave] = llave
+        return self.cache.obtener(llave)
+
+    def es_vigente(self, clave, llave):
+        with self._lock:
+            return self._vigentes.get(clave) == llave
+
+    def solicitar(self, pedidos, comunes=None):
+        """
+        Encola una lista de PedidoGrafico. 'comunes', si se indica, se llama una sola vez
+        en el hilo de dibujo (p. ej. la consulta de agregados que comparten varios
+        gráficos) y su resultado se pasa a cada 'generar'.
+        """
+        with self._lock:
+            for pedido in pedidos:
+                self._vigentes[pedido.clave] = pedido.llave
+        self._ejecutor.submit(self._dibujar, pedidos, comunes)
+
+    def _dibujar(self, pedidos, comunes):
+        calculados = []
+        for pedido in pedidos:
+            with self._lock:
+                if self._vigentes.get(pedido.clave) != pedido.llave:
+                    continue # Ya se pidió otro filtro para este gráfico
+            try:
+                if comunes and not calculados:
+                    calculados.append(comunes())
+                resultado = pedido.generar(calculados[0] if calculados else None)
+            except Exception as e:
+                self.eventos.put(("grafico_error", None, (pedido.clave, e)))
+                continue
+            self.cache.guardar(pedido.llave, resultado)
+            self.eventos.put(("grafico", None, (pedido.clave, pedido.llave, resultado)))
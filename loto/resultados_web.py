@@ -0,0 +1,166 @@
+"""Consulta de los resultados oficiales de la Loto Diaria de Nicaragua en la web."""
+import re
+import threading
+from datetime import datetime
+
+import requests
+from bs4 import BeautifulSoup
+
+URL_DIARIA = "https://loto.com.ni/diaria/"
+URL_SORTEOS = "https://loto.com.ni//business/bsorteo.php" # El mismo que usa el buscador por fecha de la página
+JUEGO_DIARIA = 13
+CODIGO_CONSULTA = "5fd7867ff3ed6"
+TIMEOUT_WEB = (5, 15) # (conexión, lectura) en segundos
+CABECERAS_WEB = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
+    "Accept-Language": "es-NI,es;q=0.9",
+}
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+HORAS_SORTEO = {"11:00 AM": "11 AM", "3:00 PM": "03 PM", "6:00 PM": "06 PM", "9:00 PM": "09 PM"}
+
+# La página trae el historial reciente en una variable de JavaScript:
+#   var objJson = [{adName : "<div class='Rtable ...'>...</div>"}, ...]
+# y lo dibuja en el navegador; por eso antes hacía falta Selenium para verlo.
+_PATRON_ADNAME = re.compile(r'adName\s*:\s*"((?:[^"\\]|\\.)*)"')
+_PATRON_FECHA = re.compile(r"(\d{1,2})\s+de\s+([a-záéíóú]+),?\s+(\d{4})", re.IGNORECASE)
+
+_local = threading.local()
+
+
+def _obtener_sesion():
+    """Sesión HTTP del hilo actual, para reutilizar la conexión entre consultas sin compartirla entre hilos."""
+    sesion = getattr(_local, "sesion", None)
+    if sesion is None:
+        sesion = _local.sesion = requests.Session()
+        sesion.headers.update(CABECERAS_WEB)
+    return sesion
+
+
+def parsear_sorteo_html(fragmento):
+    """
+    Lee un bloque 'Rtable' de la página (un sorteo) y retorna (fecha AAAA-MM-DD, sorteo, numero),
+    o None si el bloque no es un sorteo reconocible.
+    """
+    sopa = BeautifulSoup(fragmento, "html.parser")
+    cabecera = [s.get_text(strip=True) for s in sopa.select("span.spanAzul")]
+    if len(cabecera) < 2:
+        return None
+
+    fecha_match = _PATRON_FECHA.search(cabecera[0])
+    sorteo = HORAS_SORTEO.get(re.sub(r"\s+", " ", cabecera[1]).upper())
+    if not fecha_match or not sorteo:
+        return None
+    dia, mes_texto, anio = fecha_match.groups()
+    mes = MESES.get(mes_texto.lower())
+    if not mes:
+        return None
+
+    # Las dos esferas amarillas son los dígitos; las marrones son MULTI-X y MAS 1
+    digitos = [s.get_text(strip=True) for s in sopa.select("div.esfera-amarillo span")]
+    if len(digitos) < 2 or not all(d.isdigit() and len(d) == 1 for d in digitos[:2]):
+        return None
+    return f"{int(anio):04d}-{mes:02d}-{int(dia):02d}", sorteo, digitos[0] + digitos[1]
+
+
+def extraer_sorteos_pagina(html):
+    """Todos los sorteos publicados en el HTML de la página, como lista de (fecha, sorteo, numero)."""
+    fragmentos = _PATRON_ADNAME.findall(html) or [html]
+    sorteos = []
+    for fragmento in fragmentos:
+        sorteo = parsear_sorteo_html(fragmento.replace('\\"', '"').replace("\\/", "/"))
+        if sorteo:
+            sorteos.append(sorteo)
+    return sorteos
+
+
+def descargar_pagina_diaria(url=URL_DIARIA):
+    """Descarga el HTML de la página de la Diaria con requests (sin navegador)."""
+    respuesta = _obtener_sesion().get(url, timeout=TIMEOUT_WEB)
+    respuesta.raise_for_status()
+    return respuesta.text
+
+
+def descargar_pagina_si_cambio(validadores, url=URL_DIARIA):
+    """
+    Petición condicional (If-None-Match / If-Modified-Since) con los 'validadores' de la
+    respuesta anterior ({} la primera vez). Retorna (html, validadores nuevos), con
+    html None si el servidor respondió 304 porque la página no cambió.
+    """
+    cabeceras = {}
+    if validadores.get("ETag"):
+        cabeceras["If-None-Match"] = validadores["ETag"]
+    if validadores.get("Last-Modified"):
+        cabeceras["If-Modified-Since"] = validadores["Last-Modified"]
+
+    respuesta = _obtener_sesion().get(url, headers=cabeceras, timeout=TIMEOUT_WEB)
+    if respuesta.status_code == 304:
+        return None, validadores
+    respuesta.raise_for_status()
+    nuevos = {clave: respuesta.headers[clave] for clave in ("ETag", "Last-Modified") if clave in respuesta.headers}
+    return respuesta.text, nuevos
+
+
+def consultar_sorteos_dia(fecha, url=URL_SORTEOS):
+    """
+    Sorteos publicados para 'fecha' (AAAA-MM-DD) según el buscador por fecha de la página,
+    como lista de (fecha, sorteo, numero). Sirve para días anteriores, que ya no aparecen
+    en la página principal.
+    """
+    anio, mes, dia = (int(parte) for parte in fecha.split("-"))
+    respuesta = _obtener_sesion().post(url, timeout=TIMEOUT_WEB, data={
+        "dia": dia, "mes": mes, "anio": anio, "juego": JUEGO_DIARIA,
+        "cod": CODIGO_CONSULTA, "method": "getMesByJuego",
+    })
+    respuesta.raise_for_status()
+    try:
+        fragmentos = [item.get("adName", "") for item in respuesta.json()]
+    except ValueError: # No vino JSON: se busca en el texto como en la página
+        return [s for s in extraer_sorteos_pagina(respuesta.text) if s[0] == fecha]
+    sorteos = (parsear_sorteo_html(fragmento) for fragmento in fragmentos)
+    return [s for s in sorteos if s and s[0] == fecha]
+
+
+def _descargar_con_selenium():
+    """Respaldo con Firefox sin ventana, solo si Selenium y GeckoDriver están instalados."""
+    from selenium import webdriver
+    from selenium.webdriver.firefox.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    opciones = Options()
+    opciones.add_argument("--headless")
+    driver = webdriver.Firefox(options=opciones) # GeckoDriver debe estar en PATH
+    try:
+        driver.get(URL_DIARIA)
+        # En lugar de esperar 5 segundos fijos, esperar a que aparezca el primer sorteo
+        WebDriverWait(driver, 15).until(lambda d: d.find_elements(By.CSS_SELECTOR, "div.Rtable"))
+        return driver.page_source
+    finally:
+        driver.quit()
+
+
+def obtener_resultados_loto_nicaragua(fecha=None):
+    """
+    Retorna {sorteo: numero_ganador} con los resultados publicados para 'fecha'
+    (AAAA-MM-DD, por defecto hoy), o {} si no se pudo consultar.
+
+    Primero lee la página con una petición HTTP; Selenium solo se usa si esa
+    petición falla y está instalado.
+    """
+    fecha = fecha or datetime.now().strftime('%Y-%m-%d')
+    try:
+        sorteos = extraer_sorteos_pagina(descargar_pagina_diaria())
+    except requests.RequestException as e:
+        print(f"⚠️ No se pudo leer {URL_DIARIA}: {e}")
+        try:
+            sorteos = extraer_sorteos_pagina(_descargar_con_selenium())
+        except ImportError:
+            return {}
+        except Exception as e:
+            print(f"❌ Error al usar Selenium con Firefox: {e}")
+            return {}
+    return {sorteo: numero for dia, sorteo, numero in sorteos if dia == fecha}
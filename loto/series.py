@@ -0,0 +1,69 @@
+"""Series temporales de apuestas y premios para los gráficos de tendencia, reducidas al ancho del gráfico."""
+import numpy as np
+
+from loto import base_datos
+
+
+def lttb(x, y, umbral):
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets al reducir (x, y) a
+    'umbral' puntos: en cada tramo se queda con el punto que forma el triángulo más grande
+    con el elegido en el tramo anterior y el promedio del siguiente, así que los picos y
+    caídas de la serie se mantienen. Si la serie ya es chica se devuelven todos.
+    """
+    cantidad = len(x)
+    if umbral >= cantidad or umbral < 3:
+        return np.arange(cantidad)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Primer y último punto fijos; el resto se reparte en umbral-2 tramos
+    limites = np.linspace(1, cantidad - 1, umbral - 1).astype(np.int64)
+    indices = np.empty(umbral, dtype=np.int64)
+    indices[0], indices[-1] = 0, cantidad - 1
+    elegido = 0
+    for i in range(umbral - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        siguiente_fin = limites[i + 2] if i + 2 < len(limites) else cantidad
+        promedio_x = x[fin:siguiente_fin].mean()
+        promedio_y = y[fin:siguiente_fin].mean()
+        areas = np.abs((x[elegido] - promedio_x) * (y[inicio:fin] - y[elegido])
+                       - (x[elegido] - x[inicio:fin]) * (promedio_y - y[elegido]))
+        elegido = inicio + int(np.argmax(areas))
+        indices[i + 1] = elegido
+    return indices
+
+
+class SerieTemporal:
+    """
+    Serie completa de obtener_serie_temporal en arreglos NumPy. 'reducir' da los puntos a
+    dibujar para un ancho en píxeles y 'indice_cercano' el período exacto bajo el mouse.
+    """
+
+    def __init__(self, granularidad, desde=None, hasta=None, ruta_db=None):
+        filas = base_datos.obtener_serie_temporal(granularidad, desde, hasta, ruta_db)
+        self.granularidad = granularidad
+        self.fechas = np.array([fila[0] for fila in filas], dtype='datetime64[D]')
+        self.apostado = np.array([fila[1] or 0 for fila in filas], dtype=float)
+        self.premios = np.array([fila[2] or 0 for fila in filas], dtype=float)
+        self.dias = self.fechas.astype(np.int64) # Días desde 1970-01-01, la misma escala que usa matplotlib
+
+    def __len__(self):
+        return len(self.fechas)
+
+    def reducir(self, ancho):
+        """{'apostado': (x, y), 'premios': (x, y)} con a lo sumo 'ancho' puntos cada una (LTTB)."""
+        reducida = {}
+        for nombre, valores in (("apostado", self.apostado), ("premios", self.premios)):
+            indices = lttb(self.dias, valores, int(ancho))
+            reducida[nombre] = (self.dias[indices], valores[indices])
+        return reducida
+
+    def indice_cercano(self, dia):
+        """Posición del período más cercano a 'dia' (en días desde 1970-01-01), o None si la serie está vacía."""
+        if not len(self.dias):
+            return None
+        posicion = int(np.searchsorted(self.dias, dia))
+        if posicion == len(self.dias) or (posicion > 0 and dia - self.dias[posicion - 1] < self.dias[posicion] - dia):
+            posicion -= 1
+        return posicion
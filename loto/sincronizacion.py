@@ -0,0 +1,139 @@
+"""Sincronización incremental de las ventas de varias terminales a la base local."""
+import glob
+import os
+import sqlite3
+from datetime import datetime
+
+from loto import base_datos
+from loto.importacion import (
+    _conectar_con_externa, _cargar_lote_externo, _fusionar_lote, _importar_resultados_externos
+)
+
+
+def _mtime_base(ruta):
+    """Última modificación del archivo, considerando también su -wal si la terminal usa WAL."""
+    return max(os.path.getmtime(p) for p in (ruta, ruta + "-wal") if os.path.exists(p))
+
+
+def _marca_origen(origen, ruta_db=None):
+    conn = sqlite3.connect(ruta_db or base_datos.DB_NAME)
+    try:
+        marca = conn.execute(
+            "SELECT ultimo_id, ultima_modificacion, mtime FROM sincronizacion_origenes WHERE origen = ?",
+            (origen,)
+        ).fetchone()
+        return marca or (0, "", None)
+    finally:
+        conn.close()
+
+
+def _dias_con_eliminaciones(conn, origen):
+    """
+    Días en los que lo importado antes desde 'origen' suma más apuesta que lo que la
+    terminal tiene hoy: ahí se eliminaron ventas que no cambian ni el id ni la fecha_hora
+    máximos, así que la marca de agua sola no los detecta.
+    """
+    return [fila[0] for fila in conn.execute('''
+        SELECT p.venta_fecha_solo_dia
+        FROM (SELECT venta_fecha_solo_dia, SUM(apuesta) AS apuesta FROM main.ventas_importadas
+              WHERE origen = ? GROUP BY venta_fecha_solo_dia) p
+        LEFT JOIN (SELECT venta_fecha_solo_dia, SUM(apuesta) AS apuesta FROM ext.ventas
+                   GROUP BY venta_fecha_solo_dia) e USING (venta_fecha_solo_dia)
+        WHERE COALESCE(e.apuesta, 0) < p.apuesta
+    ''', (origen,))]
+
+
+def sincronizar_origen(ruta_externa, origen=None, ruta_db=None):
+    """
+    Trae de la base de otra terminal solo lo nuevo o modificado desde la última sincronización.
+
+    Por cada origen se guarda en 'sincronizacion_origenes' una marca de agua: el último id de
+    venta visto y la 'fecha_hora' más reciente (las ventas agrupadas se actualizan en el lugar,
+    por eso no basta con el id). Se recargan completos los días que tienen cambios, de modo
+    que las ventas eliminadas en la terminal también se descuentan; los días viejos donde
+    solo hubo eliminaciones se detectan comparando la apuesta total del día con lo importado. Si el archivo no cambió
+    desde la última vez ni siquiera se abre.
+
+    Retorna un diccionario como importar_desde_sqlite más 'sin_cambios'.
+    """
+    origen = origen or os.path.basename(ruta_externa)
+    mtime = _mtime_base(ruta_externa)
+    ultimo_id, ultima_modificacion, mtime_anterior = _marca_origen(origen, ruta_db)
+    if mtime_anterior == mtime:
+        return {"insertadas": 0, "fusionadas": 0, "omitidas": 0, "resultados": 0, "sin_cambios": True}
+
+    conn = _conectar_con_externa(ruta_externa, ruta_db)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Días con ventas nuevas o modificadas, más el día de la marca anterior por si
+            # en él solo hubo eliminaciones.
+            # (UNION para que cada condición use su índice: el id y idx_ventas_fecha_hora)
+            dias = [fila[0] for fila in conn.execute('''
+                SELECT venta_fecha_solo_dia FROM ext.ventas WHERE id > ?
+                UNION
+                SELECT venta_fecha_solo_dia FROM ext.ventas WHERE fecha_hora >= ?
+            ''', (ultimo_id, ultima_modificacion))]
+            if ultima_modificacion:
+                dias.append(ultima_modificacion[:10])
+            dias = sorted(set(dias) | set(_dias_con_eliminaciones(conn, origen)))
+
+            resumen = {"insertadas": 0, "fusionadas": 0, "omitidas": 0}
+            if dias:
+                marcadores = ", ".join("?" for _ in dias)
+                _cargar_lote_externo(conn, f"venta_fecha_solo_dia IN ({marcadores})", dias)
+                resumen = _fusionar_lote(conn, origen, dias_completos=dias)
+            resumen["resultados"] = _importar_resultados_externos(conn)
+            resumen["sin_cambios"] = False
+
+            nuevo_id, nueva_modificacion = conn.execute(
+                "SELECT COALESCE(MAX(id), 0), COALESCE(MAX(fecha_hora), '') FROM ext.ventas"
+            ).fetchone()
+            conn.execute('''
+                INSERT OR REPLACE INTO main.sincronizacion_origenes
+                    (origen, ruta, ultimo_id, ultima_modificacion, mtime, ultima_sincronizacion)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (origen, os.path.abspath(ruta_externa), nuevo_id, nueva_modificacion, mtime,
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if resumen["resultados"]:
+            base_datos.invalidar_cache_ganadores()
+        conn.execute("DETACH DATABASE ext")
+        return resumen
+    finally:
+        conn.close()
+
+
+def sincronizar_carpeta(carpeta, ruta_db=None):
+    """
+    Sincroniza todas las bases '*.db' de una carpeta compartida (una por terminal; el nombre
+    del archivo identifica a la terminal). La base local se ignora si está en la misma carpeta.
+
+    Un error en una terminal no detiene a las demás. Retorna una lista de
+    (origen, resumen o None, error o None).
+    """
+    ruta_local = os.path.abspath(ruta_db or base_datos.DB_NAME)
+    resultados = []
+    for ruta in sorted(glob.glob(os.path.join(carpeta, "*.db"))):
+        origen = os.path.basename(ruta)
+        if os.path.exists(ruta_local) and os.path.samefile(ruta, ruta_local):
+            continue
+        try:
+            resultados.append((origen, sincronizar_origen(ruta, origen, ruta_db), None))
+        except (sqlite3.Error, ValueError, OSError) as e:
+            resultados.append((origen, None, e))
+    return resultados
+
+
+def describir_sincronizacion(resultados):
+    """Resumen de una línea de sincronizar_carpeta para la barra de estado."""
+    nuevas = sum(r["insertadas"] for _, r, _ in resultados if r)
+    fusionadas = sum(r["fusionadas"] for _, r, _ in resultados if r)
+    errores = [f"{origen}: {error}" for origen, _, error in resultados if error]
+    texto = f"{len(resultados)} terminal(es), {nuevas} ventas nuevas, {fusionadas} actualizadas"
+    if errores:
+        texto += " | Errores: " + "; ".join(errores)
+    return texto
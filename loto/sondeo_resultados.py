@@ -0,0 +1,121 @@
+"""Consulta automática de los resultados en la web después de cada sorteo, en un hilo aparte."""
+import sqlite3
+import threading
+import traceback
+from datetime import datetime, time, timedelta
+
+import requests
+
+from loto import base_datos
+from loto.resultados_web import URL_DIARIA, descargar_pagina_si_cambio, extraer_sorteos_pagina
+
+HORARIOS_SORTEO = {"11 AM": time(11, 0), "03 PM": time(15, 0), "06 PM": time(18, 0), "09 PM": time(21, 0)}
+DEMORA_PRIMERA_CONSULTA = timedelta(minutes=5) # La página publica el resultado unos minutos después del sorteo
+LIMITE_CONSULTA = timedelta(hours=3) # Pasado este tiempo se deja de insistir (queda el ingreso manual)
+ESPERA_MINIMA = 30 # Segundos entre reintentos, se duplica en cada intento fallido...
+ESPERA_MAXIMA = 10 * 60 # ...hasta este máximo
+ESPERA_SIN_SORTEOS = 60 * 60 # Tope de la espera hasta el próximo sorteo (por si cambia la hora del equipo)
+
+
+def sorteos_del_dia(fecha):
+    """[(sorteo, datetime del sorteo)] de la Diaria para 'fecha' (el de las 06 PM solo los sábados)."""
+    sorteos = ["11 AM", "03 PM", "09 PM"] + (["06 PM"] if fecha.weekday() == 5 else [])
+    return sorted(((s, datetime.combine(fecha, HORARIOS_SORTEO[s])) for s in sorteos), key=lambda x: x[1])
+
+
+class SondeoResultados:
+    """
+    Hilo que, a partir de unos minutos después de cada sorteo, consulta la página de
+    resultados hasta encontrar el número ganador y lo registra con
+    registrar_numero_ganador_db.
+
+    Los reintentos esperan cada vez el doble (de ESPERA_MINIMA a ESPERA_MAXIMA) y usan
+    peticiones condicionales (ETag / Last-Modified), así que mientras la página no cambia
+    el servidor responde 304 sin reenviarla. Cada resultado registrado se publica como
+    ('resultado_web', None, (fecha, sorteo, numero, mensaje)) en 'eventos', la misma
+    cola que la interfaz ya atiende desde el hilo de Tk.
+    """
+
+    def __init__(self, eventos, url=URL_DIARIA, demora=DEMORA_PRIMERA_CONSULTA,
+                 espera_minima=ESPERA_MINIMA, espera_maxima=ESPERA_MAXIMA):
+        self.eventos = eventos
+        self.url = url
+        self.demora = demora
+        self.espera_minima = espera_minima
+        self.espera_maxima = espera_maxima
+        self._validadores = {}
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, name="SondeoResultados", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+
+    def sorteos_pendientes(self, ahora):
+        """Sorteos de hoy que ya deberían estar publicados y todavía no tienen ganador registrado."""
+        fecha = ahora.strftime('%Y-%m-%d')
+        en_ventana = [s for s, hora in sorteos_del_dia(ahora.date())
+                      if hora + self.demora <= ahora <= hora + LIMITE_CONSULTA]
+        if not en_ventana:
+            return []
+        registrados = base_datos.obtener_ganadores_fecha(fecha)
+        return [s for s in en_ventana if not registrados.get(s)]
+
+    def segundos_hasta_proximo(self, ahora):
+        """Segundos hasta la primera consulta del próximo sorteo (hoy o mañana)."""
+        for dia in (ahora.date(), ahora.date() + timedelta(days=1)):
+            for _, hora in sorteos_del_dia(dia):
+                if hora + self.demora > ahora:
+                    return min((hora + self.demora - ahora).total_seconds(), ESPERA_SIN_SORTEOS)
+        return ESPERA_SIN_SORTEOS
+
+    def consultar(self, fecha, pendientes):
+        """
+        Una consulta a la página; registra los pendientes que aparezcan en ella.
+        Retorna la lista de sorteos registrados.
+        """
+        html, self._validadores = descargar_pagina_si_cambio(self._validadores, self.url)
+        if html is None:
+            return []
+        publicados = {sorteo: numero for dia, sorteo, numero in extraer_sorteos_pagina(html) if dia == fecha}
+        registrados = []
+        for sorteo in pendientes:
+            numero = publicados.get(sorteo)
+            if not numero:
+                continue
+            exito, mensaje = base_datos.registrar_numero_ganador_db(fecha, sorteo, numero)
+            if exito:
+                registrados.append(sorteo)
+                self.eventos.put(("resultado_web", None, (fecha, sorteo, numero, mensaje)))
+        return registrados
+
+    def _ejecutar(self):
+        espera = self.espera_minima
+        while not self._detener.is_set():
+            ahora = datetime.now()
+            try:
+                pendientes = self.sorteos_pendientes(ahora)
+                if not pendientes:
+                    espera = self.espera_minima
+                    self._detener.wait(self.segundos_hasta_proximo(ahora))
+                    continue
+                completo = len(self.consultar(ahora.strftime('%Y-%m-%d'), pendientes)) == len(pendientes)
+            except (requests.RequestException, sqlite3.Error) as e:
+                # Un error (sin red, base ocupada) no detiene el hilo: se reintenta más tarde
+                print(f"⚠️ Consulta automática de resultados: {e}")
+                completo = False
+            except Exception as e:
+                # Tampoco uno inesperado (p. ej. la página cambió de formato): se deja la pila
+                # en la consola y se sigue con la misma espera creciente
+                print(f"❌ Error inesperado en la consulta automática de resultados: {e}")
+                traceback.print_exc()
+                completo = False
+
+            if completo:
+                espera = self.espera_minima
+            else:
+                self._detener.wait(espera)
+                espera = min(espera * 2, self.espera_maxima)
@@ -0,0 +1,110 @@
+"""Cola de trabajos en segundo plano (exportaciones, impresiones) con progreso y cancelación."""
+import itertools
+import queue
+import threading
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza dentro de un trabajo cuando se pidió cancelarlo."""
+
+
+class Trabajo:
+    """Un trabajo encolado. La función recibe el propio trabajo para reportar progreso."""
+
+    def __init__(self, id_trabajo, descripcion, funcion, eventos, cola=None):
+        self.id = id_trabajo
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self.cola = cola # La ColaTrabajos que lo ejecuta
+        self._eventos = eventos
+        self._cancelado = threading.Event()
+        self._ultimo_porcentaje = -1
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def reportar_progreso(self, actual, total):
+        """
+        Publica el avance del trabajo (solo cuando cambia el porcentaje) y
+        lanza TrabajoCancelado si se pidió cancelar.
+        """
+        if self._cancelado.is_set():
+            raise TrabajoCancelado()
+        porcentaje = int(actual * 100 / total) if total else 100
+        if porcentaje != self._ultimo_porcentaje:
+            self._ultimo_porcentaje = porcentaje
+            self._eventos.put(("progreso", self, porcentaje))
+
+
+class ColaTrabajos:
+    """
+    Ejecuta los trabajos de a uno en un hilo trabajador y publica eventos
+    ('encolado', 'iniciado', 'progreso', 'completado', 'cancelado', 'error')
+    en una cola que la interfaz consume desde su propio hilo, ya que Tk no
+    es seguro entre hilos.
+
+    Varias colas pueden compartir 'eventos' para que la interfaz los consuma en
+    un solo lugar; cada una tiene su propio hilo, así un trabajo largo de una no
+    demora ni se cancela junto con los de otra ('trabajo.cola' dice de cuál es).
+    """
+
+    def __init__(self, eventos=None, nombre="ColaTrabajos"):
+        self.eventos = eventos if eventos is not None else queue.Queue()
+        self._pendientes = queue.Queue()
+        self._contador = itertools.count(1)
+        self._lock = threading.Lock()
+        self._trabajos_activos = []
+        self._hilo = threading.Thread(target=self._ejecutar, name=nombre, daemon=True)
+        self._hilo.start()
+
+    def encolar(self, descripcion, funcion):
+        """Agrega un trabajo a la cola. 'funcion(trabajo)' retorna el resultado (p. ej. la ruta generada)."""
+        trabajo = Trabajo(next(self._contador), descripcion, funcion, self.eventos, self)
+        with self._lock:
+            self._trabajos_activos.append(trabajo)
+        self.eventos.put(("encolado", trabajo, None))
+        self._pendientes.put(trabajo)
+        return trabajo
+
+    def pendientes(self):
+        """Cantidad de trabajos encolados o en ejecución."""
+        with self._lock:
+            return len(self._trabajos_activos)
+
+    def cancelar_todos(self):
+        """Cancela el trabajo en curso y los que esperan en esta cola (no los de otras colas)."""
+        with self._lock:
+            for trabajo in self._trabajos_activos:
+                trabajo.cancelar()
+
+    def procesar_eventos(self, manejador):
+        """Entrega al 'manejador(tipo, trabajo, dato)' todos los eventos pendientes sin bloquear."""
+        while True:
+            try:
+                tipo, trabajo, dato = self.eventos.get_nowait()
+            except queue.Empty:
+                return
+            manejador(tipo, trabajo, dato)
+
+    def _ejecutar(self):
+        while True:
+            trabajo = self._pendientes.get()
+            if trabajo.cancelado:
+                evento = ("cancelado", trabajo, None)
+            else:
+                self.eventos.put(("iniciado", trabajo, None))
+                try:
+                    evento = ("completado", trabajo, trabajo.funcion(trabajo))
+                except TrabajoCancelado:
+                    evento = ("cancelado", trabajo, None)
+                except Exception as e:
+                    evento = ("error", trabajo, e)
+            # Se retira de los activos antes de publicar el evento final para que
+            # la interfaz vea el conteo de pendientes ya actualizado.
+            with self._lock:
+                self._trabajos_activos.remove(trabajo)
+            self.eventos.put(evento)
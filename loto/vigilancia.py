@@ -0,0 +1,137 @@
+"""Vigilancia del bucle de eventos de Tk: detecta bloqueos de la interfaz y registra qué manejador los causó."""
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from loto import base_datos
+
+LATIDO_MS = 50 # Cada cuánto late el bucle de Tk
+UMBRAL_BLOQUEO = 0.3 # Segundos sin latir a partir de los cuales se considera un bloqueo
+LOG_BLOQUEOS = "bloqueos_interfaz.log" # En la carpeta de la base de datos
+LOG_TAMANO_MAXIMO = 1024 * 1024
+LOG_RESPALDOS = 3
+CANTIDAD_RECIENTES = 20
+
+# Marcos que no dicen qué manejador de la aplicación estaba corriendo
+_ARCHIVOS_INTERMEDIOS = (os.sep + "tkinter" + os.sep, os.sep + "loto" + os.sep + "planificador.py")
+
+
+def _es_intermedio(marco):
+    return (any(parte in marco.f_code.co_filename for parte in _ARCHIVOS_INTERMEDIOS)
+            or marco.f_code.co_name == "<lambda>")
+
+
+def manejador_de_pila(marco):
+    """
+    Nombre del callback de la aplicación que corre en la pila de 'marco': el primer marco
+    propio después del primer marco de tkinter (el bucle de eventos), salteando lambdas y
+    el planificador. None si el bucle de Tk estaba esperando eventos o dentro de Tcl.
+    """
+    marcos = []
+    while marco is not None:
+        marcos.append(marco)
+        marco = marco.f_back
+    marcos.reverse() # Del más externo al más interno
+    en_bucle = False
+    lambda_propia = None
+    for marco in marcos:
+        if os.sep + "tkinter" + os.sep in marco.f_code.co_filename:
+            en_bucle = True
+        elif en_bucle and not _es_intermedio(marco):
+            return getattr(marco.f_code, "co_qualname", marco.f_code.co_name)
+        elif en_bucle and lambda_propia is None and marco.f_code.co_name == "<lambda>" and \
+                not any(parte in marco.f_code.co_filename for parte in _ARCHIVOS_INTERMEDIOS):
+            lambda_propia = f"<lambda> ({os.path.basename(marco.f_code.co_filename)}:{marco.f_lineno})"
+    return lambda_propia # Un lambda que hace el trabajo directamente, sin llamar a una función
+
+
+class VigilanteBucle:
+    """
+    'latir' se llama desde el hilo de Tk cada LATIDO_MS (lo agenda el PlanificadorTk).
+    Un hilo aparte revisa cada medio umbral cuánto hace que no late: si pasa de
+    'umbral', toma la pila del hilo principal con sys._current_frames en ese momento,
+    que todavía está dentro del manejador culpable. Cuando el bucle vuelve a latir, el
+    hilo de Tk solo anota la duración; el hilo vigilante la junta con la pila y escribe
+    el bloqueo en un log rotativo, sin agregar trabajo a la interfaz.
+    """
+
+    def __init__(self, umbral=UMBRAL_BLOQUEO, intervalo_ms=LATIDO_MS, ruta_log=None):
+        self.umbral = umbral
+        self.intervalo = intervalo_ms / 1000
+        self.ruta_log = ruta_log or os.path.join(base_datos.DB_DIR, LOG_BLOQUEOS)
+        self.recientes = deque(maxlen=CANTIDAD_RECIENTES) # (fecha y hora, duración, manejador)
+        self.demora_maxima = 0.0
+        self._ultimo_latido = None
+        self._terminados = queue.SimpleQueue() # Duraciones de bloqueos ya terminados
+        self._muestra = None # (manejador, pila) tomada durante el bloqueo en curso
+        self._detener = threading.Event()
+        self._hilo = None
+        self._id_principal = threading.main_thread().ident
+        self.log = logging.getLogger("loto.vigilancia")
+
+    def iniciar(self):
+        if not self.log.handlers:
+            os.makedirs(os.path.dirname(self.ruta_log) or ".", exist_ok=True)
+            manejador = RotatingFileHandler(self.ruta_log, maxBytes=LOG_TAMANO_MAXIMO,
+                                            backupCount=LOG_RESPALDOS, encoding="utf-8")
+            manejador.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.log.addHandler(manejador)
+            self.log.setLevel(logging.INFO)
+            self.log.propagate = False
+        self._hilo = threading.Thread(target=self._vigilar, name="VigilanteBucle", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+
+    def latir(self):
+        """Hilo de Tk: anota el latido y, si llegó tarde, la duración del bloqueo."""
+        ahora = time.monotonic()
+        if self._ultimo_latido is not None:
+            demora = ahora - self._ultimo_latido - self.intervalo
+            self.demora_maxima = max(self.demora_maxima, demora)
+            if demora > self.umbral:
+                self._terminados.put(demora)
+        self._ultimo_latido = ahora
+
+    def _vigilar(self):
+        while not self._detener.wait(self.umbral / 2):
+            ultimo = self._ultimo_latido
+            if ultimo is not None and self._muestra is None and time.monotonic() - ultimo - self.intervalo > self.umbral:
+                self._muestra = self._tomar_muestra()
+            while True:
+                try:
+                    demora = self._terminados.get_nowait()
+                except queue.Empty:
+                    break
+                self._registrar(demora)
+
+    def _tomar_muestra(self):
+        marco = sys._current_frames().get(self._id_principal)
+        if marco is None:
+            return None, ""
+        return manejador_de_pila(marco), "".join(traceback.format_stack(marco))
+
+    def _registrar(self, demora):
+        # Si el bloqueo fue más corto que un ciclo del vigilante puede no haber muestra
+        manejador, pila = self._muestra or (None, "")
+        self._muestra = None
+        nombre = manejador or "(sin manejador de Python: Tk o el sistema)"
+        self.recientes.append((datetime.now().strftime("%Y-%m-%d %H:%M:%S"), demora, nombre))
+        self.log.warning("Bloqueo de %.2f s en %s\n%s", demora, nombre, pila)
+
+    def describir(self):
+        """Resumen para mostrar en la interfaz: los bloqueos más recientes, del último al primero."""
+        if not self.recientes:
+            return (f"Sin bloqueos de más de {self.umbral:.1f} s "
+                    f"(mayor demora: {self.demora_maxima * 1000:.0f} ms).\nRegistro: {self.ruta_log}")
+        renglones = [f"{fecha}  {demora:.2f} s  {nombre}" for fecha, demora, nombre in reversed(self.recientes)]
+        return "\n".join(renglones) + f"\n\nRegistro completo con la pila de cada bloqueo: {self.ruta_log}"
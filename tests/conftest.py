@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from loto import base_datos
+from loto.resultados_web import MESES
+
+
+@pytest.fixture
+def base_temporal(tmp_path, monkeypatch):
+    """Base de datos vacía en un directorio temporal, con el esquema completo."""
+    directorio = str(tmp_path / "data")
+    monkeypatch.setattr(base_datos, "DB_DIR", directorio)
+    monkeypatch.setattr(base_datos, "DB_NAME", os.path.join(directorio, "loteria.db"))
+    base_datos.invalidar_cache_ganadores()
+    base_datos.crear_tabla()
+    yield base_datos.DB_NAME
+    base_datos.invalidar_cache_ganadores()
+
+
+def insertar_ventas(ruta_db, ventas):
+    """Inserta ventas (numero, apuesta, premio, fecha AAAA-MM-DD, sorteo) directamente en la base."""
+    conn = sqlite3.connect(ruta_db)
+    with conn:
+        conn.executemany('''
+            INSERT INTO ventas (numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia)
+            VALUES (?, ?, ?, ? || ' 10:00:00', ?, ?)
+        ''', [(numero, apuesta, premio, fecha, sorteo, fecha) for numero, apuesta, premio, fecha, sorteo in ventas])
+    conn.close()
+
+
+class ServidorPrueba:
+    """
+    Estado del servidor HTTP local que reemplaza a loto.com.ni en las pruebas.
+    GET responde 'html' (con 'etag' / 'ultima_modificacion' si están y 304 cuando la
+    petición condicional coincide); POST responde lo que retorne 'responder_post(datos)',
+    una tupla (estado, cuerpo). 'estado' distinto de 200 hace fallar todos los GET.
+    """
+
+    def __init__(self):
+        self.html = ""
+        self.etag = None
+        self.ultima_modificacion = None
+        self.estado = 200
+        self.responder_post = lambda datos: (404, "")
+        self.peticiones = [] # (método, código respondido, cabeceras o datos del formulario)
+        self.url = None
+
+
+class _ManejadorPrueba(BaseHTTPRequestHandler):
+    def do_GET(self):
+        servidor = self.server.estado_prueba
+        if servidor.estado != 200:
+            self._responder(servidor, "GET", servidor.estado, "error")
+            return
+        coincide_etag = servidor.etag and self.headers.get("If-None-Match") == servidor.etag
+        coincide_fecha = (servidor.ultima_modificacion and
+                          self.headers.get("If-Modified-Since") == servidor.ultima_modificacion)
+        if coincide_etag or (coincide_fecha and not self.headers.get("If-None-Match")):
+            self._responder(servidor, "GET", 304, None)
+            return
+        self._responder(servidor, "GET", 200, servidor.html)
+
+    def do_POST(self):
+        servidor = self.server.estado_prueba
+        largo = int(self.headers.get("Content-Length", 0))
+        datos = {clave: valores[0] for clave, valores in parse_qs(self.rfile.read(largo).decode()).items()}
+        estado, cuerpo = servidor.responder_post(datos)
+        servidor.peticiones.append(("POST", estado, datos))
+        self._enviar(servidor, estado, cuerpo)
+
+    def _responder(self, servidor, metodo, estado, cuerpo):
+        servidor.peticiones.append((metodo, estado, dict(self.headers)))
+        self._enviar(servidor, estado, cuerpo)
+
+    def _enviar(self, servidor, estado, cuerpo):
+        self.send_response(estado)
+        if estado == 200 and self.command == "GET":
+            if servidor.etag:
+                self.send_header("ETag", servidor.etag)
+            if servidor.ultima_modificacion:
+                self.send_header("Last-Modified", servidor.ultima_modificacion)
+        datos = (cuerpo or "").encode("utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        if estado != 304:
+            self.wfile.write(datos)
+
+    def log_message(self, formato, *args):
+        pass # Sin ruido en la salida de pytest
+
+
+@pytest.fixture
+def servidor_web():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ManejadorPrueba)
+    servidor.estado_prueba = ServidorPrueba()
+    servidor.estado_prueba.url = f"http://127.0.0.1:{servidor.server_port}"
+    hilo = threading.Thread(target=servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    hilo.start()
+    yield servidor.estado_prueba
+    servidor.shutdown()
+    servidor.server_close()
+
+
+MESES_PAGINA = {numero: nombre.capitalize() for nombre, numero in MESES.items() if nombre != "setiembre"}
+
+
+def bloque_sorteo(fecha, hora, numero):
+    """Bloque 'Rtable' como los de la página para un sorteo (fecha AAAA-MM-DD, hora '9:00 PM')."""
+    anio, mes, dia = (int(parte) for parte in fecha.split("-"))
+    return (f"<div class='Rtable'><div class='Rtable-cell Rtable-cell--head'>"
+            f"<span class='spanAzul'>{dia} de {MESES_PAGINA[mes]}, {anio}</span><br/>"
+            f"<span class='spanAzul'>{hora}</span></div>"
+            f"<div class='esferas esfera-amarillo'><span>{numero[0]}</span></div>"
+            f"<div class='esferas esfera-amarillo esfera2'><span>{numero[1]}</span></div></div>")
+
+
+def pagina_diaria(*bloques):
+    """HTML de la página con los bloques en la variable objJson, como la sirve loto.com.ni."""
+    items = ", ".join('{adName : "%s"}' % bloque.replace('"', '\\"') for bloque in bloques)
+    return f"<html><script>var objJson = [{items}];</script></html>"
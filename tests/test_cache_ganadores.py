@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+from loto import base_datos
+
+
+def test_resultado_escrito_por_otro_proceso_invalida_la_cache(base_temporal):
+    base_datos.registrar_numero_ganador_db("2024-03-05", "11 AM", "07")
+    assert base_datos.obtener_ganadores_fecha("2024-03-05") == {"11 AM": "07"}
+
+    # Como 'python -m loto rellenar': otro proceso completa el día ya pasado
+    subprocess.run([sys.executable, "-c", (
+        "import sqlite3, sys\n"
+        "conn = sqlite3.connect(sys.argv[1])\n"
+        "conn.execute(\"INSERT INTO resultados_sorteo (fecha_sorteo, hora_sorteo, numero_ganador)"
+        " VALUES ('2024-03-05', '03 PM', '42')\")\n"
+        "conn.commit()\n"
+    ), base_temporal], check=True)
+
+    assert base_datos.obtener_ganadores_fecha("2024-03-05") == {"11 AM": "07", "03 PM": "42"}
+
+
+def test_dias_pasados_en_cache_no_se_vuelven_a_consultar_sin_cambios(base_temporal, monkeypatch):
+    base_datos.registrar_numero_ganador_db("2024-03-05", "11 AM", "07")
+    base_datos.obtener_ganadores_fecha("2024-03-05")
+
+    def conectar_prohibido(*args, **kwargs):
+        raise AssertionError("la fecha debía salir de la caché")
+
+    monkeypatch.setattr(base_datos.sqlite3, "connect", conectar_prohibido)
+    assert base_datos.obtener_ganadores_fecha("2024-03-05") == {"11 AM": "07"}
+
+
+def test_cambiar_de_base_no_acumula_oyentes_de_estadisticas(base_temporal, tmp_path, monkeypatch):
+    from loto import estadisticas
+
+    def oyentes_de_motores():
+        return [o for o in base_datos._oyentes_ganadores
+                if isinstance(getattr(o, "__self__", None), estadisticas.EstadisticasSorteos)]
+
+    primero = estadisticas.obtener_estadisticas()
+    monkeypatch.setattr(base_datos, "DB_NAME", str(tmp_path / "otra.db"))
+    segundo = estadisticas.obtener_estadisticas()
+
+    assert segundo is not primero
+    assert oyentes_de_motores() == [segundo.aplicar_cambio]
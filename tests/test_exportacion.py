@@ -0,0 +1,38 @@
+import csv
+
+import pytest
+
+from loto.exportacion import exportar_datos_crudos
+from loto.trabajos import TrabajoCancelado
+
+from conftest import insertar_ventas
+
+
+def _ventas(cantidad):
+    return [(f"{i % 100:02d}", 5, 350, "2025-03-01", "11 AM") for i in range(cantidad)]
+
+
+def test_exportar_datos_crudos_reporta_progreso_por_lote(base_temporal, tmp_path):
+    insertar_ventas(base_temporal, _ventas(25))
+    avances = []
+    destino = tmp_path / "ventas.csv"
+
+    total = exportar_datos_crudos("ventas", "csv", str(destino), tamano_lote=10,
+                                  progreso=lambda actual, total: avances.append((actual, total)))
+
+    assert total == 25
+    assert avances == [(10, 25), (20, 25), (25, 25)]
+    with open(destino, encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 26 # Encabezado y filas
+
+
+def test_exportar_datos_crudos_se_cancela_entre_lotes(base_temporal, tmp_path):
+    insertar_ventas(base_temporal, _ventas(25))
+
+    def _cancelar_en_el_segundo(actual, total):
+        if actual > 10:
+            raise TrabajoCancelado()
+
+    with pytest.raises(TrabajoCancelado):
+        exportar_datos_crudos("ventas", "csv", str(tmp_path / "ventas.csv"), tamano_lote=10,
+                              progreso=_cancelar_en_el_segundo)
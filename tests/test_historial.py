@@ -0,0 +1,100 @@
+import sqlite3
+
+from loto import base_datos
+from loto.archivo import archivar_anio
+from loto.importacion import importar_desde_sqlite
+
+from conftest import insertar_ventas
+
+
+def test_conectar_historial_supera_el_limite_de_bases_adjuntas(base_temporal):
+    anios = list(range(2000, 2014)) # Más años archivados que bases adjuntables
+    insertar_ventas(base_temporal, [("07", 10, 700, f"{anio}-03-01", "11 AM") for anio in anios])
+    insertar_ventas(base_temporal, [("08", 5, 350, "2099-01-01", "11 AM")])
+    for anio in anios:
+        archivar_anio(anio, base_temporal)
+
+    conn = base_datos.conectar_historial()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == len(anios) + 1
+        anios_leidos = [fila[0] for fila in conn.execute(
+            "SELECT DISTINCT substr(venta_fecha_solo_dia, 1, 4) FROM ventas ORDER BY 1")]
+        assert anios_leidos == [str(anio) for anio in anios] + ["2099"]
+        adjuntas = conn.execute("PRAGMA database_list").fetchall()
+        assert len([nombre for _, nombre, _ in adjuntas if nombre.startswith("archivo_")]) <= base_datos._cupo_adjuntos(conn)
+    finally:
+        conn.close()
+
+
+def _liquidacion(ruta_db, fecha, sorteo):
+    conn = sqlite3.connect(ruta_db)
+    try:
+        return conn.execute('''
+            SELECT numero_ganador, total_vendido, apuesta_ganadora, premio_pagado FROM liquidaciones
+            WHERE fecha_sorteo = ? AND hora_sorteo = ?
+        ''', (fecha, sorteo)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_registrar_ganador_liquida_ventas_archivadas(base_temporal):
+    insertar_ventas(base_temporal, [("07", 10, 700, "2020-05-04", "11 AM"), ("12", 5, 350, "2020-05-04", "11 AM")])
+    base_datos.registrar_numero_ganador_db("2020-05-04", "11 AM", "07")
+    antes = _liquidacion(base_temporal, "2020-05-04", "11 AM")
+    assert antes == ("07", 15, 10, 700)
+
+    archivar_anio(2020, base_temporal)
+    exito, _ = base_datos.registrar_numero_ganador_db("2020-05-04", "11 AM", "07")
+    assert exito
+    assert _liquidacion(base_temporal, "2020-05-04", "11 AM") == antes
+
+
+def test_importar_sqlite_liquida_con_ventas_archivadas(base_temporal, tmp_path):
+    insertar_ventas(base_temporal, [("07", 10, 700, "2020-05-04", "11 AM"), ("12", 3, 210, "2020-05-04", "03 PM")])
+    base_datos.registrar_numero_ganador_db("2020-05-04", "11 AM", "07")
+    archivar_anio(2020, base_temporal)
+
+    # Otra terminal con una venta tardía del mismo sorteo y el resultado de otro ya archivado
+    externa = str(tmp_path / "terminal2.db")
+    conn = sqlite3.connect(externa)
+    conn.execute('''CREATE TABLE ventas (id INTEGER PRIMARY KEY, numero_loteria TEXT, apuesta INTEGER,
+        premio_potencial INTEGER, fecha_hora TEXT, sorteo_hora TEXT, venta_fecha_solo_dia TEXT)''')
+    conn.execute("CREATE TABLE resultados_sorteo (fecha_sorteo TEXT, hora_sorteo TEXT, numero_ganador TEXT)")
+    conn.execute("INSERT INTO ventas VALUES (1, '07', 4, 280, '2020-05-04 10:30:00', '11 AM', '2020-05-04')")
+    conn.execute("INSERT INTO resultados_sorteo VALUES ('2020-05-04', '03 PM', '12')")
+    conn.commit()
+    conn.close()
+
+    importar_desde_sqlite(externa, ruta_db=base_temporal)
+
+    assert _liquidacion(base_temporal, "2020-05-04", "11 AM") == ("07", 14, 14, 980)
+    assert _liquidacion(base_temporal, "2020-05-04", "03 PM") == ("12", 3, 3, 210)
+
+
+def test_eliminar_ultima_venta_vuelve_a_liquidar_el_sorteo(base_temporal):
+    insertar_ventas(base_temporal, [("07", 10, 700, "2020-05-04", "11 AM")])
+    archivar_anio(2020, base_temporal)
+    # Venta tardía del mismo sorteo, importada después del archivado: queda en la principal
+    insertar_ventas(base_temporal, [("07", 4, 280, "2020-05-04", "11 AM")])
+    base_datos.registrar_numero_ganador_db("2020-05-04", "11 AM", "07")
+    assert _liquidacion(base_temporal, "2020-05-04", "11 AM") == ("07", 14, 14, 980)
+
+    exito, _ = base_datos.eliminar_ultima_venta_valida_db()
+    assert exito
+    assert _liquidacion(base_temporal, "2020-05-04", "11 AM") == ("07", 10, 10, 700)
+
+
+def test_resumenes_y_busquedas_incluyen_anios_archivados(base_temporal):
+    insertar_ventas(base_temporal, [("07", 10, 700, "2020-05-04", "11 AM"), ("07", 5, 350, "2020-05-05", "03 PM"),
+                                    ("12", 2, 140, "2020-05-05", "03 PM")])
+    archivar_anio(2020, base_temporal)
+
+    assert base_datos.obtener_resumen_ventas_db("2020-05-01", "2020-05-31") == [
+        ("07", 10, 700, "11 AM"), ("07", 5, 350, "03 PM"), ("12", 2, 140, "03 PM"),
+    ]
+    assert base_datos.obtener_resumen_ventas_db("2020-05-01", "2020-05-31", "03 PM") == [
+        ("07", 5, 350, "03 PM"), ("12", 2, 140, "03 PM"),
+    ]
+    assert base_datos.obtener_totales_ventas_db("2020-05-01", "2020-05-31") == (17, ("07", 2))
+    assert base_datos.obtener_totales_numero_db(7) == (2, 15, 1050, "2020-05-05 10:00:00")
+    assert base_datos.obtener_totales_numero_db("07", "2020-05-05", "2020-05-05") == (1, 5, 350, "2020-05-05 10:00:00")
@@ -0,0 +1,35 @@
+import sqlite3
+
+from loto.importacion import importar_desde_archivo
+
+
+def test_importar_csv_con_fechas_en_varias_formas(base_temporal, tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    ruta.write_text(
+        "numero_loteria,apuesta,premio_potencial,fecha_hora,sorteo_hora\n"
+        "05,2,140,2024-01-02 10:00:00,11am\n"
+        "07,3,210,2024-01-02 11:00,3pm\n"
+        "08,4,280,2024-01-02T20:15,9 PM\n"
+        "09,1,70,2024-01-03,11 AM\n"
+        "10,1,70,02/01/2024 10:00,11 AM\n", # No ISO: día y mes ambiguos, se rechaza
+        encoding="utf-8"
+    )
+
+    # Bloques de dos filas: el resultado no debe depender de dónde caen los cortes
+    resumen = importar_desde_archivo(str(ruta), tamano_bloque=2, ruta_db=base_temporal)
+
+    assert resumen["validas"] == 4
+    assert dict(resumen["rechazadas"]) == {"fecha inválida": 1}
+    conn = sqlite3.connect(base_temporal)
+    try:
+        filas = conn.execute(
+            "SELECT numero_loteria, fecha_hora, sorteo_hora, venta_fecha_solo_dia FROM ventas ORDER BY numero_loteria"
+        ).fetchall()
+    finally:
+        conn.close()
+    assert filas == [
+        ("05", "2024-01-02 10:00:00", "11 AM", "2024-01-02"),
+        ("07", "2024-01-02 11:00:00", "03 PM", "2024-01-02"),
+        ("08", "2024-01-02 20:15:00", "09 PM", "2024-01-02"),
+        ("09", "2024-01-03 00:00:00", "11 AM", "2024-01-03"),
+    ]
@@ -0,0 +1,41 @@
+import json
+import sqlite3
+
+from loto import base_datos
+from loto.relleno_resultados import describir_relleno, dias_pendientes, rellenar_resultados
+
+from conftest import bloque_sorteo
+
+
+def _responder_por_dia(datos):
+    fecha = f"{int(datos['anio']):04d}-{int(datos['mes']):02d}-{int(datos['dia']):02d}"
+    if fecha == "2025-07-07": # Lunes: 11 AM, 3 PM y 9 PM
+        bloques = [bloque_sorteo(fecha, "11:00 AM", "10"), bloque_sorteo(fecha, "3:00 PM", "20"),
+                   bloque_sorteo(fecha, "9:00 PM", "30")]
+        return 200, json.dumps([{"adName": bloque} for bloque in bloques])
+    if fecha == "2025-07-08":
+        return 200, "[]" # Todavía sin publicar
+    if fecha == "2025-07-09":
+        return 500, "error"
+    return 200, json.dumps([1, 2]) # 2025-07-10: un formato que no se sabe leer
+
+
+def test_rellenar_resultados_desde_servidor_local(base_temporal, servidor_web):
+    servidor_web.responder_post = _responder_por_dia
+    url = servidor_web.url + "/business/bsorteo.php"
+
+    resumen = rellenar_resultados("2025-07-07", "2025-07-10", hilos=2, por_segundo=0, url=url)
+
+    assert resumen == {"dias": 4, "consultados": 2, "nuevos": 3, "corregidos": 0, "sin_resultados": 1, "errores": 2}
+    assert base_datos.obtener_ganadores_fecha("2025-07-07") == {"11 AM": "10", "03 PM": "20", "09 PM": "30"}
+    conn = sqlite3.connect(base_temporal)
+    try:
+        anotados = [fila[0] for fila in conn.execute("SELECT fecha FROM relleno_resultados")]
+    finally:
+        conn.close()
+    assert anotados == ["2025-07-07"]
+    assert {datos["method"] for _, _, datos in servidor_web.peticiones} == {"getMesByJuego"}
+
+    # El día sin resultados y los que fallaron se vuelven a consultar la próxima vez
+    assert dias_pendientes("2025-07-07", "2025-07-10") == ["2025-07-08", "2025-07-09", "2025-07-10"]
+    assert "1 sin resultados publicados, 2 días con error" in describir_relleno(resumen)
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from loto.resultados_web import extraer_sorteos_pagina, parsear_sorteo_html
+
+# Copia guardada de https://loto.com.ni/diaria/ (historial del 27 de junio al 12 de julio de 2025)
+PAGINA_GUARDADA = Path(__file__).resolve().parent.parent / "Codigo html loto.txt"
+
+
+def test_extraer_sorteos_de_la_pagina_guardada():
+    sorteos = extraer_sorteos_pagina(PAGINA_GUARDADA.read_text(encoding="utf-8"))
+
+    assert len(sorteos) == 51
+    assert [s for s in sorteos if s[0] == "2025-07-12"] == [
+        ("2025-07-12", "09 PM", "31"),
+        ("2025-07-12", "06 PM", "87"),
+        ("2025-07-12", "03 PM", "86"),
+        ("2025-07-12", "11 AM", "72"),
+    ]
+    # En la copia a ese día le falta el sorteo de las 6 PM
+    assert {sorteo: numero for dia, sorteo, numero in sorteos if dia == "2025-07-11"} == {
+        "09 PM": "55", "03 PM": "03", "11 AM": "55",
+    }
+    assert all(len(numero) == 2 and numero.isdigit() for _, _, numero in sorteos)
+
+
+def test_parsear_sorteo_ignora_bloques_sin_cabecera():
+    assert parsear_sorteo_html("</div></div>") is None
+    assert parsear_sorteo_html(
+        "<span class='spanAzul'>Lunes 7 de Julio, 2025</span><span class='spanAzul'>10:00 PM</span>"
+    ) is None
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+
+from loto.sincronizacion import sincronizar_origen
+
+
+def _terminal(ruta, ventas):
+    """Base de otra terminal con 'ventas' [(numero, apuesta, fecha_hora, sorteo)]."""
+    conn = sqlite3.connect(ruta)
+    conn.execute('''CREATE TABLE IF NOT EXISTS ventas (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        numero_loteria TEXT NOT NULL, apuesta INTEGER NOT NULL, premio_potencial REAL NOT NULL,
+        fecha_hora TEXT NOT NULL, sorteo_hora TEXT NOT NULL, venta_fecha_solo_dia TEXT NOT NULL)''')
+    conn.executemany('''
+        INSERT INTO ventas (numero_loteria, apuesta, premio_potencial, fecha_hora, sorteo_hora, venta_fecha_solo_dia)
+        VALUES (?, ?, ? * 70, ?, ?, substr(?, 1, 10))
+    ''', [(numero, apuesta, apuesta, fecha_hora, sorteo, fecha_hora) for numero, apuesta, fecha_hora, sorteo in ventas])
+    conn.commit()
+    conn.close()
+
+
+def _borrar_en_terminal(ruta, numero):
+    conn = sqlite3.connect(ruta)
+    conn.execute("DELETE FROM ventas WHERE numero_loteria = ?", (numero,))
+    conn.commit()
+    conn.close()
+
+
+def _tocar(ruta):
+    """Cambia el mtime para que la sincronización no lo tome como 'sin cambios'."""
+    marca = os.path.getmtime(ruta) + 10
+    os.utime(ruta, (marca, marca))
+
+
+def _ventas_locales(ruta_db):
+    conn = sqlite3.connect(ruta_db)
+    try:
+        return conn.execute(
+            "SELECT numero_loteria, apuesta, venta_fecha_solo_dia FROM ventas ORDER BY venta_fecha_solo_dia, numero_loteria"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def test_venta_eliminada_en_ambas_bases_no_rompe_la_sincronizacion(base_temporal, tmp_path):
+    terminal = str(tmp_path / "caja2.db")
+    _terminal(terminal, [("07", 5, "2025-03-01 10:00:00", "11 AM"), ("08", 2, "2025-03-01 10:05:00", "11 AM")])
+    sincronizar_origen(terminal, ruta_db=base_temporal)
+
+    # La venta se elimina localmente y también en la terminal, que además vende otra el mismo día
+    conn = sqlite3.connect(base_temporal)
+    conn.execute("DELETE FROM ventas WHERE numero_loteria = '07'")
+    conn.commit()
+    conn.close()
+    _borrar_en_terminal(terminal, "07")
+    _terminal(terminal, [("10", 1, "2025-03-01 10:30:00", "11 AM")])
+    _tocar(terminal)
+
+    resumen = sincronizar_origen(terminal, ruta_db=base_temporal)
+
+    assert resumen["insertadas"] == 1
+    assert _ventas_locales(base_temporal) == [("08", 2, "2025-03-01"), ("10", 1, "2025-03-01")]
+
+
+def test_detecta_eliminaciones_en_dias_viejos(base_temporal, tmp_path):
+    terminal = str(tmp_path / "caja2.db")
+    _terminal(terminal, [("07", 5, "2025-03-01 10:00:00", "11 AM"),
+                         ("09", 3, "2025-03-02 10:00:00", "11 AM"), ("10", 1, "2025-03-02 11:00:00", "11 AM")])
+    sincronizar_origen(terminal, ruta_db=base_temporal)
+
+    # Se elimina la única venta de un día anterior a la marca de agua
+    _borrar_en_terminal(terminal, "07")
+    _tocar(terminal)
+    sincronizar_origen(terminal, ruta_db=base_temporal)
+
+    assert _ventas_locales(base_temporal) == [("09", 3, "2025-03-02"), ("10", 1, "2025-03-02")]
@@ -0,0 +1,95 @@
+import queue
+from datetime import datetime
+
+from loto import base_datos, sondeo_resultados
+from loto.sondeo_resultados import SondeoResultados
+
+from conftest import bloque_sorteo, pagina_diaria
+
+
+class _DetenerTras:
+    """Reemplaza el Event del hilo: anota cada espera y se detiene tras 'veces' esperas."""
+
+    def __init__(self, veces):
+        self.veces = veces
+        self.esperas = []
+
+    def is_set(self):
+        return len(self.esperas) >= self.veces
+
+    def wait(self, segundos):
+        self.esperas.append(segundos)
+        return self.is_set()
+
+
+def _hoy():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def test_peticion_condicional_con_etag(base_temporal, servidor_web):
+    hoy = _hoy()
+    servidor_web.html = pagina_diaria(bloque_sorteo("2020-01-01", "9:00 PM", "44"))
+    servidor_web.etag = '"v1"'
+    eventos = queue.Queue()
+    sondeo = SondeoResultados(eventos, url=servidor_web.url + "/diaria/")
+
+    assert sondeo.consultar(hoy, ["11 AM"]) == []
+    assert sondeo.consultar(hoy, ["11 AM"]) == []
+    assert servidor_web.peticiones[-1][1] == 304 # La página no cambió: no se reenvía
+    assert servidor_web.peticiones[-1][2]["If-None-Match"] == '"v1"'
+
+    servidor_web.html = pagina_diaria(bloque_sorteo(hoy, "11:00 AM", "27"))
+    servidor_web.etag = '"v2"'
+    assert sondeo.consultar(hoy, ["11 AM"]) == ["11 AM"]
+    assert servidor_web.peticiones[-1][1] == 200
+    assert base_datos.consultar_numero_ganador_db(hoy, "11 AM") == "27"
+    tipo, _, (fecha, sorteo, numero, _) = eventos.get_nowait()
+    assert (tipo, fecha, sorteo, numero) == ("resultado_web", hoy, "11 AM", "27")
+
+
+def test_peticion_condicional_con_last_modified(base_temporal, servidor_web):
+    servidor_web.html = pagina_diaria()
+    servidor_web.ultima_modificacion = "Sat, 12 Jul 2025 21:10:00 GMT"
+    sondeo = SondeoResultados(queue.Queue(), url=servidor_web.url + "/diaria/")
+
+    sondeo.consultar(_hoy(), ["11 AM"])
+    sondeo.consultar(_hoy(), ["11 AM"])
+    assert [estado for _, estado, _ in servidor_web.peticiones] == [200, 304]
+    assert servidor_web.peticiones[-1][2]["If-Modified-Since"] == servidor_web.ultima_modificacion
+
+
+def test_espera_creciente_mientras_la_pagina_falla(base_temporal, servidor_web, monkeypatch):
+    servidor_web.estado = 500
+    sondeo = SondeoResultados(queue.Queue(), url=servidor_web.url + "/diaria/", espera_minima=1, espera_maxima=4)
+    sondeo._detener = _DetenerTras(5)
+    monkeypatch.setattr(sondeo, "sorteos_pendientes", lambda ahora: ["11 AM"])
+
+    sondeo._ejecutar()
+    assert sondeo._detener.esperas == [1, 2, 4, 4, 4]
+    assert len(servidor_web.peticiones) == 5
+
+
+def test_error_inesperado_no_detiene_el_sondeo(base_temporal, servidor_web, monkeypatch):
+    hoy = _hoy()
+    servidor_web.html = pagina_diaria(bloque_sorteo(hoy, "11:00 AM", "05"))
+    sondeo = SondeoResultados(queue.Queue(), url=servidor_web.url + "/diaria/", espera_minima=1)
+    sondeo._detener = _DetenerTras(2)
+    monkeypatch.setattr(sondeo, "sorteos_pendientes",
+                        lambda ahora: [] if base_datos.consultar_numero_ganador_db(hoy, "11 AM") else ["11 AM"])
+    monkeypatch.setattr(sondeo, "segundos_hasta_proximo", lambda ahora: 999)
+
+    extraer = sondeo_resultados.extraer_sorteos_pagina
+    llamadas = []
+
+    def _falla_la_primera(html):
+        llamadas.append(html)
+        if len(llamadas) == 1:
+            raise AttributeError("formato de página desconocido")
+        return extraer(html)
+
+    monkeypatch.setattr(sondeo_resultados, "extraer_sorteos_pagina", _falla_la_primera)
+
+    sondeo._ejecutar()
+    # Tras el error espera el mínimo, reintenta y registra; después espera al próximo sorteo
+    assert sondeo._detener.esperas == [1, 999]
+    assert base_datos.consultar_numero_ganador_db(hoy, "11 AM") == "05"
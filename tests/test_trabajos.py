@@ -0,0 +1,32 @@
+import threading
+
+from loto.trabajos import ColaTrabajos
+
+
+def _esperar_evento(cola, tipo_buscado, trabajo_buscado):
+    while True:
+        tipo, trabajo, dato = cola.eventos.get(timeout=5)
+        if tipo == tipo_buscado and trabajo is trabajo_buscado:
+            return dato
+
+
+def test_cancelar_una_cola_no_cancela_la_otra():
+    exportaciones = ColaTrabajos()
+    fondo = ColaTrabajos(exportaciones.eventos, nombre="ColaFondo")
+    liberar = threading.Event()
+
+    def _largo(trabajo):
+        liberar.wait(5)
+        trabajo.reportar_progreso(1, 1)
+        return "fondo listo"
+
+    largo = fondo.encolar("Relleno", _largo)
+    exportacion = exportaciones.encolar("Exportación", lambda trabajo: "exportado")
+
+    # La exportación no espera al trabajo largo de la otra cola
+    assert _esperar_evento(exportaciones, "completado", exportacion) == "exportado"
+    assert largo.cola is fondo and exportacion.cola is exportaciones
+
+    exportaciones.cancelar_todos()
+    liberar.set()
+    assert _esperar_evento(fondo, "completado", largo) == "fondo listo"